@@ -0,0 +1,233 @@
+import argparse
+import json
+import platform
+import string
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from src.crypto.random_source import SOURCES, UrandomPool, create_source
+from src.services.password_generator_service import PasswordGeneratorService
+
+"""
+Benchmark für alle Algorithmen des PasswordGeneratorService.
+
+    python -m benchmarks.generator_benchmark                          # messen, Tabelle ausgeben
+    python -m benchmarks.generator_benchmark --out run.json           # Ergebnis als JSON speichern
+    python -m benchmarks.generator_benchmark --baseline base.json     # vergleichen, Exit-Code 1 bei Regression
+    python -m benchmarks.generator_benchmark --save-baseline base.json
+    python -m benchmarks.generator_benchmark --sources                # zusätzlich choice() je Zufallsquelle
+
+Gemessen wird pro Fall:
+    passwords_per_sec   Durchsatz (bester von REPEATS Durchläufen)
+    ns_per_char         Zeit pro erzeugtem Zeichen
+    random_bytes        verbrauchte Zufallsbytes pro Passwort (aus der Zufallsquelle gezählt)
+    alloc_bytes         Spitzen-Speicher (tracemalloc) pro Passwort während eines Batches
+Als Regression gilt weniger Durchsatz, aber auch mehr Zufallsbytes oder Speicher pro Passwort,
+jeweils mit eigener Schwelle.
+Baselines sind rechnerabhängig und werden deshalb nicht mitgeliefert.
+"""
+
+DEFAULT_COUNT = 20_000
+REPEATS = 3
+DEFAULT_THRESHOLD = 0.25  # 25 % langsamer als die Baseline = Regression
+RANDOM_BYTES_THRESHOLD = 0.10  # 10 % mehr Zufallsbytes (Rejection Sampling schwankt nur wenig)
+ALLOC_THRESHOLD = 0.50  # 50 % mehr Spitzen-Speicher (tracemalloc schwankt stärker)
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    options: dict
+    # "batch" = generate_batch (Bulk-Pfad), "single" = generate_password pro Passwort (GUI/CLI-Pfad)
+    mode: str = "batch"
+
+
+CASES = [
+    Case("random-8", dict(algorithm="random", length=8)),
+    Case("random-16", dict(algorithm="random", length=16)),
+    Case("random-32", dict(algorithm="random", length=32)),
+    Case("random-64", dict(algorithm="random", length=64)),
+    Case("random-16-letters", dict(algorithm="random", length=16, use_digits=False, use_special=False)),
+    Case("random-16-digits", dict(
+        algorithm="random", length=16, use_uppercase=False, use_lowercase=False, use_special=False
+    )),
+    Case("random-16-single", dict(algorithm="random", length=16), mode="single"),
+    Case("pronounceable-16", dict(algorithm="pronounceable", length=16)),
+    Case("passphrase-24", dict(algorithm="passphrase", length=24)),
+    Case("passphrase-24-single", dict(algorithm="passphrase", length=24), mode="single"),
+    Case("pattern", dict(algorithm="pattern")),
+    Case("template-fixed", dict(template="OdinKey-####-@@@@")),
+    Case("template-class", dict(template="[a-f0-9]{32}")),
+    Case("template-range", dict(template="?{8,16}-!{2}")),
+    Case("regex-fixed", dict(regex=r"[A-Z]{3}-\d{6}-[a-z0-9]{8}")),
+    Case("regex-alternation", dict(regex=r"(?:[a-z]{4,8}|[A-Z]{2}\d{4})-\w{6}")),
+]
+
+
+class CountingSource(UrandomPool):
+    """Zählt die verbrauchten Zufallsbytes; Puffer von einem Wort, damit nichts auf Vorrat gezählt wird."""
+
+    def __init__(self):
+        self.consumed = 0
+        super().__init__(chunk_size=4)
+
+    def _generate(self, n: int) -> bytes:
+        self.consumed += n
+        return super()._generate(n)
+
+
+def _run(service: PasswordGeneratorService, case: Case, count: int) -> list[str]:
+    if case.mode == "single":
+        options = dict(case.options)
+        return [service.generate_password(**options)["password"] for _ in range(count)]
+    return service.generate_batch(count, **case.options)
+
+
+def measure(case: Case, count: int = DEFAULT_COUNT, repeats: int = REPEATS) -> dict:
+    service = PasswordGeneratorService()
+    _run(service, case, min(count, 100))  # Aufwärmen: Wortliste, Modell, Template-Cache
+
+    best = float("inf")
+    chars = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        passwords = _run(service, case, count)
+        best = min(best, time.perf_counter() - start)
+        chars = sum(map(len, passwords))
+
+    counting = CountingSource()
+    sample = max(1, count // 10)
+    _run(PasswordGeneratorService(source=counting), case, sample)
+
+    tracemalloc.start()
+    try:
+        _run(service, case, sample)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "passwords_per_sec": round(count / best, 1),
+        "ns_per_char": round(best / chars * 1e9, 1),
+        "random_bytes": round(counting.consumed / sample, 2),
+        "alloc_bytes": round(peak / sample, 1),
+    }
+
+
+SOURCE_POOL = string.ascii_letters + string.digits + string.punctuation
+
+
+def measure_sources(count: int = 10 * DEFAULT_COUNT, repeats: int = REPEATS) -> dict:
+    """choice() pro Sekunde für jede Zufallsquelle ("system" = ein os.urandom-Syscall pro Wert)."""
+    results = {}
+    for name in SOURCES:
+        source = create_source(name)
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(count):
+                source.choice(SOURCE_POOL)
+            best = min(best, time.perf_counter() - start)
+        results[name] = {"choices_per_sec": round(count / best, 1)}
+    return results
+
+
+def run(cases=CASES, count: int = DEFAULT_COUNT, repeats: int = REPEATS) -> dict:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "count": count,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {case.name: measure(case, count, repeats) for case in cases},
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            random_threshold: float = RANDOM_BYTES_THRESHOLD, alloc_threshold: float = ALLOC_THRESHOLD) -> list[str]:
+    """
+    Liste der Regressionen: Fälle, deren Durchsatz mehr als 'threshold' unter der Baseline liegt
+    oder die mehr als 'random_threshold' mehr Zufallsbytes bzw. 'alloc_threshold' mehr Speicher
+    pro Passwort brauchen. Metriken, die in einer älteren Baseline fehlen, werden übersprungen.
+    """
+    regressions = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        ratio = result["passwords_per_sec"] / base["passwords_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append(
+                f"{name}: {result['passwords_per_sec']:.0f}/s statt {base['passwords_per_sec']:.0f}/s "
+                f"({(1 - ratio) * 100:.0f} % langsamer)"
+            )
+        # Bei Zufallsbytes und Speicher ist weniger besser
+        for key, limit, label in (("random_bytes", random_threshold, "Zufallsbytes"),
+                                  ("alloc_bytes", alloc_threshold, "Alloc-Bytes")):
+            if key not in base or key not in result:
+                continue
+            if result[key] > base[key] * (1 + limit):
+                regressions.append(
+                    f"{name}: {result[key]:.1f} {label}/Passwort statt {base[key]:.1f} "
+                    f"(erlaubt: +{limit * 100:.0f} %)"
+                )
+    return regressions
+
+
+def _print_table(report: dict, baseline: dict = None):
+    print(f"{'Fall':24} {'Passw./s':>12} {'ns/Zeichen':>11} {'Zufallsbytes':>13} {'Alloc B':>9} {'vs. Basis':>10}")
+    for name, result in report["results"].items():
+        delta = ""
+        if baseline and name in baseline["results"]:
+            ratio = result["passwords_per_sec"] / baseline["results"][name]["passwords_per_sec"]
+            delta = f"{(ratio - 1) * 100:+.0f} %"
+        print(f"{name:24} {result['passwords_per_sec']:>12,.0f} {result['ns_per_char']:>11.1f} "
+              f"{result['random_bytes']:>13.2f} {result['alloc_bytes']:>9.0f} {delta:>10}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark für den Passwort-Generator")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="Passwörter pro Durchlauf")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--only", action="append", help="nur Fälle, deren Name so beginnt")
+    parser.add_argument("--sources", action="store_true", help="zusätzlich die Zufallsquellen vergleichen")
+    parser.add_argument("--out", type=Path, help="Ergebnis als JSON speichern")
+    parser.add_argument("--baseline", type=Path, help="mit dieser JSON-Datei vergleichen")
+    parser.add_argument("--save-baseline", type=Path, help="Ergebnis als neue Baseline speichern")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="erlaubter Durchsatzverlust (0.25 = 25 %%)")
+    parser.add_argument("--random-threshold", type=float, default=RANDOM_BYTES_THRESHOLD,
+                        help="erlaubter Mehrverbrauch an Zufallsbytes (0.10 = 10 %%)")
+    parser.add_argument("--alloc-threshold", type=float, default=ALLOC_THRESHOLD,
+                        help="erlaubter Mehrverbrauch an Speicher (0.50 = 50 %%)")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in CASES if not args.only or any(c.name.startswith(p) for p in args.only)]
+    report = run(cases, args.count, args.repeats)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    _print_table(report, baseline)
+    if args.sources:
+        # Nur zur Information - fließt nicht in den Baseline-Vergleich ein
+        report["sources"] = measure_sources(10 * args.count, args.repeats)
+        print(f"\n{'Quelle':24} {'choice()/s':>12}")
+        for name, result in report["sources"].items():
+            print(f"{name:24} {result['choices_per_sec']:>12,.0f}")
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(report, indent=2))
+
+    if baseline:
+        regressions = compare(report, baseline, args.threshold, args.random_threshold, args.alloc_threshold)
+        if regressions:
+            print("\nRegression:", *regressions, sep="\n  ", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
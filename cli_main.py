@@ -4,6 +4,7 @@ OdinKey Password Manager - CLI Entry Point
 Usage:
     python cli_main.py --help
     python cli_main.py generate
+    python cli_main.py gen --algorithm passphrase --count 1000 --format ndjson --out passwords.ndjson
 """
 
 from src.cli.main import main
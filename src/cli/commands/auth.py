@@ -89,4 +89,27 @@ def logout():
         return True
     else:
         click.echo("Du bist gar nicht eingeloggt.")
-        return False
\ No newline at end of file
+        return False
+
+def change_password():
+    #Master-Passwort ändern - nur der Data-Key wird neu eingepackt, die Profile bleiben unverändert
+    if not session.is_active():
+        click.echo("Bitte zuerst einloggen.")
+        return False
+
+    old_password = getpass.getpass("Aktuelles Master-Passwort: ")
+    new_password = getpass.getpass("Neues Master-Passwort: ")
+    new_password_confirm = getpass.getpass("Neues Passwort wiederholen: ")
+    if new_password != new_password_confirm:
+        click.echo("Fehler: Passwörter stimmen nicht überein.")
+        return False
+
+    try:
+        data_key = service.change_master_password(session.account.username, old_password, new_password)
+    except ValueError as e:
+        click.echo(f"Fehler: {str(e)}")
+        return False
+    # Der Data-Key bleibt gleich -> die Session läuft einfach weiter
+    session.start(session.account, data_key)
+    click.echo("Master-Passwort geändert.")
+    return True
@@ -1,10 +1,23 @@
+import csv
+import io
+import json
+import os
+import sys
 import threading
 import time
+from functools import partial
 import click
 import pyperclip
 from colorama import Fore, Style
-
+from src.crypto import entropy
+from src.crypto.bloom import DEFAULT_ERROR_RATE
+from src.database.connection import db as db_conn
+from src.database.generation_history_repository import GenerationHistoryRepository
+from src.database.repository import MasterAccountRepository
+from src.services.master_account_service import MasterAccountService
 from src.services.password_generator_service import PasswordGeneratorService
+from src.services.sharded_generator import GenerationCancelled, ShardedGenerator
+from src.services.uniqueness_guard import UniquenessGuard
 """
 click.option Aufbau
 Name (mind eines getrennt mit einem ','), Defaultwert, Helpausgabe
@@ -67,6 +80,8 @@ def _display_result(result: dict):
         print("\n" + Fore.YELLOW + "Passwort:" + Style.RESET_ALL)
         print("  " + Fore.CYAN + password + Style.RESET_ALL)
         print(f"  Länge: {result['length']} Zeichen")
+        if 'entropy' in result:
+            print(f"  Entropie: {_format_entropy(result['entropy'])}")
 
         if 'algorithm' in result:
             print(f"  Algorithmus: {result['algorithm']}")
@@ -75,6 +90,8 @@ def _display_result(result: dict):
 
     elif result:
         print("\n" + Fore.RED + f"✗ Fehler: {result['error']}" + Style.RESET_ALL)
+def _format_entropy(bits: float) -> str:
+    return f"{bits:.1f} Bit ({entropy.rate(bits)})"
 def get_wordlist_size() -> int:
     return len(service.wordlist)
 # logic
@@ -97,6 +114,7 @@ def generate_random(length, uppercase, lowercase, digits, special, copy):
         print(Fore.GREEN + "Passwort wurde generiert!" + Style.RESET_ALL)
         print()
         print("  " + Fore.CYAN + password + Style.RESET_ALL)
+        print(f"  Entropie: {_format_entropy(result['entropy'])}")
         print()
 
         if copy:
@@ -300,9 +318,13 @@ def gen_wildcard_menu():
     print(f"  {Fore.GREEN}@{Style.RESET_ALL} - Buchstabe (a-z, A-Z)")
     print(f"  {Fore.GREEN}?{Style.RESET_ALL} - Beliebiges Zeichen (Buchstabe + Ziffer)")
     print(f"  {Fore.GREEN}!{Style.RESET_ALL} - Sonderzeichen")
+    print(f"  {Fore.GREEN}[a-f0-9]{Style.RESET_ALL} - Eigene Zeichenklasse")
+    print(f"  {Fore.GREEN}{{4}} / {{2,6}}{Style.RESET_ALL} - Wiederholung des vorherigen Elements")
+    print(f"  {Fore.GREEN}\\#{Style.RESET_ALL} - Escape (Zeichen wörtlich übernehmen)")
 
-    print(f"\n{Fore.YELLOW}Beispiel:{Style.RESET_ALL}")
+    print(f"\n{Fore.YELLOW}Beispiele:{Style.RESET_ALL}")
     print(f"  {Fore.CYAN}OdinKey-####-@@@@{Style.RESET_ALL}  → OdinKey-8374-Kfwq")
+    print(f"  {Fore.CYAN}OdinKey-#{{4}}-[A-F]{{2,4}}{Style.RESET_ALL}  → OdinKey-0193-CEB")
 
     template = input(f"\n{Fore.CYAN}Template: {Style.RESET_ALL}").strip()
 
@@ -317,6 +339,154 @@ def gen_wildcard_menu():
     _display_result(result)
 
 
+# Non-interactive bulk generation: odinkey gen ...
+OUTPUT_FORMATS = ("plain", "ndjson", "csv")
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB Schreibpuffer für --out
+
+
+def format_batch(batch: list[str], fmt: str, start_index: int) -> str:
+    """Formatiert einen Batch als einen zusammenhängenden String (ein write() pro Batch)."""
+    if fmt == "plain":
+        return "".join(f"{password}\n" for password in batch)
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({"index": i, "password": password}) + "\n"
+            for i, password in enumerate(batch, start_index)
+        )
+    if fmt == "csv":
+        # Sonderzeichen wie ',' oder '"' werden vom csv-Modul korrekt gequotet
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows(enumerate(batch, start_index))
+        return buffer.getvalue()
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def _format_batches(batches, fmt: str):
+    start = 0
+    for batch in batches:
+        yield format_batch(batch, fmt, start)
+        start += len(batch)
+
+
+def _vault_guard(username: str, error_rate: float, initial_capacity: int) -> UniquenessGuard:
+    """Verlauf des Tresors laden - der HMAC-Schlüssel hängt am Vault-Key, also einmal anmelden."""
+    password = click.prompt(f"Master-Passwort für {username}", hide_input=True, err=True)
+    result = MasterAccountService(MasterAccountRepository(db_conn)).login(username, password)
+    if result is None:
+        raise click.ClickException("Login fehlgeschlagen. Falscher Username oder Passwort.")
+    account, vault_key = result
+    return UniquenessGuard.for_vault(
+        vault_key, GenerationHistoryRepository(db_conn), account.id, error_rate, initial_capacity
+    )
+
+
+@click.command("gen")
+@click.option("--algorithm", "-a", type=click.Choice(PasswordGeneratorService.ALGORITHMS), default="random",
+              show_default=True, help="Generierungs-Algorithmus")
+@click.option("--template", "-t", default=None, help="Wildcard-Template (ersetzt --algorithm), z.B. 'Key-#{4}'")
+@click.option("--regex", "-x", default=None,
+              help="Regulärer Ausdruck (ersetzt --algorithm), z.B. '[A-Z]{3}-\\d{6}'; --length nur bei * und +")
+@click.option("--rule", "-r", default=None,
+              help="Passwort-Regel (ersetzt alle anderen Optionen), z.B. 'minlength: 12; required: digit'")
+@click.option("--count", "-n", type=click.IntRange(min=0), default=1, show_default=True, help="Anzahl Passwörter")
+@click.option("--length", "-l", type=int, default=16, show_default=True, help="Länge (random/pronounceable/passphrase)")
+@click.option("--uppercase/--no-uppercase", default=True, help="Großbuchstaben")
+@click.option("--lowercase/--no-lowercase", default=True, help="Kleinbuchstaben")
+@click.option("--digits/--no-digits", default=True, help="Ziffern")
+@click.option("--special/--no-special", default=True, help="Sonderzeichen")
+@click.option("--entropy", "target_entropy", type=click.FloatRange(min=1), default=None,
+              help="Gewünschte Stärke in Bit - wählt Länge bzw. Wortanzahl automatisch (ersetzt --length)")
+@click.option("--wordlist", default=None, help="Wortliste für passphrase (z.B. eff-short, eff-large, eigene)")
+@click.option("--unique", is_flag=True, default=False,
+              help="Garantiert keine Duplikate (Bloom-Filter über HMAC-Fingerprints, nur für diesen Lauf)")
+@click.option("--history", "history_user", metavar="USERNAME", default=None,
+              help="Wie --unique, aber gegen den gespeicherten Verlauf dieses Tresors (fragt das Master-Passwort)")
+@click.option("--unique-error-rate", type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+              default=DEFAULT_ERROR_RATE, show_default=True,
+              help="Falsch-positiv-Rate des Filters (ein neues Passwort wird unnötig neu gezogen)")
+@click.option("--format", "-f", "fmt", type=click.Choice(OUTPUT_FORMATS), default="plain", show_default=True,
+              help="Ausgabeformat")
+@click.option("--out", "-o", type=click.Path(dir_okay=False, writable=True, allow_dash=True), default="-",
+              help="Ausgabedatei (Standard: stdout)")
+@click.option("--batch-size", type=click.IntRange(min=1), default=10_000, show_default=True,
+              help="Passwörter pro Batch (bestimmt den Speicherbedarf)")
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=1, show_default=True,
+              help="Anzahl Prozesse für die Generierung")
+def gen_command(algorithm, template, regex, rule, count, length, uppercase, lowercase, digits, special,
+                target_entropy, wordlist, unique, history_user, unique_error_rate, fmt, out, batch_size, workers):
+    """Generiert Passwörter ohne Menü und streamt sie nach stdout oder in eine Datei."""
+    options = dict(
+        algorithm=algorithm, length=length, template=template, wordlist=wordlist, rule=rule, regex=regex,
+        use_uppercase=uppercase, use_lowercase=lowercase, use_digits=digits, use_special=special
+    )
+    if target_entropy is not None and (template or rule or regex):
+        # Template, Regel und Regex legen die Länge selbst fest -> --entropy hätte keine Wirkung
+        raise click.UsageError("--entropy lässt sich nicht mit --template, --rule oder --regex kombinieren")
+    try:
+        if target_entropy is not None:
+            options["length"] = service.length_for_entropy(
+                target_entropy, algorithm, uppercase, lowercase, digits, special, wordlist=wordlist
+            )
+        # Optionen einmal vorab prüfen, bevor Datei/Prozesse angelegt werden
+        service.generate_batch(1, **options)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    if history_user:
+        # Auch über Läufe hinweg keine Wiederholung; der Verlauf wird am Ende gespeichert
+        guard = _vault_guard(history_user, unique_error_rate, max(count, 1))
+    elif unique:
+        guard = UniquenessGuard(error_rate=unique_error_rate, initial_capacity=max(count, 1))
+    else:
+        guard = None
+    if workers > 1:
+        # Shards werden in den Worker-Prozessen generiert und gleich formatiert
+        sharded = ShardedGenerator(workers=workers, shard_size=batch_size)
+        chunks = sharded.iter_shards(count, formatter=partial(format_batch, fmt=fmt), unique=guard, **options)
+    else:
+        sharded = None
+        chunks = _format_batches(service.iter_batches(count, batch_size, unique=guard, **options), fmt)
+
+    if out == "-":
+        stream, close = sys.stdout, False
+    else:
+        stream, close = open(out, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE), True
+
+    written = 0
+    try:
+        if fmt == "csv":
+            stream.write("index,password\n")
+        for chunk in chunks:
+            stream.write(chunk)
+            written += chunk.count("\n")
+        stream.flush()
+    except BrokenPipeError:
+        # z.B. 'odinkey gen -n 1000000 | head': Leser ist weg. stdout auf devnull umbiegen,
+        # damit der Flush beim Beenden nicht noch einmal scheitert (siehe Python-Doku zu SIGPIPE)
+        if stream is sys.stdout:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    except ValueError as e:
+        # z.B. --unique bei erschöpftem Ausgaberaum
+        raise click.ClickException(str(e))
+    except GenerationCancelled as e:
+        # Abgebrochene Shards: Ausgabe ist unvollständig -> Fehler-Exit statt stillem Ende
+        raise click.ClickException(f"{e} - Ausgabe ist unvollständig ({written} Zeilen geschrieben)")
+    finally:
+        if sharded is not None:
+            sharded.shutdown()
+        if close:
+            stream.close()
+        if history_user:
+            # Auch bei Abbruch: was ausgegeben wurde, steht im Verlauf
+            guard.save()
+
+    if out != "-":
+        click.echo(f"{written} Passwörter nach {out} geschrieben", err=True)
+
+
 # testing stuff
 if __name__ == '__main__':
     print("=== Generator Command Tests ===\n")
@@ -1,5 +1,4 @@
 import getpass
-import sqlite3
 from colorama import Fore, Style
 
 from src.core.session import session
@@ -79,17 +78,13 @@ def list_passwords(interactive=True):
 
     user_id = session.account.id
 
-    conn = db_conn.connect()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("SELECT id, service_name, username, url FROM password_profiles WHERE user_id = ?", (user_id,))
-        rows = cursor.fetchall()
+        # Nur Metadaten laden (Covering Index) - entschlüsselt wird erst bei reveal_password()
+        repo_profile = PasswordProfileRepository(db_conn, session.get_master_key())
+        rows = repo_profile.list_profiles(user_id)
 
         if not rows:
             print(Fore.YELLOW + "Keine Passwörter gefunden." + Style.RESET_ALL)
-            conn.close()
             return
 
         # Tabelle ausgeben
@@ -97,10 +92,7 @@ def list_passwords(interactive=True):
         print("-" * 70)
 
         for row in rows:
-            s_name = row['service_name'] if row['service_name'] else ""
-            u_name = row['username'] if row['username'] else ""
-            url = row['url'] if row['url'] else ""
-            print(f"{row['id']:<5} {s_name:<20} {u_name:<25} {url}")
+            print(f"{row.id:<5} {row.service_name or '':<20} {row.username or '':<25} {row.url or ''}")
 
         print("-" * 70)
 
@@ -112,8 +104,6 @@ def list_passwords(interactive=True):
 
     except Exception as e:
         print(Fore.RED + f"Fehler beim Laden: {e}" + Style.RESET_ALL)
-    finally:
-        conn.close()
 
 
 def reveal_password(profile_id):
@@ -145,27 +135,18 @@ def delete():
     if not session.is_active():
         return
 
-    conn = db_conn.connect()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT id, service_name, username FROM password_profiles WHERE user_id = ?",
-            (session.account.id,)
-        )
-        rows = cursor.fetchall()
+    repo_profile = PasswordProfileRepository(db_conn, session.get_master_key())
+    rows = repo_profile.list_profiles(session.account.id)
 
-        if not rows:
-            print(Fore.YELLOW + "Keine Passwörter gefunden." + Style.RESET_ALL)
-            return
+    if not rows:
+        print(Fore.YELLOW + "Keine Passwörter gefunden." + Style.RESET_ALL)
+        return
 
-        print(f"\n{Fore.CYAN}{'ID':<5} {'Service':<20} {'Username'}{Style.RESET_ALL}")
-        print("-" * 45)
-        for row in rows:
-            print(f"{row['id']:<5} {row['service_name'] or '':<20} {row['username'] or ''}")
-        print("-" * 45)
-    finally:
-        conn.close()
+    print(f"\n{Fore.CYAN}{'ID':<5} {'Service':<20} {'Username'}{Style.RESET_ALL}")
+    print("-" * 45)
+    for row in rows:
+        print(f"{row.id:<5} {row.service_name or '':<20} {row.username or ''}")
+    print("-" * 45)
 
     id_str = input("\nID löschen (oder Enter): ").strip()
     if not id_str:
@@ -174,13 +155,15 @@ def delete():
     try: #FMR11
         profile_id = int(id_str)
 
-        print(Fore.YELLOW + "Master-Passwort erforderlich" + Style.RESET_ALL)
-        print("Master-Passwort: ", end="", flush=True)
-        conf_pw = getpass.getpass("")
-
-        repo_profile = PasswordProfileRepository(db_conn, session.get_master_key())
         profile_service = PasswordProfileService(repo_profile, service)
 
+        # Passwort nur abfragen, wenn es nicht gerade erst bestätigt wurde
+        conf_pw = None
+        if profile_service.requires_reauth():
+            print(Fore.YELLOW + "Master-Passwort erforderlich" + Style.RESET_ALL)
+            print("Master-Passwort: ", end="", flush=True)
+            conf_pw = getpass.getpass("")
+
         profile_service.delete_profile_securely(
             profile_id=profile_id,
             username=session.account.username,
@@ -242,7 +225,7 @@ def edit():
     # Repository & Service holen
     profile_repo = PasswordProfileRepository(db_conn, session.get_master_key())
 
-    # Wir nutzen die existierende Suchfunktion des Repositories
+    # Wir nutzen die existierende Suchfunktion des Repositories (nur Metadaten, keine Entschlüsselung)
     profiles = profile_repo.search_profiles(session.account.id, search_term)
 
     if not profiles:
@@ -261,13 +244,15 @@ def edit():
         print("Ungültige Eingabe.")
         return
 
-    # Das korrekte Profil aus der Liste picken
-    target_profile = next((p for p in profiles if p.id == profile_id), None)
-
-    if not target_profile:
+    # Nur IDs aus den Suchergebnissen sind erlaubt
+    if not any(p.id == profile_id for p in profiles):
         print("ID nicht in den Suchergebnissen.")
         return
 
+    # Erst jetzt das ganze Profil laden - das Passwort bleibt verschlüsselt,
+    # solange kein neues eingegeben wird (Lazy-Entschlüsselung)
+    target_profile = profile_repo.get_profile_by_id(profile_id)
+
     print(f"\nBearbeite: {target_profile.service_name}")
     print("(Lass das Feld leer, um den alten Wert zu behalten)")
 
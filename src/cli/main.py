@@ -56,6 +56,7 @@ def print_menu_logged_in(username):
     print(f" {Fore.CYAN}manage{Style.RESET_ALL}   - Profile verwalten (Edit/Delete)") # NEU
     print(f" {Fore.CYAN}generate{Style.RESET_ALL} - Passwort generieren")
     print(f" {Fore.CYAN}search{Style.RESET_ALL}   - Nach Einträgen suchen")
+    print(f" {Fore.CYAN}passwd{Style.RESET_ALL}   - Master-Passwort ändern")
     print(f" {Fore.CYAN}logout{Style.RESET_ALL}   - Tresor schließen")
     print("-" * 30)
 
@@ -97,6 +98,7 @@ COMMANDS = {
     'login': cmd_login,
     'register': auth.register,
     'logout': auth.logout,
+    'passwd': auth.change_password,
     # generator
     'generate': generator.generate,
     'gen': generator.generate,
@@ -149,9 +151,16 @@ def interactive_loop():
             print(Fore.RED + f"Kritischer Fehler: {e}" + Style.RESET_ALL)
             traceback.print_exc()
 
-@click.command()
-def main():
-    interactive_loop()
+@click.group(invoke_without_command=True)
+@click.pass_context
+def main(ctx):
+    """OdinKey: ohne Befehl startet das interaktive Menü."""
+    if ctx.invoked_subcommand is None:
+        interactive_loop()
+
+
+# Nicht-interaktive Befehle (z.B. odinkey gen --count 1000 --format ndjson)
+main.add_command(generator.gen_command)
 
 
 if __name__ == '__main__':
@@ -4,5 +4,6 @@ Zuständig für die Hauptfunktionen sowie
 master_account: Masteraccount Verwaltung
 password_profile: Passwortprofil hinzufügen/verwalten
 session: "Session Management" -> Auto-Logout
+password_strength: inkrementelle Stärke-Anzeige für eingetippte Passwörter
 """
 from .session import session, SessionInactiveError
\ No newline at end of file
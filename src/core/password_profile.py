@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Callable, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -22,6 +22,8 @@ class PasswordProfile:
     id: Optional[int] = None # Datenbank-ID (erst nach speichern vorhanden)
     notes: Optional[str] = None #Freitext Notizen des Nutzers
     created_at: Optional[str] = None #Zeitstempel der Erstellung (ISO-Format)
+    updated_at: Optional[str] = None #Zeitstempel der letzten Änderung (ISO-Format, setzt das Repository)
+    password_rule: Optional[str] = None #Passwort-Regel des Dienstes (siehe crypto/password_rules.py)
 
     def __post_init__(self):
         #Sezielle Methode von DataClass - wird automatisch nach Erstellung des Objekts ausgeführt
@@ -87,7 +89,9 @@ class PasswordProfile:
             "username": self.username,
             "password": self.password,
             "notes": self.notes,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "password_rule": self.password_rule
         }
 
     @classmethod
@@ -101,7 +105,69 @@ class PasswordProfile:
             username=data.get("username"),  # Hier hieß es vorher "name"
             password=data.get("password"),
             notes=data.get("notes"),
-            created_at=data.get("created_at")
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at"),
+            password_rule=data.get("password_rule")
         )
 
 
+class LazyPasswordProfile(PasswordProfile):
+    """
+    PasswordProfile aus der Datenbank, dessen Passwort erst beim ersten Zugriff entschlüsselt wird.
+    Danach bleibt der Klartext in diesem Objekt gecacht (nur eine AES-Operation pro Objekt).
+    Wird nie auf .password zugegriffen, findet gar keine Entschlüsselung statt.
+    """
+
+    def __init__(self, decrypt: Callable[[], str], **fields):
+        # muss vor super().__init__ stehen, weil der Dataclass-Konstruktor den Setter aufruft
+        self._decrypt = decrypt
+        super().__init__(password=None, **fields)
+
+    @property
+    def password(self) -> str:
+        if self._decrypt is not None:
+            self._password = self._decrypt()
+            self._decrypt = None
+        return self._password
+
+    @password.setter
+    def password(self, value: Optional[str]):
+        if value is None and self._decrypt is not None:
+            # Aufruf aus dem Dataclass-Konstruktor -> Entschlüsselung bleibt ausstehend
+            self._password = None
+            return
+        # Neues Passwort gesetzt -> das verschlüsselte alte brauchen wir nicht mehr
+        self._password = value
+        self._decrypt = None
+
+    @property
+    def is_decrypted(self) -> bool:
+        """True, wenn das Passwort entschlüsselt oder neu gesetzt wurde."""
+        return self._decrypt is None
+
+    def __repr__(self) -> str:
+        # Das generierte __repr__ würde .password lesen und damit entschlüsseln
+        return (f"LazyPasswordProfile(id={self.id!r}, user_id={self.user_id!r}, "
+                f"service_name={self.service_name!r}, username={self.username!r})")
+
+
+@dataclass(frozen=True)
+class ProfileSummary:
+    """
+    Leichte Projektion eines Profils nur mit Metadaten (ohne Passwort).
+    Für Listen und Suchergebnisse - die Datenbank liefert dafür keine verschlüsselten Spalten.
+    """
+    id: int
+    user_id: int
+    service_name: str
+    username: Optional[str]
+    url: Optional[str]
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "service_name": self.service_name,
+            "username": self.username,
+            "url": self.url
+        }
@@ -0,0 +1,251 @@
+import math
+import string
+import sys
+from functools import lru_cache
+from typing import Optional
+
+from src.crypto import entropy
+from src.crypto.wordstore import DEFAULT_WORDLIST_NAME, WordlistError, get_wordstore
+
+"""
+Inkrementelle Stärke-Anzeige für Passwörter, die von Hand eingetippt werden.
+
+Geschätzt wird wie bei zxcvbn die Zahl der Rateversuche (in Bit): das Passwort wird in Stücke
+zerlegt - Wörter aus der Wortliste, Wiederholungen (aaaa), Folgen (abcd, 9876) oder einzelne
+Zeichen - und die billigste Zerlegung zählt. Diese Zerlegung ist ein kürzester Weg über die
+Positionen; das Optimum für die ersten i Zeichen hängt nur von den Optima davor ab.
+
+Deshalb speichert der Meter pro Position einen kleinen Zustand (Klassen-Zähler, Lauflängen,
+offene Knoten im Wort-Trie, bestes Ergebnis bis hier). append() rechnet genau eine Position
+dazu, pop() wirft die letzte weg - beides O(1), unabhängig von der Passwortlänge (nur die
+maximale Wortlänge der Liste begrenzt die Zahl offener Trie-Knoten). set_text() verwirft nur
+die Positionen ab der ersten Änderung: Tippen und Löschen am Ende kosten einen Schritt plus
+einen Vergleich mit dem bisherigen Text (startswith, linear aber in C); nur Änderungen
+mitten im Passwort suchen die erste Abweichung Zeichen für Zeichen.
+"""
+
+# Größe des Zeichenvorrats, den ein Angreifer pro Zeichen durchprobieren muss
+UPPER, LOWER, DIGIT, SPECIAL, OTHER = range(5)
+CARDINALITY = (26, 26, 10, len(string.punctuation), 100)
+
+MIN_WORD_LENGTH = 3
+MIN_RUN_LENGTH = 3  # ab hier zählen Wiederholungen und Folgen als Muster
+
+# Übliche Ersetzungen (p4ssw0rd); ein Zeichen kann für mehrere Buchstaben stehen
+LEET = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "3": "e", "6": "g", "1": "il", "!": "i",
+    "|": "il", "0": "o", "$": "s", "5": "s", "7": "t", "+": "t", "2": "z",
+}
+
+_END = ""  # Markierung im Trie: hier endet ein Wort
+
+
+@lru_cache(maxsize=None)
+def compile_trie(name: str = DEFAULT_WORDLIST_NAME) -> tuple[dict, int]:
+    """(Trie aus verschachtelten dicts, Anzahl Wörter) - einmal pro Prozess und Liste gebaut."""
+    try:
+        words = get_wordstore(name)
+    except (OSError, WordlistError) as e:
+        print(f"Strength meter without wordlist '{name}': {e}", file=sys.stderr)
+        words = []
+    root = {}
+    count = 0
+    for word in words:
+        word = word.strip().lower()
+        if len(word) < MIN_WORD_LENGTH or not word.isalpha():
+            continue
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            node[_END] = True
+            count += 1
+    return root, count
+
+
+def _char_class(char: str) -> int:
+    if char in string.ascii_uppercase:
+        return UPPER
+    if char in string.ascii_lowercase:
+        return LOWER
+    if char in string.digits:
+        return DIGIT
+    if char in string.punctuation:
+        return SPECIAL
+    return OTHER
+
+
+class _Position:
+    """Zustand nach den ersten i Zeichen."""
+    __slots__ = ("counts", "run", "step", "sequence", "active", "bits", "patterns")
+
+    def __init__(self, counts, run, step, sequence, active, bits, patterns):
+        self.counts = counts        # Zeichen pro Klasse
+        self.run = run              # Länge der Wiederholung am Ende (aaa -> 3)
+        self.step = step            # Abstand der letzten beiden Codepoints
+        self.sequence = sequence    # Länge der Folge mit Abstand +-1 am Ende (abc -> 3)
+        self.active = active        # offene Trie-Knoten: (Knoten, Startposition, Ersetzungen)
+        self.bits = bits            # bestes Ergebnis für das Präfix
+        self.patterns = patterns    # (Wörter, Wiederholungen, Folgen) in dieser besten Zerlegung
+
+
+_EMPTY = _Position((0,) * len(CARDINALITY), 0, None, 0, (), 0.0, (0, 0, 0))
+
+
+class StrengthMeter:
+    """
+    Stärke eines Passworts, das Zeichen für Zeichen entsteht.
+
+        meter = StrengthMeter()
+        meter.set_text(entry.get())   # bei jedem Tastendruck
+        meter.bits, meter.score, meter.patterns
+    """
+
+    def __init__(self, wordlist: str = DEFAULT_WORDLIST_NAME):
+        self._trie, words = compile_trie(wordlist)
+        self._word_bits = math.log2(words) if words > 1 else 0.0
+        self.clear()
+
+    def clear(self):
+        self._chars = []
+        self._text = ""
+        self._positions = [_EMPTY]
+
+    @property
+    def text(self) -> str:
+        if self._text is None:  # nach append()/pop() erst bei Bedarf zusammensetzen
+            self._text = "".join(self._chars)
+        return self._text
+
+    def __len__(self) -> int:
+        return len(self._chars)
+
+    def set_text(self, text: str) -> None:
+        """Auf neuen Inhalt bringen; nur ab der ersten Abweichung wird neu gerechnet."""
+        previous = self.text
+        # Häufigster Fall bei jedem Tastendruck: ein Zeichen am Ende dazu oder weg
+        if len(text) == len(previous) + 1 and text.startswith(previous):
+            self.append(text[-1])
+        elif len(text) == len(previous) - 1 and previous.startswith(text):
+            self.pop()
+        else:
+            self._replace_from_first_difference(text)
+        self._text = text
+
+    def _replace_from_first_difference(self, text: str) -> None:
+        common = 0
+        limit = min(len(text), len(self._chars))
+        while common < limit and self._chars[common] == text[common]:
+            common += 1
+        del self._chars[common:]
+        del self._positions[common + 1:]
+        for char in text[common:]:
+            self.append(char)
+
+    def pop(self) -> None:
+        if self._chars:
+            self._chars.pop()
+            self._text = None
+            self._positions.pop()
+
+    def append(self, char: str) -> None:
+        index = len(self._chars)
+        previous = self._positions[-1]
+        last = self._chars[-1] if self._chars else None
+        self._chars.append(char)
+        self._text = None
+
+        kind = _char_class(char)
+        counts = list(previous.counts)
+        counts[kind] += 1
+
+        run = previous.run + 1 if char == last else 1
+        step = ord(char) - ord(last) if last is not None else None
+        if step in (-1, 1):
+            sequence = previous.sequence + 1 if step == previous.step else 2
+        else:
+            sequence = 1
+
+        active, words = self._advance(previous.active, char, index)
+
+        # Kandidaten für das beste Ergebnis: (Bit, Start, welches Muster)
+        positions = self._positions
+        char_bits = math.log2(CARDINALITY[kind])
+        best = (previous.bits + char_bits, previous.patterns)
+        if run >= MIN_RUN_LENGTH:
+            start = index + 1 - run
+            best = min(best, (positions[start].bits + char_bits + math.log2(run),
+                              _bump(positions[start].patterns, 1)))
+        if sequence >= MIN_RUN_LENGTH:
+            start = index + 1 - sequence
+            first_bits = math.log2(CARDINALITY[_char_class(self._chars[start])])
+            # + 1 Bit für die Richtung
+            best = min(best, (positions[start].bits + first_bits + math.log2(sequence) + 1,
+                              _bump(positions[start].patterns, 2)))
+        for start, substitutions in words:
+            bits = (positions[start].bits + self._word_bits + substitutions
+                    + self._case_bits(start, counts[UPPER] - positions[start].counts[UPPER]))
+            best = min(best, (bits, _bump(positions[start].patterns, 0)))
+
+        self._positions.append(_Position(tuple(counts), run, step, sequence, active, best[0], best[1]))
+
+    def _advance(self, active: tuple, char: str, index: int) -> tuple[tuple, list]:
+        """Alle offenen Trie-Pfade um char verlängern; liefert neue Pfade und hier endende Wörter."""
+        lower = char.lower()
+        variants = [(lower, 0)] + [(letter, 1) for letter in LEET.get(char, "")]
+        advanced = []
+        words = []
+        for node, start, substitutions in active + ((self._trie, index, 0),):
+            for letter, cost in variants:
+                child = node.get(letter)
+                if child is None:
+                    continue
+                path = (child, start, substitutions + cost)
+                advanced.append(path)
+                if _END in child and index + 1 - start >= MIN_WORD_LENGTH:
+                    words.append((start, path[2]))
+        return tuple(advanced), words
+
+    def _case_bits(self, start: int, uppercase: int) -> float:
+        """Groß-/Kleinschreibung eines Wortes: klein, Großer Anfang oder GANZ GROSS kosten je ~1 Bit."""
+        length = len(self._chars) - start
+        if uppercase == 0:
+            return 0.0
+        if uppercase == length or (uppercase == 1 and self._chars[start].isupper()):
+            return 1.0
+        return float(length)  # gemischt: jede Position kann groß oder klein sein
+
+    @property
+    def bits(self) -> float:
+        return self._positions[-1].bits
+
+    @property
+    def score(self) -> int:
+        """0 (schwach) bis len(entropy.RATINGS) (sehr stark), gleiche Grenzen wie bei den Generatoren."""
+        return sum(self.bits >= limit for limit, _ in entropy.RATINGS)
+
+    @property
+    def label(self) -> str:
+        return entropy.rate(self.bits)
+
+    @property
+    def patterns(self) -> dict:
+        """Muster in der billigsten Zerlegung - Grundlage für Hinweise in der Oberfläche."""
+        words, repeats, sequences = self._positions[-1].patterns
+        return {"words": words, "repeats": repeats, "sequences": sequences}
+
+    @property
+    def classes(self) -> int:
+        """Anzahl verwendeter Zeichenklassen."""
+        return sum(1 for count in self._positions[-1].counts if count)
+
+
+def _bump(patterns: tuple, which: int) -> tuple:
+    return tuple(count + (i == which) for i, count in enumerate(patterns))
+
+
+def estimate(password: str, wordlist: Optional[str] = None) -> float:
+    """Einmalige Schätzung in Bit (ohne inkrementellen Zustand)."""
+    meter = StrengthMeter(wordlist or DEFAULT_WORDLIST_NAME)
+    meter.set_text(password)
+    return meter.bits
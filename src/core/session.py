@@ -24,9 +24,15 @@ class _Session:
     Tests can inject their own time provider to simulate passing minutes.
     """
 
-    def __init__(self, time_provider: Callable[[], float] = time.time, timeout_seconds: int = 600): #FMR13, NFMR8
+    def __init__(self, time_provider: Callable[[], float] = time.time, timeout_seconds: int = 600,
+                 reauth_seconds: int = 120): #FMR13, NFMR8
         self._time = time_provider
         self.timeout_seconds = timeout_seconds
+        # How long a confirmed master password covers further sensitive actions (0 = always ask)
+        self.reauth_seconds = reauth_seconds
+
+        # Absolute time until which the last re-authentication is valid, or None
+        self._reauth_until: Optional[float] = None
 
         # Absolute expiry time in seconds, or None if no session is active
         self._expiry: Optional[float] = None
@@ -60,6 +66,7 @@ class _Session:
             self.account = account
             self._master_key = master_key
             self._expiry = self._time() + self.timeout_seconds
+            self._reauth_until = None
 
         # Stop old thread if exists
         if self._monitor_thread and self._monitor_thread.is_alive():
@@ -106,6 +113,7 @@ class _Session:
         """Internal cleanup (must be called with lock held)."""
         self._expiry = None
         self._master_key = None
+        self._reauth_until = None
         self.account = None
 
     def is_active(self) -> bool:
@@ -138,6 +146,27 @@ class _Session:
         with self._lock:
             self._cleanup_internal()
 
+    def grant_reauth(self) -> None:
+        """
+        Remember that the master password was just confirmed.
+        A burst of sensitive actions (e.g. deleting several entries) then needs only one check.
+        """
+        with self._lock:
+            if self._expiry is None:
+                return
+            self._reauth_until = self._time() + self.reauth_seconds
+
+    def has_recent_auth(self) -> bool:
+        """Return True while the last re-authentication grant is still valid."""
+        with self._lock:
+            if self._expiry is None or self._reauth_until is None:
+                return False
+            return self._time() < self._reauth_until
+
+    def revoke_reauth(self) -> None:
+        with self._lock:
+            self._reauth_until = None
+
     def get_master_key(self) -> bytes:
         """
         Return the master key if session is active; otherwise raise SessionInactiveError.
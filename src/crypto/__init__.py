@@ -2,5 +2,12 @@
 Crypto Module
 encryption.py: Verschlüsselung für Passwortprofile mit AES-256-GCM
 generator.py: Passwort-Generator mit CSPRNG
-hashing.py: Hashing für das Masterpasswort mit ARGON2
+kdf.py: Schlüsselableitung (PBKDF2, scrypt, Argon2id) mit Kalibrierung
+bulk.py: Parallele Ver-/Entschlüsselung für Export, Audit und Re-Keying
+template.py: Kompilierte Wildcard-Templates (Quantoren, Klassen, Escapes)
+random_source.py: Gepufferte Zufallsquellen (urandom-Pool, AES-CTR-DRBG)
+wordstore.py: Registry benannter Wortlisten, geprüft und vorkompiliert (mmap, Cache nach Inhalts-Hash)
+entropy.py: Exakte Entropie aus den Generator-Parametern (gecacht)
+markov.py: Trigramm-Modell für aussprechbare Passwörter (vortrainiert in src/data/pronounceable.bin)
+hashing.py: Login-Verifier (HKDF aus dem Root-Secret), alte Accounts mit ARGON2-Hash
 """
\ No newline at end of file
@@ -0,0 +1,242 @@
+import hashlib
+import math
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from typing import Iterable
+
+"""
+Skalierbarer Bloom-Filter (Almeida et al. 2007) für 32-Byte-Fingerprints (z.B. HMAC-SHA256 eines Passworts).
+
+Ein einzelner Filter hat feste Kapazität. Ist er voll, kommt ein neuer, doppelt so großer mit
+r-facher Fehlerrate dazu; die Gesamt-Fehlerrate bleibt so unter error_rate (geometrische Reihe:
+p * (1 - r) * (1 + r + r^2 + ...) = p), egal wie viele Einträge es werden.
+
+Jeder Filter ist "blocked": alle Bits eines Eintrags liegen in EINEM 512-Bit-Block (eine Cache-Line).
+Die k Bits kommen aus drei festen Tabellen mit je 4096 vorberechneten Bitmustern ("pattern-blocked"):
+der Fingerprint wählt Block und drei Muster, die Maske ist deren ODER. Prüfen und Setzen sind damit
+je eine Maske und ein Zugriff statt k einzelner Bit-Operationen. Der Preis ist etwas mehr Speicher als
+beim klassischen Filter: bei p = 1e-6 ~5 Byte pro Eintrag im ersten Filter, über 10 Mio. Einträge
+(7 Filter, jeder mit kleinerer Rate) ~7 Byte plus Reserve im zuletzt angelegten Filter.
+
+Falsch-positiv heißt hier: ein neues Passwort wird fälschlich für ein Duplikat gehalten und neu
+gezogen. Falsch-negativ (ein echtes Duplikat wird übersehen) kann nicht passieren.
+"""
+
+DEFAULT_ERROR_RATE = 1e-6
+DEFAULT_INITIAL_CAPACITY = 100_000
+GROWTH = 2
+TIGHTENING = 0.8  # Almeida et al. empfehlen 0.8-0.9 bei Wachstum 2
+
+BLOCK_BITS = 512
+BLOCK_BYTES = BLOCK_BITS // 8
+MAX_HASHES = 24
+FINGERPRINT_SIZE = 32
+PATTERN_TABLES = 3
+PATTERNS_PER_TABLE = 4096
+
+MAGIC = b"OKBLOOM1"
+_HEADER = struct.Struct("<8sdQI")    # Magic, error_rate, initial_capacity, Anzahl Filter
+_FILTER = struct.Struct("<QQdIQ")    # capacity, count, error_rate, Anzahl Hashes, Anzahl Blöcke
+
+
+def _pattern_bits(hashes: int) -> list[int]:
+    # k Bits auf die Tabellen verteilt, z.B. 14 -> [5, 5, 4]
+    return [hashes // PATTERN_TABLES + (table < hashes % PATTERN_TABLES) for table in range(PATTERN_TABLES)]
+
+
+def _block_false_positive_rate(bits_per_entry: float, hashes: int) -> float:
+    """
+    Einträge pro Block sind Poisson-verteilt; je Block gilt die klassische Formel. Dazu kommt der Fall,
+    dass die Anfrage in einer Tabelle dasselbe Muster trifft wie ein Eintrag im Block - dann sind diese
+    Bits sicher gesetzt und nur die übrigen zählen.
+    """
+    def classic(bits: int, entries: int) -> float:
+        return (1 - (1 - 1 / BLOCK_BITS) ** (hashes * entries)) ** bits
+
+    load = BLOCK_BITS / bits_per_entry
+    total = 0.0
+    probability = math.exp(-load)
+    for entries in range(int(load + 12 * math.sqrt(load) + 30)):
+        rate = classic(hashes, entries)
+        same_pattern = 1 - (1 - 1 / PATTERNS_PER_TABLE) ** entries
+        rate += sum(same_pattern * classic(hashes - bits, entries) for bits in _pattern_bits(hashes))
+        total += probability * min(rate, 1.0)
+        probability *= load / (entries + 1)
+    return total
+
+
+@lru_cache(maxsize=None)
+def dimension(error_rate: float) -> tuple[int, float]:
+    """(Anzahl Hashes, Bit pro Eintrag) mit dem geringsten Speicher für diese Fehlerrate."""
+    best = None
+    for hashes in range(1, MAX_HASHES + 1):
+        low, high = 1.0, 4096.0 if best is None else best[1]
+        # Schafft dieses k die Rate nicht einmal mit dem bisher besten Speicher, kann es nicht besser sein
+        if _block_false_positive_rate(high, hashes) > error_rate:
+            continue
+        for _ in range(30):
+            middle = (low + high) / 2
+            if _block_false_positive_rate(middle, hashes) <= error_rate:
+                high = middle
+            else:
+                low = middle
+        if best is None or high < best[1]:
+            best = (hashes, high)
+    if best is None:
+        raise ValueError(f"Fehlerrate {error_rate} ist zu klein")
+    return best
+
+
+def _permutations(seed: bytes):
+    # Endlose Folge von Permutationen der Bit-Positionen (Fisher-Yates, Zufall aus SHA-256 im Zählermodus)
+    counter = 0
+    while True:
+        positions = list(range(BLOCK_BITS))
+        for i in range(BLOCK_BITS - 1, 0, -1):
+            digest = hashlib.sha256(seed + counter.to_bytes(8, "little")).digest()
+            counter += 1
+            j = int.from_bytes(digest[:8], "little") % (i + 1)
+            positions[i], positions[j] = positions[j], positions[i]
+        yield from positions
+
+
+@lru_cache(maxsize=None)
+def _patterns(table: int, bits: int) -> tuple[int, ...]:
+    """
+    PATTERNS_PER_TABLE Masken mit je 'bits' Bits im Block, aus aufeinanderfolgenden Permutationen
+    geschnitten - jede Position kommt gleich oft vor (sonst wären manche Bits überlastet).
+    Deterministisch: gespeicherte Filter müssen in jeder Version dieselben Muster sehen.
+    """
+    stream = _permutations(b"odinkey/bloom/%d/%d/" % (table, bits))
+    return tuple(
+        sum({1 << next(stream) for _ in range(bits)})
+        for _ in range(PATTERNS_PER_TABLE)
+    )
+
+
+def _words(fingerprint: bytes):
+    if len(fingerprint) < FINGERPRINT_SIZE:
+        raise ValueError(f"Fingerprint braucht mindestens {FINGERPRINT_SIZE} Byte")
+    if sys.byteorder == "little":
+        return memoryview(fingerprint[:FINGERPRINT_SIZE]).cast("H")
+    words = array("H", fingerprint[:FINGERPRINT_SIZE])
+    words.byteswap()
+    return words
+
+
+class BloomFilter:
+    """Blocked Bloom-Filter mit fester Kapazität."""
+
+    def __init__(self, capacity: int, error_rate: float, count: int = 0, bits: bytearray = None):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity muss >= 1 und error_rate zwischen 0 und 1 sein")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = count
+        self.hashes, bits_per_entry = dimension(error_rate)
+        self._tables = [_patterns(table, bits) for table, bits in enumerate(_pattern_bits(self.hashes))]
+        self.blocks = max(1, math.ceil(capacity * bits_per_entry / BLOCK_BITS))
+        self.bits = bits if bits is not None else bytearray(self.blocks * BLOCK_BYTES)
+        if len(self.bits) != self.blocks * BLOCK_BYTES:
+            raise ValueError("Bloom-Filter ist beschädigt")
+
+    def _locate(self, fingerprint: bytes) -> tuple[int, int]:
+        words = _words(fingerprint)
+        offset = (words[0] | words[1] << 16) % self.blocks * BLOCK_BYTES
+        first, second, third = self._tables
+        last = PATTERNS_PER_TABLE - 1
+        return offset, first[words[2] & last] | second[words[3] & last] | third[words[4] & last]
+
+    def __contains__(self, fingerprint: bytes) -> bool:
+        offset, mask = self._locate(fingerprint)
+        return int.from_bytes(self.bits[offset:offset + BLOCK_BYTES], "little") & mask == mask
+
+    def add(self, fingerprint: bytes) -> bool:
+        """Setzt die Bits; False, wenn alle schon gesetzt waren (Eintrag wahrscheinlich vorhanden)."""
+        offset, mask = self._locate(fingerprint)
+        block = int.from_bytes(self.bits[offset:offset + BLOCK_BYTES], "little")
+        if block & mask == mask:
+            return False
+        self.bits[offset:offset + BLOCK_BYTES] = (block | mask).to_bytes(BLOCK_BYTES, "little")
+        self.count += 1
+        return True
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """Folge von Bloom-Filtern mit wachsender Kapazität und sinkender Fehlerrate."""
+
+    def __init__(self, error_rate: float = DEFAULT_ERROR_RATE, initial_capacity: int = DEFAULT_INITIAL_CAPACITY):
+        if not 0 < error_rate < 1 or initial_capacity < 1:
+            raise ValueError("error_rate muss zwischen 0 und 1 liegen, initial_capacity >= 1 sein")
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self.filters: list[BloomFilter] = []
+
+    def _grow(self) -> BloomFilter:
+        index = len(self.filters)
+        bloom = BloomFilter(
+            self.initial_capacity * GROWTH ** index,
+            self.error_rate * (1 - TIGHTENING) * TIGHTENING ** index,
+        )
+        self.filters.append(bloom)
+        return bloom
+
+    def __contains__(self, fingerprint: bytes) -> bool:
+        # Neueste zuerst: dort liegen die meisten Einträge
+        return any(fingerprint in bloom for bloom in reversed(self.filters))
+
+    def add(self, fingerprint: bytes) -> bool:
+        """Fügt hinzu; False, wenn der Fingerprint (wahrscheinlich) schon enthalten war."""
+        if any(fingerprint in bloom for bloom in self.filters[:-1]):
+            return False
+        if self.filters and not self.filters[-1].is_full:
+            return self.filters[-1].add(fingerprint)
+        if self.filters and fingerprint in self.filters[-1]:
+            return False
+        return self._grow().add(fingerprint)
+
+    def update(self, fingerprints: Iterable[bytes]) -> int:
+        return sum(self.add(fingerprint) for fingerprint in fingerprints)
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(bloom.bits) for bloom in self.filters)
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(MAGIC, self.error_rate, self.initial_capacity, len(self.filters))]
+        for bloom in self.filters:
+            parts.append(_FILTER.pack(bloom.capacity, bloom.count, bloom.error_rate, bloom.hashes, bloom.blocks))
+            parts.append(bytes(bloom.bits))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScalableBloomFilter":
+        try:
+            magic, error_rate, initial_capacity, count = _HEADER.unpack_from(data, 0)
+            if magic != MAGIC:
+                raise ValueError("Kein OdinKey-Bloom-Filter")
+            result = cls(error_rate, initial_capacity)
+            pos = _HEADER.size
+            for _ in range(count):
+                capacity, entries, rate, hashes, blocks = _FILTER.unpack_from(data, pos)
+                pos += _FILTER.size
+                length = blocks * BLOCK_BYTES
+                if pos + length > len(data):
+                    raise ValueError("Bloom-Filter ist abgeschnitten")
+                bloom = BloomFilter(capacity, rate, entries, bytearray(data[pos:pos + length]))
+                if (bloom.hashes, bloom.blocks) != (hashes, blocks):
+                    raise ValueError("Bloom-Filter ist beschädigt")
+                result.filters.append(bloom)
+                pos += length
+        except struct.error:
+            raise ValueError("Bloom-Filter ist abgeschnitten") from None
+        return result
@@ -0,0 +1,72 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, Optional
+
+from src.crypto.encryption import CipherContext, BytesLike
+
+
+class BulkCipher:
+    """
+    Parallele Ver-/Entschlüsselung für große Mengen (Export, Audit, Re-Keying).
+    Die Einträge werden in Batches auf einen Thread-Pool verteilt; AES-GCM in 'cryptography'
+    gibt dabei den GIL frei, dadurch skaliert das mit der Anzahl der Kerne.
+    Die Ergebnisse kommen als Generator in der Reihenfolge der Eingabe zurück.
+    """
+
+    DEFAULT_BATCH_SIZE = 512
+    MAX_DEFAULT_WORKERS = 8
+
+    def __init__(self, context: CipherContext, workers: Optional[int] = None, batch_size: Optional[int] = None):
+        if workers is None:
+            workers = min(self.MAX_DEFAULT_WORKERS, os.cpu_count() or 1)
+        if batch_size is None:
+            batch_size = self.DEFAULT_BATCH_SIZE
+        if workers < 1 or batch_size < 1:
+            raise ValueError("workers und batch_size müssen >= 1 sein")
+        self.context = context
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def decrypt_iter(self, items: Iterable[tuple[BytesLike, BytesLike]]) -> Iterator[str]:
+        """Entschlüsselt (nonce, ciphertext)-Paare parallel, Ergebnisse in Eingabe-Reihenfolge."""
+        return self._map(self.context.decrypt_many, items)
+
+    def encrypt_iter(self, plaintexts: Iterable[str]) -> Iterator[tuple[bytes, bytes]]:
+        """Verschlüsselt Klartexte parallel, liefert (nonce, ciphertext) in Eingabe-Reihenfolge."""
+        return self._map(self.context.encrypt_many, plaintexts)
+
+    def _batches(self, items: Iterable) -> Iterator[list]:
+        iterator = iter(items)
+        while batch := list(islice(iterator, self.batch_size)):
+            yield batch
+
+    def _map(self, work: Callable[[list], list], items: Iterable) -> Iterator:
+        batches = self._batches(items)
+
+        # Ein Worker oder nur ein Batch -> ohne Thread-Pool direkt im aufrufenden Thread
+        first = next(batches, None)
+        if first is None:
+            return
+        second = next(batches, None)
+        if self.workers == 1 or second is None:
+            for batch in chain([first], [second] if second is not None else [], batches):
+                yield from work(batch)
+            return
+
+        # Höchstens 2 Batches pro Worker gleichzeitig in Arbeit -> Speicher bleibt begrenzt,
+        # auch wenn die Eingabe selbst ein Generator über sehr viele Zeilen ist
+        window = 2 * self.workers
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="odinkey-bulk")
+        try:
+            pending = deque([executor.submit(work, first), executor.submit(work, second)])
+            for batch in batches:
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(work, batch))
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Bei Abbruch (Exception oder nicht ausgelesener Generator) offene Batches verwerfen
+            executor.shutdown(wait=True, cancel_futures=True)
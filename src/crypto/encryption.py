@@ -1,55 +1,124 @@
 import os
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
+from typing import Iterable, Iterator, Optional, Sequence, Union
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from src.crypto import kdf
+from src.crypto.kdf import KdfParams
 
-class Encryption:
-#NFMR7
-    def derive_key(self, password:str, salt: bytes) -> bytes:
-        # Erstellt ein KDF (Key Derivation Function) Objekt, PBKDF2HMAC ist Funktion von cryptography
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(), #SHA256 als Algorithmus
-            length=32,  #AES-Schlüssel muss 32 Bytes groß sein
-            salt=salt, #bekommt salt übergeben
-            iterations=100000,
-            backend=default_backend()
-        )
-
-        #Schlüsselableitung
-        #Das Passwort muss erst in bytes umgewandelt werden: password.encode()
-        key = kdf.derive(password.encode())
-
-        return key #mit diesem Key (wird aus Master-PW abgeleitet) wird DB mit AES-256 ver- und entschlüsselt
-
-    def encrypt_data(self, key: bytes, plaintext: str) -> tuple[bytes, bytes]:
+# bytes oder memoryview (z.B. Ausschnitte aus einem großen Puffer)
+BytesLike = Union[bytes, bytearray, memoryview]
 
-        # Instanz erstellen
-        aesgcm = AESGCM(key)
 
-        # zufällige Nonce (Number used once) erstellen mit 12 Bytes
-        nonce = os.urandom(12)
+class CipherContext:
+    """
+    An einen Schlüssel gebundener AES-256-GCM Kontext.
+    Das AESGCM-Objekt (Key Schedule) wird einmal pro Sitzung erstellt und danach
+    für alle Ver- und Entschlüsselungen wiederverwendet.
+    """
 
-        # Verschlüsseln - Daten kommen als Bytes daher plaintext.encode()
-        # 3. Parameter (associated_data) kann hier none sein
-        ciphertext = aesgcm.encrypt(nonce, plaintext.encode(), None)
+    NONCE_SIZE = 12  # Bei AES-GCM ist die Nonce standardmäßig 12 Bytes lang
 
-        # Nonce und Ciphertext zurückgeben
-        return nonce, ciphertext
-
-    def decrypt_data(self, key: bytes, nonce: bytes, ciphertext: bytes) -> str:
+    def __init__(self, key: bytes):
+        self.key = key
+        self._aesgcm = AESGCM(key)
 
-        # Instanz erstellen
-        aesgcm = AESGCM(key)
+    def encrypt(self, plaintext: str) -> tuple[bytes, bytes]:
+        nonce = os.urandom(self.NONCE_SIZE)
+        return nonce, self._aesgcm.encrypt(nonce, plaintext.encode(), None)
 
-        # Entschlüsseln
+    def decrypt(self, nonce: BytesLike, ciphertext: BytesLike) -> str:
         # Wenn der Key falsch ist oder die Daten manipuliert wurden, wirft dies einen Fehler (InvalidTag)
-        plaintext_bytes = aesgcm.decrypt(nonce, ciphertext, None)
-
-        # In String umwandeln
-        return plaintext_bytes.decode()
-
+        return self._aesgcm.decrypt(nonce, ciphertext, None).decode()
+
+    def encrypt_many(self, plaintexts: Iterable[str]) -> list[tuple[bytes, bytes]]:
+        """
+        Verschlüsselt viele Klartexte. Alle Nonces kommen aus EINEM os.urandom-Aufruf
+        statt aus einem Syscall pro Eintrag.
+        """
+        plaintexts = list(plaintexts)
+        size = self.NONCE_SIZE
+        nonce_block = os.urandom(size * len(plaintexts))
+        encrypt = self._aesgcm.encrypt
+
+        result = []
+        for i, plaintext in enumerate(plaintexts):
+            nonce = nonce_block[i * size:(i + 1) * size]
+            result.append((nonce, encrypt(nonce, plaintext.encode(), None)))
+        return result
+
+    def decrypt_many(self, items: Iterable[tuple[BytesLike, BytesLike]]) -> list[str]:
+        """
+        Entschlüsselt viele (nonce, ciphertext)-Paare.
+        Die Paare dürfen bytes oder memoryviews sein (siehe iter_packed), es wird nichts kopiert.
+        """
+        decrypt = self._aesgcm.decrypt
+        return [decrypt(nonce, ciphertext, None).decode() for nonce, ciphertext in items]
+
+    @classmethod
+    def pack(cls, pairs: Iterable[tuple[bytes, bytes]]) -> tuple[bytes, list[int]]:
+        """Legt (nonce, ciphertext)-Paare hintereinander in einen Puffer: nonce|ct|nonce|ct..."""
+        buffer = bytearray()
+        lengths = []
+        for nonce, ciphertext in pairs:
+            buffer += nonce
+            buffer += ciphertext
+            lengths.append(len(ciphertext))
+        return bytes(buffer), lengths
+
+    @classmethod
+    def iter_packed(cls, buffer: BytesLike, lengths: Sequence[int]) -> Iterator[tuple[memoryview, memoryview]]:
+        """Liefert memoryview-Paare über einen mit pack() erstellten Puffer (ohne Kopien)."""
+        view = memoryview(buffer)
+        offset = 0
+        for length in lengths:
+            nonce_end = offset + cls.NONCE_SIZE
+            yield view[offset:nonce_end], view[nonce_end:nonce_end + length]
+            offset = nonce_end + length
 
 
+class Encryption:
+#NFMR7
+    def __init__(self):
+        # Zuletzt benutzter Kontext - encrypt_data/decrypt_data werden fast immer mit demselben Key aufgerufen
+        self._context = None
+
+    def derive_key(self, password: str, salt: bytes, params: Optional[KdfParams] = None) -> bytes:
+        # Schlüsselableitung über die KDF-Engine (PBKDF2, scrypt oder Argon2id, siehe kdf.py)
+        # Ohne params: PBKDF2-HMAC-SHA256 mit 100.000 Iterationen wie bei alten Tresoren
+        # mit diesem Key (wird aus Master-PW abgeleitet) wird DB mit AES-256 ver- und entschlüsselt
+        return kdf.derive(password, salt, params or kdf.LEGACY_PARAMS)
+
+    def derive_login_keys(self, password: str, salt: bytes, params: KdfParams) -> tuple[bytes, bytes]:
+        # EINE langsame Ableitung für den Login: Root-Secret -> (Verifier, Vault-Key) per HKDF
+        root = kdf.derive(password, salt, params)
+        return kdf.split_root_secret(root)
+
+    # Schlüsselhierarchie: ein zufälliger Data-Key verschlüsselt die Profile, der Key aus dem
+    # Master-Passwort (KEK) verschlüsselt nur diesen Data-Key -> Passwortwechsel = neu einpacken
+    DATA_KEY_AAD = b"odinkey/v1/data-key"
+
+    def generate_data_key(self) -> bytes:
+        return os.urandom(kdf.KEY_LENGTH)
+
+    def wrap_key(self, kek: bytes, data_key: bytes) -> tuple[bytes, bytes]:
+        """Verschlüsselt den Data-Key mit dem KEK; gibt (nonce, wrapped) zurück."""
+        nonce = os.urandom(CipherContext.NONCE_SIZE)
+        return nonce, AESGCM(kek).encrypt(nonce, data_key, self.DATA_KEY_AAD)
+
+    def unwrap_key(self, kek: bytes, nonce: bytes, wrapped: bytes) -> bytes:
+        # Falscher KEK oder manipulierte Daten -> InvalidTag
+        return AESGCM(kek).decrypt(nonce, wrapped, self.DATA_KEY_AAD)
+
+    def context(self, key: bytes) -> CipherContext:
+        """Gibt einen an 'key' gebundenen CipherContext zurück (wird wiederverwendet, solange der Key gleich bleibt)."""
+        if self._context is None or self._context.key != key:
+            self._context = CipherContext(key)
+        return self._context
 
+    def encrypt_data(self, key: bytes, plaintext: str) -> tuple[bytes, bytes]:
+        # Verschlüsseln mit zufälliger 12-Byte Nonce (Number used once)
+        # Nonce und Ciphertext zurückgeben
+        return self.context(key).encrypt(plaintext)
 
+    def decrypt_data(self, key: bytes, nonce: bytes, ciphertext: bytes) -> str:
+        # Wenn der Key falsch ist oder die Daten manipuliert wurden, wirft dies einen Fehler (InvalidTag)
+        return self.context(key).decrypt(nonce, ciphertext)
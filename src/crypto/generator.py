@@ -1,10 +1,34 @@
 import secrets #NFMR3
+import random
 import string
+from functools import lru_cache
+from typing import Optional
+from src.crypto.random_source import default_source
+from src.crypto.regex_automaton import compile_regex
+from src.crypto.template import compile_template
 """
 secrets is die Kryptographie Library, die auch CSPRN konform ist
 string ist die Zeichenset Library (ASCII, Ziffern, Zeichen)
 """
 
+
+class _Alphabet:
+    """
+    Vorberechnete Tabellen für einen Zeichen-Pool (einmal pro Kombination der Optionen).
+    table:    bytes.translate-Tabelle, Byte b -> pool[b % len(pool)]
+    rejected: Bytes >= limit werden verworfen (Rejection Sampling), sonst wären
+              die ersten 256 % len(pool) Zeichen wahrscheinlicher
+    classes:  Zeichenklassen, von denen jedes Passwort mindestens ein Zeichen enthalten muss
+    """
+
+    def __init__(self, classes: tuple[str, ...]):
+        pool = "".join(classes)
+        self.size = len(pool)
+        self.limit = 256 - 256 % self.size
+        self.table = bytes(ord(pool[b % self.size]) for b in range(256))
+        self.rejected = bytes(range(self.limit, 256))
+        self.classes = tuple(c.encode() for c in classes)
+
 class PasswordGenerator:
     # Klassen-Konstanten
     MIN_LENGTH = 8
@@ -14,8 +38,10 @@ class PasswordGenerator:
     DIGITS = string.digits
     SPECIAL = string.punctuation
 
-    def __init__(self):
-        self.random = secrets.SystemRandom() # initialize instance
+    def __init__(self, source: Optional[random.Random] = None):
+        # Zufallsquelle austauschbar (siehe random_source.py); Standard: gepufferter os.urandom-Pool
+        # Jede random.Random-Unterklasse geht, z.B. secrets.SystemRandom() wie früher
+        self.random = source if source is not None else default_source
 
     @staticmethod
     def validate_length(length: int) -> bool:
@@ -33,6 +59,20 @@ class PasswordGenerator:
         else:
             return False
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _alphabet(cls, use_uppercase, use_lowercase, use_digits, use_special) -> _Alphabet:
+        classes = []
+        if use_uppercase:
+            classes.append(cls.UPPERCASE)
+        if use_lowercase:
+            classes.append(cls.LOWERCASE)
+        if use_digits:
+            classes.append(cls.DIGITS)
+        if use_special:
+            classes.append(cls.SPECIAL)
+        return _Alphabet(tuple(classes))
+
     def generate_random( #FMR4
             self,
             length: int = 16,
@@ -41,6 +81,24 @@ class PasswordGenerator:
             use_digits: bool = True,
             use_special: bool = True
     ) -> str:
+        return self.generate_many(1, length, use_uppercase, use_lowercase, use_digits, use_special)[0]
+
+    def generate_many(
+            self,
+            n: int,
+            length: int = 16,
+            use_uppercase: bool = True,
+            use_lowercase: bool = True,
+            use_digits: bool = True,
+            use_special: bool = True
+    ) -> list[str]:
+        """
+        Erzeugt n Zufallspasswörter auf einmal (z.B. für Provisioning).
+        Die Zufallsbytes kommen blockweise statt einzeln pro Zeichen; die Abbildung
+        Byte -> Zeichen läuft per bytes.translate über vorberechnete Tabellen.
+        Jedes Passwort enthält jede gewählte Zeichenklasse - Passwörter ohne werden
+        komplett verworfen, damit alle gültigen Passwörter gleich wahrscheinlich sind.
+        """
         # Validierung mit den separaten Methoden
         if not self.validate_length(length):
             raise ValueError(
@@ -50,37 +108,31 @@ class PasswordGenerator:
         if not self.validate_options(use_uppercase, use_lowercase, use_digits, use_special):
             raise ValueError("At least one character type must be selected")
 
-        # initialize character pool
-        char_pool = ""
-        required_chars = []
-
-        if use_uppercase:
-            char_pool += self.UPPERCASE
-            required_chars.append(self.random.choice(self.UPPERCASE))
-
-        if use_lowercase:
-            char_pool += self.LOWERCASE
-            required_chars.append(self.random.choice(self.LOWERCASE))
-
-        if use_digits:
-            char_pool += self.DIGITS
-            required_chars.append(self.random.choice(self.DIGITS))
+        if n < 0:
+            raise ValueError("n must not be negative")
 
-        if use_special:
-            char_pool += self.SPECIAL
-            required_chars.append(self.random.choice(self.SPECIAL))
+        alphabet = self._alphabet(bool(use_uppercase), bool(use_lowercase), bool(use_digits), bool(use_special))
+        passwords = []
+        chars = b""
 
-        remaining_length = length - len(required_chars)
-        random_chars = [
-            self.random.choice(char_pool)
-            for _ in range(remaining_length)
-        ]
+        while len(passwords) < n:
+            needed = (n - len(passwords)) * length - len(chars)
+            if needed > 0:
+                # Etwas mehr ziehen als nötig (verworfene Bytes + verworfene Passwörter)
+                block = self.random.randbytes(needed * 256 // alphabet.limit + needed // 2 + length)
+                chars += block.translate(alphabet.table, alphabet.rejected)
 
-        # combine and mix
-        all_chars = required_chars + random_chars
-        self.random.shuffle(all_chars)
+            usable = len(chars) - len(chars) % length
+            for start in range(0, usable, length):
+                candidate = chars[start:start + length]
+                # translate(None, klasse) löscht die Zeichen der Klasse -> gleich lang = Klasse fehlt
+                if all(len(candidate.translate(None, cls)) < length for cls in alphabet.classes):
+                    passwords.append(candidate.decode("ascii"))
+                    if len(passwords) == n:
+                        break
+            chars = chars[usable:]
 
-        return ''.join(all_chars)
+        return passwords
 
     def generate_from_template(self, template: str) -> str:
         """
@@ -90,31 +142,30 @@ class PasswordGenerator:
             @ - Letter (a-z, A-Z)
             ? - Any character (letter + digit)
             ! - Special character
+            [..] - Custom class, e.g. [a-f0-9]
+            {n} / {m,n} - Repeat the previous element, e.g. #{4}, @{2,6}
+            \\x - Escape, x is taken literally
             Other - Literal character
+        The template is compiled once and cached (see template.py).
         """
-        if not template:
-            raise ValueError("Template cannot be empty")
-
-        result = []
-
-        for char in template:
-            if char == '#':
-                # digit
-                result.append(self.random.choice(self.DIGITS))
-            elif char == '@':
-                # letter
-                result.append(self.random.choice(string.ascii_letters))
-            elif char == '?':
-                # character (letter + digit)
-                result.append(self.random.choice(string.ascii_letters + self.DIGITS))
-            elif char == '!':
-                # special character
-                result.append(self.random.choice(self.SPECIAL))
-            else:
-                # Literal character
-                result.append(char)
-
-        return ''.join(result)
+        return compile_template(template).generate(self.random)
+
+    def generate_many_from_template(self, template: str, n: int) -> list[str]:
+        """n Passwörter aus demselben Template - der kompilierte Plan wird wiederverwendet."""
+        return compile_template(template).generate_many(n, self.random)
+
+    def generate_from_regex(self, pattern: str, length: Optional[int] = None) -> str:
+        """
+        Password matching a regular expression (safe subset, see regex_automaton.py),
+        drawn uniformly from all matching strings. length is required for unbounded
+        patterns (* / +); without it every length the pattern allows is possible.
+        The pattern is compiled once and cached.
+        """
+        return compile_regex(pattern).generate(self.random, length)
+
+    def generate_many_from_regex(self, pattern: str, n: int, length: Optional[int] = None) -> list[str]:
+        """n Passwörter aus demselben Ausdruck - Automat und Zähltabellen werden wiederverwendet."""
+        return compile_regex(pattern).generate_many(n, self.random, length)
 
     #Help_Methods for further algorithms
     def get_random_digit(self) -> str:
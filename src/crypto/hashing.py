@@ -1,3 +1,5 @@
+import base64
+import hmac
 from argon2 import PasswordHasher #NFMR2
 from argon2.exceptions import VerifyMismatchError
 
@@ -22,5 +24,17 @@ class Hashing:
         except VerifyMismatchError:
             return False
 
+    # Neues Login-Schema: gespeichert wird nur ein per HKDF abgeleiteter Verifier (siehe kdf.split_root_secret).
+    # Der Verifier entsteht aus derselben Argon2id-Ableitung wie der Vault-Key -> nur eine langsame KDF pro Login
+    VERIFIER_PREFIX = "$okv1$"
 
+    def is_verifier_hash(self, stored_hash: str) -> bool:
+        # False = alter Argon2-Hash ($argon2id$...), Account wird beim nächsten Login umgestellt
+        return stored_hash.startswith(self.VERIFIER_PREFIX)
 
+    def encode_verifier(self, verifier: bytes) -> str:
+        return self.VERIFIER_PREFIX + base64.b64encode(verifier).decode()
+
+    def check_verifier(self, stored_hash: str, verifier: bytes) -> bool:
+        # compare_digest -> Vergleich in konstanter Zeit
+        return hmac.compare_digest(stored_hash.encode(), self.encode_verifier(verifier).encode())
@@ -0,0 +1,184 @@
+import json
+import os
+import time
+from dataclasses import dataclass, asdict, replace
+from functools import lru_cache
+from typing import Optional
+
+from argon2.low_level import hash_secret_raw, Type
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+KEY_LENGTH = 32  # AES-256
+
+PBKDF2 = "pbkdf2-sha256"
+SCRYPT = "scrypt"
+ARGON2ID = "argon2id"
+
+SCRYPT_R = 8  # Blockgröße; mit r=8 braucht scrypt genau n KiB Speicher
+
+
+@dataclass(frozen=True)
+class KdfParams:
+    """
+    Parameter der Schlüsselableitung eines Tresors (gespeichert als JSON in master_account.kdf_params).
+    iterations:  PBKDF2-Iterationen bzw. Argon2 time_cost (bei scrypt 1)
+    memory_kib:  Speicherbedarf (scrypt: n, Argon2: memory_cost), bei PBKDF2 0
+    parallelism: scrypt p bzw. Argon2 Lanes
+    """
+    algorithm: str
+    iterations: int = 1
+    memory_kib: int = 0
+    parallelism: int = 1
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, data: Optional[str]) -> "KdfParams":
+        # NULL in der DB = Tresor von vor der KDF-Umstellung
+        if not data:
+            return LEGACY_PARAMS
+        return cls(**json.loads(data))
+
+
+# So wurde derive_key bis jetzt fest verdrahtet aufgerufen -> alte Tresore
+LEGACY_PARAMS = KdfParams(PBKDF2, iterations=100_000)
+
+# Untergrenzen (OWASP Password Storage Cheat Sheet) - die Kalibrierung geht nie darunter
+MINIMUM_PARAMS = {
+    PBKDF2: KdfParams(PBKDF2, iterations=600_000),
+    SCRYPT: KdfParams(SCRYPT, memory_kib=2 ** 15, parallelism=1),
+    ARGON2ID: KdfParams(ARGON2ID, iterations=2, memory_kib=19_456, parallelism=1),
+}
+
+DEFAULT_ALGORITHM = ARGON2ID
+DEFAULT_TARGET_MS = 250
+ARGON2_MEMORY_KIB = 65_536  # 64 MiB, wird nur auf langsamen Rechnern reduziert
+SCRYPT_MAX_MEMORY_KIB = 2 ** 20  # 1 GiB
+
+
+def _pbkdf2(password: bytes, salt: bytes, params: KdfParams) -> bytes:
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=KEY_LENGTH,
+        salt=salt,
+        iterations=params.iterations,
+        backend=default_backend()
+    )
+    return kdf.derive(password)
+
+
+def _scrypt(password: bytes, salt: bytes, params: KdfParams) -> bytes:
+    kdf = Scrypt(salt=salt, length=KEY_LENGTH, n=params.memory_kib, r=SCRYPT_R, p=params.parallelism)
+    return kdf.derive(password)
+
+
+def _argon2id(password: bytes, salt: bytes, params: KdfParams) -> bytes:
+    return hash_secret_raw(
+        password,
+        salt,
+        time_cost=params.iterations,
+        memory_cost=params.memory_kib,
+        parallelism=params.parallelism,
+        hash_len=KEY_LENGTH,
+        type=Type.ID
+    )
+
+
+_BACKENDS = {
+    PBKDF2: _pbkdf2,
+    SCRYPT: _scrypt,
+    ARGON2ID: _argon2id,
+}
+
+
+def derive(password: str, salt: bytes, params: KdfParams) -> bytes:
+    """Leitet den 32-Byte Schlüssel mit dem in 'params' angegebenen Verfahren ab."""
+    try:
+        backend = _BACKENDS[params.algorithm]
+    except KeyError:
+        raise ValueError(f"Unbekanntes KDF-Verfahren: {params.algorithm}") from None
+    return backend(password.encode(), salt, params)
+
+
+# Kontext-Strings für HKDF: aus einem Root-Secret entstehen zwei unabhängige Schlüssel
+VERIFIER_INFO = b"odinkey/v1/login-verifier"
+VAULT_KEY_INFO = b"odinkey/v1/vault-key"
+
+
+def _hkdf(root: bytes, info: bytes) -> bytes:
+    return HKDF(algorithm=hashes.SHA256(), length=KEY_LENGTH, salt=None, info=info).derive(root)
+
+
+def derive_subkey(key: bytes, info: bytes) -> bytes:
+    """Unabhängiger Schlüssel für einen anderen Zweck (z.B. HMAC-Fingerprints) aus dem Vault-Key."""
+    return _hkdf(key, info)
+
+
+def split_root_secret(root: bytes) -> tuple[bytes, bytes]:
+    """
+    Teilt das Root-Secret (Ergebnis der langsamen KDF) per HKDF in (Verifier, Vault-Key).
+    Aus dem gespeicherten Verifier lässt sich der Vault-Key nicht berechnen. Seit der Schlüsselhierarchie
+    ist der Vault-Key der KEK, der den Data-Key der Profile einpackt (siehe Encryption.wrap_key).
+    """
+    return _hkdf(root, VERIFIER_INFO), _hkdf(root, VAULT_KEY_INFO)
+
+
+def _measure_ms(params: KdfParams) -> float:
+    start = time.perf_counter()
+    derive("calibration", b"\x00" * 16, params)
+    return (time.perf_counter() - start) * 1000
+
+
+def _at_least_minimum(params: KdfParams) -> KdfParams:
+    minimum = MINIMUM_PARAMS[params.algorithm]
+    return replace(
+        params,
+        iterations=max(params.iterations, minimum.iterations),
+        memory_kib=max(params.memory_kib, minimum.memory_kib),
+        parallelism=max(params.parallelism, minimum.parallelism)
+    )
+
+
+@lru_cache(maxsize=None)
+def calibrate(algorithm: str = DEFAULT_ALGORITHM, target_ms: int = DEFAULT_TARGET_MS) -> KdfParams:
+    """
+    Misst diesen Rechner und wählt Parameter, mit denen eine Ableitung ca. target_ms dauert.
+    Das Ergebnis gilt für die ganze Laufzeit (lru_cache), gemessen wird also nur einmal.
+    """
+    if algorithm == PBKDF2:
+        # PBKDF2 skaliert linear mit den Iterationen
+        probe = KdfParams(PBKDF2, iterations=50_000)
+        iterations = int(probe.iterations * target_ms / max(_measure_ms(probe), 0.01))
+        return _at_least_minimum(replace(probe, iterations=iterations))
+
+    if algorithm == SCRYPT:
+        # n muss eine Zweierpotenz sein -> verdoppeln, solange das Ziel nicht erreicht ist
+        params = MINIMUM_PARAMS[SCRYPT]
+        while params.memory_kib < SCRYPT_MAX_MEMORY_KIB and _measure_ms(params) * 2 <= target_ms:
+            params = replace(params, memory_kib=params.memory_kib * 2)
+        return params
+
+    if algorithm == ARGON2ID:
+        lanes = min(4, os.cpu_count() or 1)
+        params = KdfParams(ARGON2ID, iterations=1, memory_kib=ARGON2_MEMORY_KIB, parallelism=lanes)
+        elapsed = _measure_ms(params)
+        # Zu langsamer Rechner: erst den Speicher reduzieren (bis zur Untergrenze)
+        while elapsed > target_ms / 2 and params.memory_kib // 2 >= MINIMUM_PARAMS[ARGON2ID].memory_kib:
+            params = replace(params, memory_kib=params.memory_kib // 2)
+            elapsed = _measure_ms(params)
+        # time_cost skaliert linear
+        return _at_least_minimum(replace(params, iterations=int(target_ms / max(elapsed, 0.01))))
+
+    raise ValueError(f"Unbekanntes KDF-Verfahren: {algorithm}")
+
+
+def needs_upgrade(params: KdfParams, algorithm: str = DEFAULT_ALGORITHM) -> bool:
+    """True, wenn ein Tresor beim nächsten Login auf neue Parameter umgestellt werden soll."""
+    if params.algorithm != algorithm:
+        return True
+    return _at_least_minimum(params) != params
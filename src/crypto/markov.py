@@ -0,0 +1,205 @@
+import math
+import random
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+"""
+Trigramm-Markov-Modell für aussprechbare Passwörter.
+
+Trainiert wird offline auf der mitgelieferten Wortliste (python -m src.crypto.markov),
+das Ergebnis liegt als kompakte Binärdatei in src/data/pronounceable.bin:
+
+    Header      MAGIC | Anzahl Übergänge
+    offsets     (CONTEXTS + 1) x uint32 - Übergänge von Kontext c stehen in [offsets[c], offsets[c + 1])
+    cumulative  uint16 pro Übergang, kumulierte Häufigkeit (inklusive Obergrenze, Summe je Kontext = 2^16)
+    symbols     uint8 pro Übergang, Index des nächsten Buchstabens
+
+Kontext = die zwei vorherigen Zeichen ('^' = Wortanfang). Gezogen wird mit einer 16-Bit-Zufallszahl
+und binärer Suche im kumulierten Array; die Entropie des gezogenen Pfads ist die Summe der
+-log2(p) der einzelnen Übergänge und damit exakt für genau dieses Passwort.
+"""
+
+ALPHABET = "^abcdefghijklmnopqrstuvwxyz"
+SIZE = len(ALPHABET)
+CONTEXTS = SIZE * SIZE
+START = 0  # Kontext "^^"
+
+PRECISION_BITS = 16
+TOTAL = 1 << PRECISION_BITS
+
+# Gewicht des Trigramms; der Rest kommt vom Bigramm (Jelinek-Mercer-Glättung).
+# Reine Trigramme hätten auf dieser Liste nur ~3,0 Bit/Zeichen, mit 0,5 sind es ~3,5 Bit/Zeichen
+# (der alte Konsonant/Vokal-Wechsel: ~3,4) - und die Ergebnisse bleiben aussprechbar.
+TRIGRAM_WEIGHT = 0.5
+
+MAGIC = b"OKMARKV1"
+_HEADER = struct.Struct("<8sI")
+MODEL_PATH = Path(__file__).resolve().parents[1] / "data" / "pronounceable.bin"
+
+
+def _context(a: int, b: int) -> int:
+    return a * SIZE + b
+
+
+def train(words, trigram_weight: float = TRIGRAM_WEIGHT) -> bytes:
+    """Zählt Trigramme/Bigramme, glättet, quantisiert auf 2^16 je Kontext und gibt das Binärformat zurück."""
+    trigrams = defaultdict(Counter)
+    bigrams = defaultdict(Counter)
+    for word in words:
+        word = word.lower()
+        if not word or any(char not in ALPHABET[1:] for char in word):
+            continue
+        indices = [0, 0] + [ALPHABET.index(char) for char in word]
+        for i in range(2, len(indices)):
+            trigrams[_context(indices[i - 2], indices[i - 1])][indices[i]] += 1
+            bigrams[indices[i - 1]][indices[i]] += 1
+
+    offsets = array("I", [0])
+    cumulative = array("H")
+    symbols = array("B")
+    for ctx in range(CONTEXTS):
+        tri, bi = trigrams.get(ctx), bigrams.get(ctx % SIZE)
+        probabilities = defaultdict(float)
+        # Ohne Trigramm-Daten zählt nur das Bigramm
+        weight = trigram_weight if tri else 0.0
+        if tri:
+            total = sum(tri.values())
+            for symbol, count in tri.items():
+                probabilities[symbol] += weight * count / total
+        if bi:
+            total = sum(bi.values())
+            for symbol, count in bi.items():
+                probabilities[symbol] += (1 - weight) * count / total
+
+        if probabilities:
+            ordered = sorted(probabilities)
+            weights = [max(1, round(probabilities[s] * TOTAL)) for s in ordered]
+            # Rundung ausgleichen: die Summe muss genau 2^16 sein
+            weights[weights.index(max(weights))] += TOTAL - sum(weights)
+            running = 0
+            for symbol, w in zip(ordered, weights):
+                running += w
+                cumulative.append(running - 1)
+                symbols.append(symbol)
+        offsets.append(len(symbols))
+
+    parts = [_HEADER.pack(MAGIC, len(symbols)), offsets, cumulative, symbols]
+    if sys.byteorder == "big":
+        for part in (offsets, cumulative):
+            part.byteswap()
+    return b"".join(bytes(part) for part in parts)
+
+
+class TrigramModel:
+    """Geladenes Modell: nur drei flache Arrays, Ziehen per binärer Suche."""
+
+    def __init__(self, data: bytes):
+        magic, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Kein OdinKey-Markov-Modell")
+        pos = _HEADER.size
+        self.offsets = array("I")
+        self.offsets.frombytes(data[pos:pos + 4 * (CONTEXTS + 1)])
+        pos += 4 * (CONTEXTS + 1)
+        self.cumulative = array("H")
+        self.cumulative.frombytes(data[pos:pos + 2 * count])
+        pos += 2 * count
+        self.symbols = array("B", data[pos:pos + count])
+        if sys.byteorder == "big":
+            self.offsets.byteswap()
+            self.cumulative.byteswap()
+        if len(self.symbols) != count or self.offsets[-1] != count:
+            raise ValueError("Markov-Modell ist beschädigt")
+
+        # -log2(p) je Übergang und Entropie je Kontext, einmal vorberechnet
+        self.bits = []
+        self._probabilities = []
+        self._context_bits = []
+        for ctx in range(CONTEXTS):
+            previous = -1
+            entropy = 0.0
+            for i in range(self.offsets[ctx], self.offsets[ctx + 1]):
+                weight = self.cumulative[i] - previous
+                previous = self.cumulative[i]
+                self.bits.append(PRECISION_BITS - math.log2(weight))
+                self._probabilities.append(weight / TOTAL)
+                entropy += self._probabilities[-1] * self.bits[-1]
+            self._context_bits.append(entropy)
+        self._expected = [0.0]
+        self._distribution = {START: 1.0}
+        self._lock = threading.Lock()
+
+    def sample(self, rng: random.Random, length: int) -> tuple[str, float]:
+        """Zieht 'length' Buchstaben; gibt (Text, exakte Entropie des Pfads in Bit) zurück."""
+        offsets, cumulative, symbols, bits = self.offsets, self.cumulative, self.symbols, self.bits
+        # Alle 16-Bit-Zufallszahlen auf einmal (ein Aufruf der Zufallsquelle pro Passwort)
+        draws = memoryview(rng.randbytes(2 * length)).cast("H")
+        ctx = START
+        chars = []
+        total = 0.0
+        for draw in draws:
+            lo, hi = offsets[ctx], offsets[ctx + 1]
+            if lo == hi:
+                # Kontext ohne Nachfolger (nur am Wortende gesehen) -> deterministisch neu beginnen
+                ctx = START
+                lo, hi = offsets[START], offsets[START + 1]
+            i = bisect_left(cumulative, draw, lo, hi)
+            symbol = symbols[i]
+            chars.append(ALPHABET[symbol])
+            total += bits[i]
+            ctx = (ctx % SIZE) * SIZE + symbol
+        return "".join(chars), total
+
+    def expected_bits(self, length: int) -> float:
+        """
+        Erwartete Entropie (Shannon) für 'length' Buchstaben - per dynamischer Programmierung
+        über die Verteilung der Kontexte. Die Tabelle wird nur bei Bedarf verlängert.
+        """
+        if length < len(self._expected):
+            return self._expected[max(length, 0)]
+        with self._lock:
+            self._extend(length)
+        return self._expected[length]
+
+    def _extend(self, length: int):
+        while len(self._expected) <= length:
+            following = defaultdict(float)
+            step = 0.0
+            for ctx, p in self._distribution.items():
+                if self.offsets[ctx] == self.offsets[ctx + 1]:
+                    ctx = START
+                step += p * self._context_bits[ctx]
+                base = (ctx % SIZE) * SIZE
+                for i in range(self.offsets[ctx], self.offsets[ctx + 1]):
+                    following[base + self.symbols[i]] += p * self._probabilities[i]
+            self._distribution = following
+            self._expected.append(self._expected[-1] + step)
+
+
+@lru_cache(maxsize=1)
+def load_model() -> TrigramModel:
+    """Lädt das mitgelieferte Modell einmal pro Prozess; fehlt es, wird es aus der Wortliste trainiert."""
+    try:
+        return TrigramModel(MODEL_PATH.read_bytes())
+    except (OSError, ValueError):
+        from src.crypto.wordstore import BUNDLED_WORDLIST, parse_wordlist
+        with open(BUNDLED_WORDLIST, encoding="utf-8") as f:
+            return TrigramModel(train(parse_wordlist(f)))
+
+
+if __name__ == "__main__":
+    # Offline-Training: python -m src.crypto.markov
+    from src.crypto.wordstore import BUNDLED_WORDLIST, parse_wordlist
+
+    with open(BUNDLED_WORDLIST, encoding="utf-8") as f:
+        data = train(parse_wordlist(f))
+    MODEL_PATH.write_bytes(data)
+    model = TrigramModel(data)
+    print(f"{len(model.symbols)} Übergänge, {len(data)} Bytes -> {MODEL_PATH}")
+    print(f"{model.expected_bits(12) / 12:.2f} Bit/Zeichen (12 Buchstaben)")
@@ -0,0 +1,263 @@
+import math
+import random
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from src.crypto.template import TemplateError, parse_class
+
+"""
+Deklarative Passwort-Regeln pro Dienst, angelehnt an die "passwordrules"-Syntax von Apple:
+
+    minlength: 12; maxlength: 20; required: digit; required: digit; allowed: upper, lower;
+    forbidden: [<>&]; max-consecutive: 2
+
+    minlength / maxlength   erlaubte Länge (erzeugt wird immer maxlength)
+    required: a, b          mindestens ein Zeichen aus a ∪ b - mehrfach angeben = mehrere Zeichen
+    allowed: a, b           zusätzlich erlaubte Zeichen
+    forbidden: a, b         nie verwenden (Erweiterung, wird von allen anderen Mengen abgezogen)
+    max-consecutive: n      höchstens n gleiche Zeichen direkt hintereinander
+
+Klassen: upper, lower, digit, special, ascii-printable oder eigene wie [-_.] oder [a-f0-9].
+Eine Regel wird einmal kompiliert (gecacht); der Sampler baut das Passwort in einem Durchgang
+so, dass jede Bedingung erfüllt ist - ohne "so lange neu würfeln, bis es passt".
+"""
+
+CLASSES = {
+    "upper": string.ascii_uppercase,
+    "lower": string.ascii_lowercase,
+    "digit": string.digits,
+    "special": string.punctuation,
+    "ascii-printable": string.ascii_letters + string.digits + string.punctuation,
+}
+DEFAULT_ALLOWED = ("upper", "lower", "digit", "special")
+
+DEFAULT_LENGTH = 16
+DEFAULT_MIN_LENGTH = 8
+MAX_RULE_LENGTH = 256
+
+
+class RuleError(ValueError):
+    """Regel ist syntaktisch falsch oder nicht erfüllbar."""
+    pass
+
+
+def _parse_classes(value: str) -> str:
+    """'upper, [-_], digit' -> Vereinigung der Zeichen (ohne Duplikate, Reihenfolge bleibt)."""
+    chars = []
+    pos = 0
+    while pos < len(value):
+        char = value[pos]
+        if char in " ,":
+            pos += 1
+        elif char == "[":
+            try:
+                custom, pos = parse_class(value, pos + 1)
+            except TemplateError as e:
+                raise RuleError(str(e)) from None
+            chars.append(custom)
+        else:
+            end = pos
+            while end < len(value) and value[end] not in " ,[":
+                end += 1
+            name = value[pos:end].lower()
+            if name not in CLASSES:
+                raise RuleError(f"Unbekannte Zeichenklasse: {name}")
+            chars.append(CLASSES[name])
+            pos = end
+    if not chars:
+        raise RuleError("Leere Zeichenklassen-Liste")
+    return "".join(dict.fromkeys("".join(chars)))
+
+
+def _parse_int(name: str, value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise RuleError(f"{name}: Zahl erwartet, nicht '{value}'") from None
+    if number < 1 or number > MAX_RULE_LENGTH:
+        raise RuleError(f"{name} muss zwischen 1 und {MAX_RULE_LENGTH} liegen")
+    return number
+
+
+@dataclass(frozen=True)
+class PasswordRule:
+    """Kompilierte Regel: feste Zielgröße, Pflicht-Mengen und der erlaubte Zeichenvorrat."""
+    text: str
+    min_length: int
+    max_length: int
+    required: tuple  # eine Zeichenmenge pro Pflichtzeichen
+    pool: str
+    max_consecutive: Optional[int] = None
+
+    @property
+    def length(self) -> int:
+        return self.max_length
+
+    def generate(self, rng: random.Random) -> str:
+        # Welche Position welches Pflichtzeichen bekommt (-1 = frei aus dem ganzen Vorrat)
+        labels = list(range(len(self.required))) + [-1] * (self.max_length - len(self.required))
+        if self.max_consecutive is None:
+            rng.shuffle(labels)
+            return "".join(rng.choice(self._alphabet(label)) for label in labels)
+        return self._generate_runs(rng, labels)
+
+    def _generate_runs(self, rng: random.Random, labels: list) -> str:
+        """
+        Mit max-consecutive: Position für Position wird ein zufälliger noch offener Platz gewählt
+        und das Lauf-Zeichen ausgeschlossen. Einzelzeichen-Pflichten (z.B. required: [@]) brauchen
+        Trennzeichen dazwischen - eine Wahl, nach der sie nicht mehr unterzubringen wären, fällt weg.
+        """
+        demand = {}
+        for label in labels:
+            if label >= 0 and len(self.required[label]) == 1:
+                demand[self.required[label]] = demand.get(self.required[label], 0) + 1
+
+        chars = []
+        run_char, run = None, 0
+        while labels:
+            start = rng.randrange(len(labels))
+            for offset in range(len(labels)):
+                index = (start + offset) % len(labels)
+                label = labels[index]
+                if label >= 0 and len(self.required[label]) == 1:
+                    demand[self.required[label]] -= 1
+                alphabet = self._alphabet(label)
+                if run == self.max_consecutive:
+                    alphabet = alphabet.replace(run_char, "")
+                if any(demand.values()):
+                    alphabet = [char for char in alphabet
+                                if self._feasible(len(labels) - 1, demand, char, run + 1 if char == run_char else 1)]
+                if alphabet:
+                    break
+                if label >= 0 and len(self.required[label]) == 1:
+                    demand[self.required[label]] += 1
+            else:
+                raise RuleError("Regel ist nicht erfüllbar (max-consecutive)")
+            labels[index] = labels[-1]
+            labels.pop()
+            char = rng.choice(alphabet)
+            run = run + 1 if char == run_char else 1
+            run_char = char
+            chars.append(char)
+        return "".join(chars)
+
+    def _feasible(self, remaining: int, demand: dict, run_char: str, run: int) -> bool:
+        # Jede Einzelzeichen-Pflicht c braucht genug andere Positionen als Trenner:
+        # k Zeichen in höchstens (remaining - k + 1) Blöcken zu je max_consecutive (erster Block ggf. kürzer)
+        for char, count in demand.items():
+            if count:
+                capacity = self.max_consecutive * (remaining - count + 1) - (run if char == run_char else 0)
+                if count > capacity:
+                    return False
+        return True
+
+    def _alphabet(self, label: int) -> str:
+        return self.pool if label < 0 else self.required[label]
+
+    def check(self, password: str) -> bool:
+        """Erfüllt ein (z.B. von Hand eingegebenes) Passwort die Regel?"""
+        if not self.min_length <= len(password) <= self.max_length:
+            return False
+        if any(char not in self.pool for char in password):
+            return False
+        if self.max_consecutive is not None:
+            run = 1
+            for previous, char in zip(password, password[1:]):
+                run = run + 1 if char == previous else 1
+                if run > self.max_consecutive:
+                    return False
+        return self._match_required(password)
+
+    def _match_required(self, password: str) -> bool:
+        # Jede Pflicht-Menge braucht ein EIGENES Zeichen (bipartites Matching, Mengen können sich überlappen)
+        owner = {}
+
+        def assign(index: int, seen: set) -> bool:
+            for pos, char in enumerate(password):
+                if char in self.required[index] and pos not in seen:
+                    seen.add(pos)
+                    if pos not in owner or assign(owner[pos], seen):
+                        owner[pos] = index
+                        return True
+            return False
+
+        return all(assign(index, set()) for index in range(len(self.required)))
+
+    @property
+    def entropy_bits(self) -> float:
+        """
+        Jede Position gleichverteilt aus ihrer Menge, bei max-consecutive ein Zeichen weniger;
+        die zufällige Verteilung der Pflichtzeichen auf Positionen ist nicht mitgezählt.
+        Untere Schranke, solange keine Einzelzeichen-Pflicht mit max-consecutive zusammenkommt.
+        Sonst kann die Machbarkeitsprüfung in _generate_runs einzelne Positionen stärker einschränken
+        (bis auf ein erzwungenes Zeichen) - dann ist der Wert nur eine Schätzung nach oben.
+        """
+        penalty = 1 if self.max_consecutive is not None else 0
+        sizes = [len(s) for s in self.required] + [len(self.pool)] * (self.max_length - len(self.required))
+        return sum(math.log2(size - penalty) for size in sizes if size - penalty > 1)
+
+@lru_cache(maxsize=256)
+def compile_rule(text: str) -> PasswordRule:
+    """Parst und prüft eine Regel (gecacht, jede Regel wird nur einmal übersetzt)."""
+    min_length = max_length = max_consecutive = None
+    required, allowed, forbidden = [], [], ""
+
+    for item in text.split(";"):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition(":")
+        name, value = name.strip().lower(), value.strip()
+        if not sep or not value:
+            raise RuleError(f"Erwartet 'name: wert', nicht '{item.strip()}'")
+        if name == "minlength":
+            min_length = _parse_int(name, value)
+        elif name == "maxlength":
+            max_length = _parse_int(name, value)
+        elif name == "max-consecutive":
+            max_consecutive = _parse_int(name, value)
+        elif name == "required":
+            required.append(_parse_classes(value))
+        elif name == "allowed":
+            allowed.append(_parse_classes(value))
+        elif name == "forbidden":
+            forbidden += _parse_classes(value)
+        else:
+            raise RuleError(f"Unbekannte Eigenschaft: {name}")
+
+    if not required and not allowed:
+        allowed = [_parse_classes(", ".join(DEFAULT_ALLOWED))]
+
+    def without_forbidden(chars: str) -> str:
+        return "".join(char for char in chars if char not in forbidden)
+
+    required = tuple(without_forbidden(chars) for chars in required)
+    if any(not chars for chars in required):
+        raise RuleError("Eine Pflicht-Menge enthält nur verbotene Zeichen")
+    pool = without_forbidden("".join(dict.fromkeys("".join(allowed) + "".join(required))))
+    if not pool:
+        raise RuleError("Keine erlaubten Zeichen übrig")
+
+    if min_length is None and max_length is None:
+        min_length = max_length = DEFAULT_LENGTH
+    elif max_length is None:
+        max_length = max(min_length, DEFAULT_LENGTH)
+    elif min_length is None:
+        min_length = min(max_length, DEFAULT_MIN_LENGTH)
+    if min_length > max_length:
+        raise RuleError("minlength ist größer als maxlength")
+    if len(required) > max_length:
+        raise RuleError(f"{len(required)} Pflichtzeichen passen nicht in maxlength {max_length}")
+    if max_consecutive is not None and len(pool) < 2 and max_length > max_consecutive:
+        raise RuleError("max-consecutive braucht mindestens zwei erlaubte Zeichen")
+
+    rule = PasswordRule(text, min_length, max_length, required, pool, max_consecutive)
+    if max_consecutive is not None:
+        demand = {}
+        for chars in required:
+            if len(chars) == 1:
+                demand[chars] = demand.get(chars, 0) + 1
+        if not rule._feasible(max_length, demand, None, 0):
+            raise RuleError("Pflichtzeichen lassen sich mit max-consecutive nicht unterbringen")
+    return rule
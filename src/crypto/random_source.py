@@ -0,0 +1,176 @@
+import os
+import random
+import threading
+import weakref
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+"""
+Austauschbare Zufallsquellen für den Passwort-Generator.
+Alle Quellen sind random.Random-Unterklassen (wie secrets.SystemRandom), damit choice(),
+shuffle(), sample() usw. unverändert funktionieren. Sie holen ihre Bytes aber blockweise
+statt mit einem os.urandom-Syscall pro Wert.
+"""
+
+_RECIP_BPF = 2 ** -53  # wie in random.py: 53 Bit Mantisse für random()
+
+# Alle gepufferten Quellen - nach fork() müssen Puffer und Schlüssel im Kind verworfen werden,
+# sonst würden Eltern- und Kindprozess dieselben "Zufallszahlen" benutzen
+_instances = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for source in list(_instances):
+        source._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class BufferedRandom(random.Random):
+    """
+    Basisklasse: hält einen Vorrat an 32-Bit-Wörtern, der in großen Blöcken nachgefüllt wird.
+    Unterklassen implementieren nur _generate(n) -> n Zufallsbytes.
+    randbelow(n) zieht pro Versuch nur n.bit_length() Bits (oberste Bits eines Worts) und
+    verwirft Werte >= n -> gleichverteilt, ohne Modulo-Bias und ohne Float-Umweg.
+    """
+
+    CHUNK_SIZE = 16384  # Bytes pro Nachfüllen = 4096 Wörter
+
+    def __init__(self, chunk_size: int = None):
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self._lock = threading.Lock()
+        self._words = iter(())
+        super().__init__()
+        _instances.add(self)
+
+    def _generate(self, n: int) -> bytes:
+        raise NotImplementedError
+
+    def _after_fork(self):
+        # Neue Lock-Instanz: ein beim fork() gehaltener Lock würde im Kind nie freigegeben
+        self._lock = threading.Lock()
+        self._words = iter(())
+
+    def _refill(self) -> int:
+        # Aufruf nur mit gehaltenem Lock
+        self._words = iter(memoryview(self._generate(self.chunk_size)).cast("I").tolist())
+        return next(self._words)
+
+    def _next_word(self) -> int:
+        with self._lock:
+            word = next(self._words, None)
+            return word if word is not None else self._refill()
+
+    def randbytes(self, n: int) -> bytes:
+        with self._lock:
+            return self._generate(n)
+
+    def getrandbits(self, k: int) -> int:
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        if k == 0:
+            return 0
+        if k <= 32:
+            return self._next_word() >> (32 - k)
+        nbytes = (k + 7) // 8
+        value = int.from_bytes(self.randbytes(nbytes), "big")
+        return value >> (nbytes * 8 - k)  # überzählige Bits verwerfen
+
+    def _randbelow(self, n: int) -> int:
+        # Wird von choice(), shuffle(), sample(), randrange() benutzt
+        k = n.bit_length()
+        if k > 32:
+            return self._randbelow_with_getrandbits(n)
+        shift = 32 - k
+        with self._lock:
+            while True:
+                word = next(self._words, None)
+                if word is None:
+                    word = self._refill()
+                value = word >> shift
+                if value < n:
+                    return value
+
+    def randbelow(self, n: int) -> int:
+        """Gleichverteilte Zahl in [0, n) per Rejection Sampling."""
+        if n <= 0:
+            raise ValueError("n must be positive")
+        return self._randbelow(n)
+
+    def random(self) -> float:
+        # 27 + 26 Bit wie in CPythons genrand_res53
+        a = self._next_word() >> 5
+        b = self._next_word() >> 6
+        return (a * 67108864 + b) * _RECIP_BPF
+
+    # Wie SystemRandom: kein Seed, kein Zustand zum Speichern/Wiederherstellen
+    def seed(self, *args, **kwargs):
+        return None
+
+    def getstate(self):
+        raise NotImplementedError("Zufallsquelle hat keinen speicherbaren Zustand")
+
+    setstate = getstate
+
+
+class UrandomPool(BufferedRandom):
+    """Betriebssystem-CSPRNG (os.urandom), aber ein Syscall pro Block statt pro Wert."""
+
+    def _generate(self, n: int) -> bytes:
+        return os.urandom(n)
+
+
+class AesCtrDrbg(BufferedRandom):
+    """
+    Deterministischer Zufallsbitgenerator: AES-256 im CTR-Modus, Schlüssel aus os.urandom.
+    - Nach jedem Block wird der Schlüssel aus dem Keystream ersetzt (Fast Key Erasure):
+      wer den Zustand später ausliest, kann frühere Ausgaben nicht rekonstruieren
+    - Nach RESEED_INTERVAL Bytes und nach fork() kommt ein frischer Schlüssel aus os.urandom
+    """
+
+    RESEED_INTERVAL = 1 << 24  # 16 MiB
+
+    def __init__(self, chunk_size: int = None, reseed_interval: int = None):
+        self.reseed_interval = reseed_interval or self.RESEED_INTERVAL
+        self._key = None
+        self._since_reseed = 0
+        super().__init__(chunk_size)
+        self._reseed()
+
+    def _reseed(self):
+        self._key = os.urandom(32)
+        self._since_reseed = 0
+
+    def _after_fork(self):
+        super()._after_fork()
+        self._reseed()
+
+    def _generate(self, n: int) -> bytes:
+        if self._since_reseed >= self.reseed_interval:
+            self._reseed()
+        # Zähler startet bei 0 - jeder Schlüssel wird nur für einen einzigen Block benutzt
+        encryptor = Cipher(algorithms.AES(self._key), modes.CTR(b"\x00" * 16)).encryptor()
+        stream = encryptor.update(b"\x00" * (n + 32))
+        self._key = stream[n:]
+        self._since_reseed += n
+        return stream[:n]
+
+
+SOURCES = {
+    "system": random.SystemRandom,
+    "urandom-pool": UrandomPool,
+    "aes-ctr-drbg": AesCtrDrbg,
+}
+
+
+def create_source(name: str) -> random.Random:
+    try:
+        return SOURCES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown random source: {name}") from None
+
+
+# Standard für den Generator (thread-safe, von allen PasswordGenerator-Instanzen geteilt)
+default_source = UrandomPool()
@@ -0,0 +1,461 @@
+import math
+import random
+import re
+import string
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+"""
+Passwörter aus einem regulären Ausdruck, z.B. für Kennungen anderer Systeme: [A-Z]{3}-\\d{6}-[a-z0-9]{8}
+
+Unterstützte Teilmenge (alles andere -> RegexError, nichts wird stillschweigend ignoriert):
+    abc           Literale, \\. \\[ \\\\ usw. für Sonderzeichen
+    [a-z_] [^0O]  Zeichenklassen, auch mit \\d \\w; Negation bezogen auf druckbares ASCII
+    . \\d \\w \\D \\W  druckbares ASCII ohne Leerzeichen / Ziffern / [A-Za-z0-9_] / Komplemente
+    (a|b) (?:a|b) Gruppen und Alternativen
+    ? * + {n} {m,n} {m,} {,n} (wie bei Pythons re ist ein '{' ohne gültigen Quantor ein Literal)
+    ^ und $ nur am Anfang bzw. Ende (es wird ohnehin immer der ganze Text erzeugt)
+
+Der Ausdruck wird einmal (gecacht) in einen DFA übersetzt, dessen Kanten disjunkte Zeichenmengen
+("Atome") sind. Weil der DFA deterministisch ist, gehört zu jedem Wort genau ein Pfad - die Anzahl
+der Wörter der Länge k ab Zustand s lässt sich also exakt zählen:
+
+    count[k][s] = Summe über Kanten s -a-> t von |a| * count[k - 1][t]
+
+Gezogen wird EINE Zufallszahl r < count[L][start], die dann Zeichen für Zeichen "entpackt" wird
+(Unranking). Jedes Wort ist genau gleich wahrscheinlich, die Entropie ist log2(count).
+"""
+
+PRINTABLE = string.ascii_letters + string.digits + string.punctuation
+DIGITS = string.digits
+WORD = string.ascii_letters + string.digits + "_"
+_QUANTIFIER = re.compile(r"\{(?P<low>[0-9]*)(?P<comma>,(?P<high>[0-9]*))?\}")
+ESCAPES = {
+    "d": DIGITS,
+    "w": WORD,
+    "D": "".join(c for c in PRINTABLE if c not in DIGITS),
+    "W": "".join(c for c in PRINTABLE if c not in WORD),
+}
+
+MAX_REPEAT = 256
+MAX_LENGTH = 1024        # Obergrenze für die erzeugte Länge
+MAX_NFA_STATES = 20_000
+MAX_DFA_STATES = 2_000
+
+
+class RegexError(ValueError):
+    """Ausdruck ist ungültig, nutzt nicht unterstützte Syntax oder ist zu groß."""
+    pass
+
+
+# --- Parser: Ausdruck -> Syntaxbaum ---
+# ("chars", frozenset) | ("cat", [knoten]) | ("alt", [knoten]) | ("repeat", knoten, min, max/None)
+
+class _Parser:
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.pos = 0
+        self.char_sets = []
+
+    def parse(self):
+        pattern = self.pattern
+        if pattern.startswith("^"):
+            self.pos = 1
+        if pattern.endswith("$"):
+            # Anker nur, wenn das '$' nicht escaped ist: gerade Anzahl Backslashes davor (\\$ ist Anker)
+            body = pattern[:-1]
+            if (len(body) - len(body.rstrip("\\"))) % 2 == 0:
+                self.pattern = pattern = body
+        node = self._alternation()
+        if self.pos < len(pattern):
+            raise RegexError(f"Unerwartetes '{pattern[self.pos]}' an Position {self.pos}")
+        return node
+
+    def _peek(self) -> Optional[str]:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def _alternation(self):
+        branches = [self._concatenation()]
+        while self._peek() == "|":
+            self.pos += 1
+            branches.append(self._concatenation())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def _concatenation(self):
+        items = []
+        while self._peek() not in (None, "|", ")"):
+            node = self._atom()
+            items.append(self._quantified(node))
+        return ("cat", items)
+
+    def _atom(self):
+        char = self.pattern[self.pos]
+        self.pos += 1
+        if char == "(":
+            if self.pattern.startswith("?:", self.pos):
+                self.pos += 2
+            elif self._peek() == "?":
+                raise RegexError("Nur (?:...) wird unterstützt, keine Lookarounds oder Flags")
+            node = self._alternation()
+            if self._peek() != ")":
+                raise RegexError("Gruppe wird nicht mit ')' geschlossen")
+            self.pos += 1
+            return node
+        if char == "[":
+            return self._chars(self._class())
+        if char == ".":
+            return self._chars(PRINTABLE)
+        if char == "\\":
+            return self._chars(self._escape())
+        if char in "*+?":
+            raise RegexError(f"Quantor '{char}' ohne vorheriges Element")
+        if char in "^$":
+            raise RegexError(f"'{char}' nur am Anfang bzw. Ende erlaubt")
+        return self._chars(char)
+
+    def _chars(self, chars: str):
+        chars = frozenset(chars)
+        self.char_sets.append(chars)
+        return ("chars", chars)
+
+    def _escape(self) -> str:
+        if self.pos >= len(self.pattern):
+            raise RegexError("Escape '\\' am Ende des Ausdrucks")
+        char = self.pattern[self.pos]
+        self.pos += 1
+        if char in ESCAPES:
+            return ESCAPES[char]
+        if char.isalnum():
+            raise RegexError(f"Escape '\\{char}' wird nicht unterstützt")
+        return char
+
+    def _class(self) -> str:
+        negate = self._peek() == "^"
+        if negate:
+            self.pos += 1
+        chars = []
+        first = True
+        while True:
+            char = self._peek()
+            if char is None:
+                raise RegexError("Zeichenklasse wird nicht mit ']' geschlossen")
+            if char == "]" and not first:
+                self.pos += 1
+                break
+            first = False
+            if char == "\\":
+                self.pos += 1
+                chars.append(self._escape())
+                continue
+            # Bereich a-z (ein '-' am Anfang oder Ende ist ein normales Zeichen)
+            if (self.pos + 2 < len(self.pattern) and self.pattern[self.pos + 1] == "-"
+                    and self.pattern[self.pos + 2] not in "]\\"):
+                end = self.pattern[self.pos + 2]
+                if ord(end) < ord(char):
+                    raise RegexError(f"Ungültiger Bereich {char}-{end}")
+                chars.append("".join(chr(c) for c in range(ord(char), ord(end) + 1)))
+                self.pos += 3
+                continue
+            chars.append(char)
+            self.pos += 1
+        chars = "".join(chars)
+        if negate:
+            chars = "".join(c for c in PRINTABLE if c not in chars)
+        if not chars:
+            raise RegexError("Leere Zeichenklasse")
+        return chars
+
+    def _quantified(self, node):
+        char = self._peek()
+        if char == "?":
+            low, high = 0, 1
+        elif char == "*":
+            low, high = 0, None
+        elif char == "+":
+            low, high = 1, None
+        elif char == "{":
+            bounds = self._bounds()
+            if bounds is None:
+                return node  # kein gültiger Quantor -> '{' wird als Literal gelesen
+            low, high = bounds
+        else:
+            return node
+        self.pos += 1
+        following = self._peek()
+        if following is not None and (following in "*+?" or (following == "{" and self._quantifier_at(self.pos))):
+            raise RegexError("Verschachtelte oder nicht-gierige Quantoren werden nicht unterstützt")
+        return ("repeat", node, low, high)
+
+    def _quantifier_at(self, pos: int) -> Optional[re.Match]:
+        # Wie Pythons re: {n} {m,n} {,n} {m,} {,} - nur ASCII-Ziffern, keine Leerzeichen; sonst Literal
+        match = _QUANTIFIER.match(self.pattern, pos)
+        if match is None or (match["comma"] is None and not match["low"]):
+            return None
+        return match
+
+    def _bounds(self) -> Optional[tuple[int, Optional[int]]]:
+        match = self._quantifier_at(self.pos)
+        if match is None:
+            return None
+        end = match.end() - 1
+        low = int(match["low"] or 0)
+        if match["comma"] is None:
+            high = low
+        else:
+            high = int(match["high"]) if match["high"] else None
+        if high is not None and low > high:
+            raise RegexError(f"Quantor {{{low},{high}}}: Minimum ist größer als Maximum")
+        if max(low, high or 0) > MAX_REPEAT:
+            raise RegexError(f"Quantor darf höchstens {MAX_REPEAT} Wiederholungen haben")
+        # pos auf '}' - _quantified überspringt es
+        self.pos = end
+        return low, high
+
+
+def _atoms(char_sets) -> list[str]:
+    """Zerlegt alle vorkommenden Zeichenmengen in disjunkte Blöcke (Partitionsverfeinerung)."""
+    blocks = [frozenset().union(*char_sets)] if char_sets else []
+    for chars in set(char_sets):
+        refined = []
+        for block in blocks:
+            inside, outside = block & chars, block - chars
+            refined.extend(b for b in (inside, outside) if b)
+        blocks = refined
+    return ["".join(sorted(block)) for block in blocks]
+
+
+# --- Thompson-NFA ---
+
+class _Nfa:
+    def __init__(self):
+        self.epsilon = []
+        self.edges = []  # (frozenset, Ziel)
+
+    def state(self) -> int:
+        if len(self.epsilon) >= MAX_NFA_STATES:
+            raise RegexError("Ausdruck ist zu groß")
+        self.epsilon.append([])
+        self.edges.append([])
+        return len(self.epsilon) - 1
+
+    def build(self, node) -> tuple[int, int]:
+        kind = node[0]
+        if kind == "chars":
+            start, end = self.state(), self.state()
+            self.edges[start].append((node[1], end))
+            return start, end
+        if kind == "cat":
+            start = end = self.state()
+            for item in node[1]:
+                item_start, item_end = self.build(item)
+                self.epsilon[end].append(item_start)
+                end = item_end
+            return start, end
+        if kind == "alt":
+            start, end = self.state(), self.state()
+            for branch in node[1]:
+                branch_start, branch_end = self.build(branch)
+                self.epsilon[start].append(branch_start)
+                self.epsilon[branch_end].append(end)
+            return start, end
+        _, item, low, high = node
+        start = end = self.state()
+        for _ in range(low):
+            item_start, item_end = self.build(item)
+            self.epsilon[end].append(item_start)
+            end = item_end
+        if high is None:
+            # Stern: beliebig oft (begrenzt wird erst durch die Länge beim Ziehen)
+            item_start, item_end = self.build(item)
+            self.epsilon[end].append(item_start)
+            self.epsilon[item_end].append(end)
+            return start, end
+        final = self.state()
+        self.epsilon[end].append(final)
+        for _ in range(high - low):
+            item_start, item_end = self.build(item)
+            self.epsilon[end].append(item_start)
+            self.epsilon[item_end].append(final)
+            end = item_end
+        return start, final
+
+    def closure(self, states) -> frozenset:
+        stack = list(states)
+        seen = set(stack)
+        while stack:
+            for target in self.epsilon[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return frozenset(seen)
+
+
+def _lengths(node) -> tuple[int, Optional[int]]:
+    """(minimale, maximale) Länge eines Teilausdrucks; maximal None = unbegrenzt."""
+    kind = node[0]
+    if kind == "chars":
+        return 1, 1
+    if kind == "repeat":
+        low, high = _lengths(node[1])
+        return low * node[2], None if node[3] is None or high is None else high * node[3]
+    parts = [_lengths(item) for item in node[1]]
+    if kind == "cat":
+        highs = [high for _, high in parts]
+        return sum(low for low, _ in parts), None if None in highs else sum(highs)
+    highs = [high for _, high in parts]
+    return min(low for low, _ in parts), None if None in highs else max(highs)
+
+
+@dataclass
+class RegexAutomaton:
+    """
+    Kompilierter Ausdruck: DFA über Atome plus (lazy erweiterte) Zähltabellen.
+    transitions[s] = Liste von (Atom-Index, Zielzustand), Zustand 0 ist der Start.
+    """
+    pattern: str
+    atoms: list
+    transitions: list
+    accepting: list
+    min_length: int
+    max_length: Optional[int]
+
+    def __post_init__(self):
+        self._counts = [[1 if accept else 0 for accept in self.accepting]]
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def count(self, length: int) -> int:
+        """Anzahl der akzeptierten Wörter mit genau dieser Länge."""
+        if length < 0 or length > MAX_LENGTH:
+            return 0
+        return self._table(length)[0]
+
+    def _table(self, length: int) -> list:
+        if length >= len(self._counts):
+            with self._lock:
+                while length >= len(self._counts):
+                    previous = self._counts[-1]
+                    self._counts.append([
+                        sum(len(self.atoms[atom]) * previous[target] for atom, target in edges)
+                        for edges in self.transitions
+                    ])
+        return self._counts[length]
+
+    def _choices(self, state: int, remaining: int) -> tuple:
+        # Kumulierte Gewichte der Kanten von 'state', wenn danach noch remaining - 1 Zeichen folgen
+        key = (state, remaining)
+        table = self._tables.get(key)
+        if table is None:
+            following = self._table(remaining - 1)
+            bounds, edges = [], []
+            total = 0
+            for atom, target in self.transitions[state]:
+                weight = following[target]
+                if weight:
+                    edges.append((total, self.atoms[atom], weight, target))
+                    total += len(self.atoms[atom]) * weight
+                    bounds.append(total)
+            table = self._tables[key] = (bounds, edges)
+        return table
+
+    def _lengths_for(self, length: Optional[int]) -> list[int]:
+        if length is not None:
+            if not 0 < length <= MAX_LENGTH:
+                raise RegexError(f"Länge muss zwischen 1 und {MAX_LENGTH} liegen")
+            return [length]
+        if self.max_length is None:
+            raise RegexError("Ausdruck hat keine feste Maximallänge - bitte eine Länge angeben")
+        return list(range(self.min_length, self.max_length + 1))
+
+    def total(self, length: Optional[int] = None) -> int:
+        """Anzahl möglicher Ergebnisse (length None = alle Längen, die der Ausdruck zulässt)."""
+        return sum(self.count(k) for k in self._lengths_for(length))
+
+    def entropy_bits(self, length: Optional[int] = None) -> float:
+        total = self.total(length)
+        return math.log2(total) if total > 1 else 0.0
+
+    def unrank(self, rank: int, length: int) -> str:
+        """Das rank-te Wort der Länge 'length' (0 <= rank < count(length))."""
+        chars = []
+        state = 0
+        for remaining in range(length, 0, -1):
+            bounds, edges = self._choices(state, remaining)
+            offset, atom, weight, state = edges[bisect_right(bounds, rank)]
+            index, rank = divmod(rank - offset, weight)
+            chars.append(atom[index])
+        return "".join(chars)
+
+    def generate(self, rng: random.Random, length: Optional[int] = None) -> str:
+        return self.generate_many(1, rng, length)[0]
+
+    def generate_many(self, n: int, rng: random.Random, length: Optional[int] = None) -> list[str]:
+        lengths = self._lengths_for(length)
+        counts = [self.count(k) for k in lengths]
+        total = sum(counts)
+        if not total:
+            raise RegexError(f"Ausdruck '{self.pattern}' passt auf kein Wort dieser Länge")
+        if len(lengths) == 1:
+            randbelow = rng.randrange
+            return [self.unrank(randbelow(total), lengths[0]) for _ in range(n)]
+        # Mehrere Längen: Länge mit Gewicht count(k), damit alle Wörter gleich wahrscheinlich sind
+        bounds = []
+        running = 0
+        for count in counts:
+            running += count
+            bounds.append(running)
+        result = []
+        for _ in range(n):
+            rank = rng.randrange(total)
+            i = bisect_right(bounds, rank)
+            result.append(self.unrank(rank - (bounds[i - 1] if i else 0), lengths[i]))
+        return result
+
+
+@lru_cache(maxsize=256)
+def compile_regex(pattern: str) -> RegexAutomaton:
+    """Übersetzt den Ausdruck in einen DFA (gecacht, jeder Ausdruck nur einmal)."""
+    if not pattern:
+        raise RegexError("Ausdruck darf nicht leer sein")
+    parser = _Parser(pattern)
+    tree = parser.parse()
+    min_length, max_length = _lengths(tree)
+    if max_length is not None and max_length > MAX_LENGTH:
+        raise RegexError(f"Ausdruck erzeugt mehr als {MAX_LENGTH} Zeichen")
+
+    atoms = _atoms(parser.char_sets)
+    nfa = _Nfa()
+    start, end = nfa.build(tree)
+    # Pro NFA-Kante: welche Atome sie trägt (Atome sind ganz drin oder ganz draußen)
+    atom_edges = [
+        [(frozenset(i for i, atom in enumerate(atoms) if atom[0] in chars), target) for chars, target in edges]
+        for edges in nfa.edges
+    ]
+
+    initial = nfa.closure([start])
+    index = {initial: 0}
+    queue = [initial]
+    transitions, accepting = [], []
+    while len(transitions) < len(queue):
+        current = queue[len(transitions)]
+        accepting.append(end in current)
+        moves = {}
+        for state in current:
+            for atom_set, target in atom_edges[state]:
+                for atom in atom_set:
+                    moves.setdefault(atom, set()).add(target)
+        edges = []
+        for atom, targets in sorted(moves.items()):
+            following = nfa.closure(targets)
+            if following not in index:
+                if len(queue) >= MAX_DFA_STATES:
+                    raise RegexError("Ausdruck ist zu komplex")
+                index[following] = len(queue)
+                queue.append(following)
+            edges.append((atom, index[following]))
+        transitions.append(edges)
+
+    return RegexAutomaton(pattern, atoms, transitions, accepting, min_length, max_length)
@@ -0,0 +1,177 @@
+import random
+import re
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+"""
+Wildcard-Templates (FMR6) werden einmal in einen Ausführungsplan übersetzt und gecacht.
+
+Syntax:
+    #       Ziffer (0-9)
+    @       Buchstabe (a-z, A-Z)
+    ?       Buchstabe oder Ziffer
+    !       Sonderzeichen
+    [abc]   eigene Zeichenklasse, auch mit Bereichen: [a-f0-9], [A-Z_]
+    \\x      Escape: x wird als normales Zeichen übernommen (z.B. \\# oder \\[)
+    {n}     Quantor: vorheriges Element genau n-mal, z.B. #{4}
+    {m,n}   Quantor: vorheriges Element m- bis n-mal (Länge gleichverteilt), z.B. @{2,6}
+    Alles andere wird unverändert übernommen. Ein '{' ohne gültigen Quantor ist ein normales Zeichen.
+"""
+
+WILDCARDS = {
+    "#": string.digits,
+    "@": string.ascii_letters,
+    "?": string.ascii_letters + string.digits,
+    "!": string.punctuation,
+}
+
+MAX_REPEAT = 256          # Obergrenze pro Quantor
+MAX_TEMPLATE_LENGTH = 1024  # Obergrenze für die maximale Länge des Ergebnisses
+
+
+class TemplateError(ValueError):
+    """Ungültiges Template (z.B. offene Klasse, leere Klasse, falscher Quantor)."""
+    pass
+
+
+@dataclass(frozen=True)
+class _Step:
+    # alphabet None = Literal (text wird unverändert übernommen)
+    alphabet: Optional[str]
+    text: str = ""
+    min_count: int = 1
+    max_count: int = 1
+
+
+@dataclass(frozen=True)
+class TemplatePlan:
+    """Kompiliertes Template: Liste von Schritten, direkt ausführbar."""
+    template: str
+    steps: tuple
+
+    @property
+    def min_length(self) -> int:
+        return sum(len(s.text) if s.alphabet is None else s.min_count for s in self.steps)
+
+    @property
+    def max_length(self) -> int:
+        return sum(len(s.text) if s.alphabet is None else s.max_count for s in self.steps)
+
+    def generate(self, rng: random.Random) -> str:
+        parts = []
+        for step in self.steps:
+            if step.alphabet is None:
+                parts.append(step.text)
+                continue
+            count = step.min_count
+            if step.max_count != step.min_count:
+                count += rng.randrange(step.max_count - step.min_count + 1)
+            choice = rng.choice
+            alphabet = step.alphabet
+            parts.append("".join([choice(alphabet) for _ in range(count)]))
+        return "".join(parts)
+
+    def generate_many(self, n: int, rng: random.Random) -> list[str]:
+        return [self.generate(rng) for _ in range(n)]
+
+
+def parse_class(template: str, pos: int) -> tuple[str, int]:
+    """
+    Liest eine Zeichenklasse ab template[pos] (nach dem '[') bis zum ']'.
+    Gibt (Alphabet, Position nach dem ']') zurück; auch von den Passwort-Regeln benutzt.
+    """
+    chars = []
+    while True:
+        if pos >= len(template):
+            raise TemplateError("Zeichenklasse wird nicht mit ']' geschlossen")
+        char = template[pos]
+        if char == "]":
+            pos += 1
+            break
+        if char == "\\":
+            if pos + 1 >= len(template):
+                raise TemplateError("Escape '\\' am Ende des Templates")
+            chars.append(template[pos + 1])
+            pos += 2
+            continue
+        # Bereich a-z (ein '-' am Anfang oder Ende ist ein normales Zeichen)
+        if pos + 2 < len(template) and template[pos + 1] == "-" and template[pos + 2] != "]":
+            end = template[pos + 2]
+            if ord(end) < ord(char):
+                raise TemplateError(f"Ungültiger Bereich {char}-{end}")
+            chars.extend(chr(c) for c in range(ord(char), ord(end) + 1))
+            pos += 3
+            continue
+        chars.append(char)
+        pos += 1
+
+    # Doppelte Zeichen entfernen, sonst wären sie wahrscheinlicher
+    alphabet = "".join(dict.fromkeys(chars))
+    if not alphabet:
+        raise TemplateError("Leere Zeichenklasse []")
+    return alphabet, pos
+
+
+_ASCII_NUMBER = re.compile("[0-9]+")
+
+
+def _parse_quantifier(template: str, pos: int) -> Optional[tuple[int, int, int]]:
+    """Liest {n} oder {m,n} ab template[pos]; None, wenn dort kein gültiger Quantor steht."""
+    end = template.find("}", pos)
+    if template[pos:pos + 1] != "{" or end == -1:
+        return None
+    parts = template[pos + 1:end].split(",")
+    # Nur ASCII-Ziffern: isdigit() akzeptiert auch '²', daran scheitert int()
+    if len(parts) > 2 or not all(_ASCII_NUMBER.fullmatch(p.strip()) for p in parts):
+        return None
+    low = int(parts[0])
+    high = int(parts[-1])
+    if low > high:
+        raise TemplateError(f"Quantor {{{low},{high}}}: Minimum ist größer als Maximum")
+    if high > MAX_REPEAT:
+        raise TemplateError(f"Quantor darf höchstens {MAX_REPEAT} Wiederholungen haben")
+    return low, high, end + 1
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str) -> TemplatePlan:
+    """Übersetzt ein Template in einen TemplatePlan (gecacht, jedes Template nur einmal)."""
+    if not template:
+        raise TemplateError("Template cannot be empty")
+
+    steps = []
+    pos = 0
+    while pos < len(template):
+        char = template[pos]
+        if char == "\\":
+            if pos + 1 >= len(template):
+                raise TemplateError("Escape '\\' am Ende des Templates")
+            step, pos = _Step(None, template[pos + 1]), pos + 2
+        elif char == "[":
+            alphabet, pos = parse_class(template, pos + 1)
+            step = _Step(alphabet)
+        elif char in WILDCARDS:
+            step, pos = _Step(WILDCARDS[char]), pos + 1
+        else:
+            step, pos = _Step(None, char), pos + 1
+
+        quantifier = _parse_quantifier(template, pos)
+        if quantifier is not None:
+            low, high, pos = quantifier
+            if step.alphabet is None:
+                step = _Step(None, step.text * low) if low == high else _Step(step.text, "", low, high)
+            else:
+                step = _Step(step.alphabet, "", low, high)
+
+        # Aufeinanderfolgende Literale zusammenfassen
+        if step.alphabet is None and steps and steps[-1].alphabet is None:
+            steps[-1] = _Step(None, steps[-1].text + step.text)
+        elif step.alphabet is not None or step.text:
+            steps.append(step)
+
+    plan = TemplatePlan(template, tuple(steps))
+    if plan.max_length > MAX_TEMPLATE_LENGTH:
+        raise TemplateError(f"Template erzeugt mehr als {MAX_TEMPLATE_LENGTH} Zeichen")
+    return plan
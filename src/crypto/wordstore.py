@@ -0,0 +1,317 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+"""
+Vorkompilierte Wortlisten für Passphrasen.
+
+Eine Textliste (z.B. src/data/words.txt) wird einmal geprüft und in eine Binärdatei übersetzt:
+
+    Header   MAGIC | Anzahl Wörter | eindeutige Präfixlänge | SHA-256 der Quelle (16 Byte)
+    Offsets  (Anzahl + 1) x uint32 in nativer Byte-Reihenfolge (der Cache ist rechnerlokal)
+    Blob     alle Wörter als UTF-8 hintereinander
+
+Die Datei wird per mmap geöffnet; Wort i ist blob[offsets[i]:offsets[i + 1]].
+Zugriff ist O(1), es gibt keine Python-Objekte pro Wort und alle Prozesse teilen
+sich dieselben Seiten im Page-Cache - 7.776 oder 1 Mio. Wörter kosten dasselbe.
+
+Kompilierte Dateien heißen nach dem Inhalts-Hash der Quelle und der Prüfregel
+(<sha256>-p<min_unique_prefix>.okw). Ein kleiner Index (Pfad -> Größe, mtime, Hash, Regel)
+sorgt dafür, dass eine unveränderte Textdatei beim nächsten Start weder gelesen noch erneut
+geprüft wird - aber nur, wenn sie unter derselben Regel geprüft wurde.
+"""
+
+MAGIC = b"OKWORDS2"
+_HEADER = struct.Struct("=8sII16s")  # magic, count, unique_prefix, digest - 32 Byte, Offsets bleiben ausgerichtet
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BUNDLED_WORDLIST = PROJECT_ROOT / "src" / "data" / "words.txt"
+# Eigene Listen (<name>.txt) und der Cache liegen wie die Datenbank im (nicht versionierten) data-Ordner
+USER_WORDLIST_DIR = PROJECT_ROOT / "data" / "wordlists"
+CACHE_DIR = USER_WORDLIST_DIR / "compiled"
+
+MIN_WORDS = 2
+
+
+class WordlistError(ValueError):
+    """Wortliste ist ungültig (zu klein, ungültige Wörter, Präfix-Anforderung verletzt) oder unbekannt."""
+    pass
+
+
+@dataclass(frozen=True)
+class Wordlist:
+    """
+    Eintrag in der Registry.
+    min_unique_prefix: wenn gesetzt, müssen die ersten n Zeichen jedes Worts eindeutig sein
+    (EFF short: 3) - sonst schlägt die Prüfung fehl.
+    """
+    name: str
+    path: Path
+    description: str = ""
+    min_unique_prefix: Optional[int] = None
+
+
+WORDLISTS = {
+    "eff-short": Wordlist(
+        "eff-short", BUNDLED_WORDLIST, "EFF Short Wordlist 2.0 (1.296 Wörter, mitgeliefert)", min_unique_prefix=3
+    ),
+    # Nicht mitgeliefert: https://www.eff.org/files/2016/07/18/eff_large_wordlist.txt nach data/wordlists/ legen
+    "eff-large": Wordlist(
+        "eff-large", USER_WORDLIST_DIR / "eff_large_wordlist.txt", "EFF Large Wordlist (7.776 Wörter)"
+    ),
+}
+DEFAULT_WORDLIST_NAME = "eff-short"
+
+# Registry: jede Liste wird pro Prozess nur einmal geöffnet, alle Service-Instanzen teilen sie
+_stores = {}
+_lock = threading.RLock()
+
+
+def register_wordlist(name: str, path, description: str = "", min_unique_prefix: Optional[int] = None) -> Wordlist:
+    """Macht eine eigene Liste (anderes Korpus, andere Sprache) unter 'name' verfügbar."""
+    entry = Wordlist(name, Path(path), description, min_unique_prefix)
+    with _lock:
+        WORDLISTS[name] = entry
+        _stores.pop(name, None)
+    return entry
+
+
+def available_wordlists() -> list[Wordlist]:
+    """Registrierte Listen, deren Datei existiert, plus alle data/wordlists/<name>.txt."""
+    entries = {name: entry for name, entry in WORDLISTS.items() if entry.path.exists()}
+    if USER_WORDLIST_DIR.is_dir():
+        for path in sorted(USER_WORDLIST_DIR.glob("*.txt")):
+            if path.stem not in entries and all(e.path != path for e in entries.values()):
+                entries[path.stem] = Wordlist(path.stem, path, "eigene Liste")
+    return list(entries.values())
+
+
+def _lookup(name: str) -> Wordlist:
+    entry = WORDLISTS.get(name)
+    if entry is not None:
+        return entry
+    # Nur einfache Namen - kein Pfad über '../'
+    if name.replace("-", "").replace("_", "").isalnum():
+        path = USER_WORDLIST_DIR / f"{name}.txt"
+        if path.exists():
+            return Wordlist(name, path, "eigene Liste")
+    raise WordlistError(f"Unknown wordlist: {name}")
+
+
+def parse_wordlist(lines: Iterable[str]) -> list[str]:
+    """Liest eine Wortliste: '#'-Kommentare und Leerzeilen werden übersprungen, 'Würfelzahl<TAB>Wort' ist erlaubt."""
+    words = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if '\t' in line:
+            _, line = line.split('\t', 1)
+            line = line.strip()
+        words.append(line)
+    return words
+
+
+def unique_prefix_length(words: list[str]) -> int:
+    """
+    Kleinste Länge n, ab der die ersten n Zeichen jedes Worts eindeutig sind.
+    0, wenn ein Wort Präfix eines anderen ist (dann gibt es kein solches n).
+    Sortiert genügt es, nur Nachbarn zu vergleichen.
+    """
+    ordered = sorted(words)
+    longest = 0
+    for a, b in zip(ordered, ordered[1:]):
+        common = len(os.path.commonprefix((a, b)))
+        if common == len(a):
+            return 0
+        longest = max(longest, common)
+    return longest + 1
+
+
+def validate_words(words: list[str], min_unique_prefix: Optional[int] = None) -> list[str]:
+    """
+    Prüft eine Liste einmalig vor dem Kompilieren:
+    - Duplikate (ohne Groß/Klein, da das erste Wort großgeschrieben wird) fallen weg, Reihenfolge bleibt
+    - Wörter mit Leer- oder Steuerzeichen sind ungültig
+    - optional: die ersten min_unique_prefix Zeichen müssen eindeutig sein
+    """
+    seen = set()
+    unique = []
+    for word in words:
+        if not word.isprintable() or any(char.isspace() for char in word):
+            raise WordlistError(f"Ungültiges Wort in der Wortliste: {word!r}")
+        key = word.casefold()
+        if key not in seen:
+            seen.add(key)
+            unique.append(word)
+
+    if len(unique) < MIN_WORDS:
+        raise WordlistError(f"Wortliste braucht mindestens {MIN_WORDS} verschiedene Wörter")
+
+    if min_unique_prefix is not None:
+        prefixes = {}
+        for word in unique:
+            prefix = word[:min_unique_prefix].casefold()
+            if prefix in prefixes:
+                raise WordlistError(
+                    f"'{prefixes[prefix]}' und '{word}' haben dasselbe Präfix '{prefix}' "
+                    f"(gefordert: eindeutig nach {min_unique_prefix} Zeichen)"
+                )
+            prefixes[prefix] = word
+    return unique
+
+
+def compile_words(words: list[str], digest: bytes = b"") -> bytes:
+    """Erzeugt das Binärformat (Header + Offset-Tabelle + Blob)."""
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    if offsets[-1] >= 2 ** 32:
+        raise WordlistError("Wortliste ist zu groß (Blob > 4 GiB)")
+    header = _HEADER.pack(MAGIC, len(encoded), unique_prefix_length(words), digest[:16])
+    return header + struct.pack(f"={len(offsets)}I", *offsets) + b"".join(encoded)
+
+
+class WordStore(Sequence):
+    """
+    Read-only Sequenz über eine kompilierte Wortliste (mmap oder bytes).
+    Funktioniert direkt mit random.choice(), len() und Indexzugriff.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        magic, count, self.unique_prefix, self.digest = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Keine kompilierte OdinKey-Wortliste")
+        self._count = count
+        table_start = _HEADER.size
+        blob_start = table_start + 4 * (count + 1)
+        view = memoryview(buffer)
+        self._offsets = view[table_start:blob_start].cast("I")
+        self._blob = view[blob_start:]
+        if len(self._blob) != self._offsets[count]:
+            raise ValueError("Kompilierte Wortliste ist beschädigt")
+
+    @classmethod
+    def from_words(cls, words: list[str]) -> "WordStore":
+        """Store im Speicher (ohne Datei), z.B. für die eingebaute Notfall-Liste."""
+        return cls(compile_words(words))
+
+    @classmethod
+    def open(cls, path: Path) -> "WordStore":
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("word index out of range")
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+
+def _write_atomic(target: Path, data: bytes) -> None:
+    # Atomar per rename - parallele Prozesse sehen nie eine halbe Datei
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, target)
+
+
+def _index_path() -> Path:
+    return CACHE_DIR / "index.json"
+
+
+def _read_index() -> dict:
+    try:
+        return json.loads(_index_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _compiled_name(digest: str, min_unique_prefix: Optional[int]) -> str:
+    # Die Prüfregel gehört zum Schlüssel: dieselbe Datei unter strengerer Regel wird neu geprüft
+    return f"{digest}-p{min_unique_prefix or 0}.okw"
+
+
+def load(source: Path, min_unique_prefix: Optional[int] = None) -> WordStore:
+    """
+    Öffnet die kompilierte Version von source.
+    Unveränderte Quelle (Größe + mtime wie im Index) unter derselben Prüfregel -> nur mmap,
+    kein Lesen, keine Prüfung. Sonst: Inhalt hashen; gibt es <hash>-p<regel>.okw schon, wird sie
+    benutzt, ansonsten prüfen und kompilieren.
+    """
+    stat = source.stat()
+    stamp = [stat.st_size, stat.st_mtime_ns]
+    index = _read_index()
+    entry = index.get(str(source))
+    if entry is not None and entry["stamp"] == stamp and entry.get("min_unique_prefix") == min_unique_prefix:
+        try:
+            return WordStore.open(CACHE_DIR / _compiled_name(entry["sha256"], min_unique_prefix))
+        except (OSError, ValueError, struct.error):
+            pass
+
+    content = source.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    target = CACHE_DIR / _compiled_name(digest, min_unique_prefix)
+    try:
+        store = WordStore.open(target)
+    except (OSError, ValueError, struct.error):
+        words = validate_words(parse_wordlist(content.decode("utf-8").splitlines()), min_unique_prefix)
+        data = compile_words(words, bytes.fromhex(digest))
+        try:
+            _write_atomic(target, data)
+            store = WordStore.open(target)
+        except OSError:
+            # data-Ordner nicht beschreibbar -> im Speicher behalten
+            return WordStore(data)
+
+    index[str(source)] = {"stamp": stamp, "sha256": digest, "min_unique_prefix": min_unique_prefix}
+    try:
+        _write_atomic(_index_path(), json.dumps(index, indent=1).encode("utf-8"))
+    except OSError:
+        pass
+    return store
+
+
+def get_wordstore(name: str = DEFAULT_WORDLIST_NAME, fallback: Optional[list[str]] = None) -> WordStore:
+    """
+    Liefert den gemeinsamen WordStore der Liste 'name' (lazy, erst beim ersten Zugriff).
+    Fehlt die Datei oder ist sie ungültig, wird - falls angegeben - fallback verwendet.
+    """
+    store = _stores.get(name)
+    if store is not None:
+        return store
+    with _lock:
+        store = _stores.get(name)
+        if store is None:
+            entry = _lookup(name)
+            if not entry.path.exists() and fallback is None:
+                raise WordlistError(f"Wordlist '{name}' not found: {entry.path}")
+            try:
+                store = load(entry.path.resolve(), entry.min_unique_prefix) if entry.path.exists() else None
+            except (OSError, UnicodeDecodeError, WordlistError) as e:
+                if fallback is None:
+                    raise
+                print(f"Failed to load wordlist '{name}': {e}", file=sys.stderr)
+                store = None
+            if store is None:
+                store = WordStore.from_words(fallback)
+            _stores[name] = store
+    return store
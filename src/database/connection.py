@@ -1,44 +1,154 @@
 import sqlite3
 import os
+import threading
+import weakref
+
+from src.database.models import migrate, get_schema_version
+
+
+class _PooledConnection(sqlite3.Connection):
+    """
+    sqlite3-Connection, die im Pool lebt.
+    close() gibt die Verbindung nur an den Pool zurück (No-Op), damit bestehender Code
+    mit 'conn.close()' die langlebige Verbindung nicht versehentlich zerstört.
+    Wirklich geschlossen wird sie erst über DatabaseConnection.close().
+    """
+
+    def close(self):
+        pass
+
+    def _close_for_real(self):
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Pool aus einer Verbindung pro Thread für eine Datenbank-Datei.
+    Jede Verbindung wird einmal geöffnet, mit PRAGMAs konfiguriert und danach
+    für die ganze Laufzeit wiederverwendet (kein connect()/close() pro Klick mehr).
+    """
+
+    BUSY_TIMEOUT_MS = 5000  # Warten statt "database is locked", wenn GUI und CLI parallel schreiben
+    CACHE_SIZE_KIB = 16384  # 16 MiB Page-Cache pro Verbindung (negativer Wert = KiB)
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.migrated = False
+        self.migrate_lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._reap_dead_threads()
+                # Besitzer nur schwach referenzieren -> beendete Threads werden erkannt
+                self._connections.append((weakref.ref(threading.current_thread()), conn))
+        return conn
+
+    def _reap_dead_threads(self):
+        # Verbindungen von beendeten Threads (z.B. Worker aus der GUI) wirklich schließen
+        alive = []
+        for owner, conn in self._connections:
+            thread = owner()
+            if thread is not None and thread.is_alive():
+                alive.append((owner, conn))
+            else:
+                conn._close_for_real()
+        self._connections = alive
+
+    def _open(self) -> sqlite3.Connection:
+        if self.db_path != ":memory:":
+            # data folder wird erst beim ersten Zugriff erstellt
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        # check_same_thread=False nur, damit close_all() aus einem anderen Thread schließen darf.
+        # Benutzt wird jede Verbindung trotzdem nur von ihrem eigenen Thread.
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            factory=_PooledConnection
+        )
+        conn.row_factory = sqlite3.Row  # Row erlaubt Zugriff per Name UND Index (row[0])
+        # WAL: Leser blockieren Schreiber nicht mehr -> GUI und CLI gleichzeitig möglich
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL reicht mit WAL (kein fsync pro Commit, trotzdem konsistent)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size=-{self.CACHE_SIZE_KIB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return bool(self._connections)
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn._close_for_real()
+        # Neue threading.local, damit kein Thread eine geschlossene Verbindung zurückbekommt
+        self._local = threading.local()
+
 
 class DatabaseConnection:
-    def __init__(self):
+    # Ein Pool pro Datenbank-Datei, geteilt von allen DatabaseConnection-Instanzen
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path: str = None):
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.project_root = os.path.dirname(os.path.dirname(base_dir))
-        self.db_path = os.path.join(self.project_root, "data", "odinkey.db")
-
-
-    def connect(self):
-        return sqlite3.connect(self.db_path)
-
-    def create_tables(self):
-        with self.connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS master_account (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                salt TEXT NOT NULL
-            )
-            """)
-
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS password_profiles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                service_name TEXT NOT NULL,
-                url TEXT,
-                username TEXT,
-                password_blob BLOB NOT NULL,
-                nonce BLOB NOT NULL,
-                salt BLOB,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(user_id) REFERENCES master_account(id)
-            )
-            """)
-            conn.commit()
+        if db_path is None:
+            db_path = os.path.join(self.project_root, "data", "odinkey.db")
+        self.db_path = db_path
+        self.pool = self._get_pool(db_path)
+
+    @classmethod
+    def _get_pool(cls, db_path: str) -> ConnectionPool:
+        # ':memory:' ist pro Verbindung eine eigene DB -> nicht teilen
+        key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None or key == ":memory:":
+                pool = ConnectionPool(db_path)
+                if key != ":memory:":
+                    cls._pools[key] = pool
+            return pool
+
+    @classmethod
+    def reset_pools(cls):
+        """Schließt alle Pools und vergisst sie (z.B. in Tests, bevor eine DB-Datei gelöscht wird)."""
+        with cls._pools_lock:
+            pools, cls._pools = list(cls._pools.values()), {}
+        for pool in pools:
+            pool.close_all()
+
+    def connect(self) -> sqlite3.Connection:
+        """Gibt die langlebige Verbindung des aktuellen Threads zurück."""
+        conn = self.pool.get()
+        if not self.pool.migrated:
+            # Einmal pro Pool: alte Tresore auf die aktuelle Schema-Version bringen
+            with self.pool.migrate_lock:
+                if not self.pool.migrated:
+                    migrate(conn)
+                    self.pool.migrated = True
+        return conn
+
+    def close(self):
+        """Schließt alle Verbindungen des Pools (z.B. beim Beenden oder in Tests)."""
+        self.pool.close_all()
+
+    def create_tables(self) -> int:
+        """Erstellt die Tabellen bzw. migriert eine bestehende DB auf die aktuelle Schema-Version."""
+        conn = self.connect()  # connect() führt die Migrationen beim ersten Zugriff aus
+        return get_schema_version(conn)
 
 
 db = DatabaseConnection()
@@ -46,4 +156,4 @@ if __name__ == "__main__":
     print("Versuche Datenbank zu erstellen...")
     db = DatabaseConnection()
     db.create_tables()
-    print(f"Datenbank liegt unter: {db.db_path}") # Hier stand vorher .db_file (Fehler)
\ No newline at end of file
+    print(f"Datenbank liegt unter: {db.db_path}") # Hier stand vorher .db_file (Fehler)
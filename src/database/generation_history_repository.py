@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+
+from src.database.connection import db as DatabaseConnection
+
+
+class GenerationHistoryRepository:
+    """Gespeicherter Bloom-Filter der generierten Passwörter, ein Eintrag pro Tresor (user_id)."""
+
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+
+    def load(self, user_id: int) -> Optional[tuple[bytes, bytes]]:
+        """(key_check, filter) oder None, wenn es noch keinen Verlauf gibt."""
+        with self.db.connect() as conn:
+            row = conn.execute(
+                "SELECT key_check, filter FROM generation_history WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return (row["key_check"], row["filter"]) if row else None
+
+    def save(self, user_id: int, key_check: bytes, data: bytes, entries: int) -> None:
+        with self.db.connect() as conn:
+            conn.execute("""
+                INSERT INTO generation_history (user_id, key_check, filter, entries, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET key_check = excluded.key_check, filter = excluded.filter,
+                    entries = excluded.entries, updated_at = excluded.updated_at
+            """, (user_id, key_check, data, entries, datetime.now().isoformat()))
+            conn.commit()
+
+    def delete(self, user_id: int) -> None:
+        with self.db.connect() as conn:
+            conn.execute("DELETE FROM generation_history WHERE user_id = ?", (user_id,))
+            conn.commit()
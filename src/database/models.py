@@ -3,17 +3,18 @@ import sqlite3
 
 def create_schema(cursor: sqlite3.Cursor):
     """
-    Erstellt die notwendigen Tabellen für OdinKey.
+    Erstellt die notwendigen Tabellen für OdinKey (Schema Version 1).
+    Entspricht dem Schema, das bisher in DatabaseConnection.create_tables() stand,
+    damit bestehende Tresore unverändert übernommen werden.
     """
 
     # 1. Tabelle: Master Account
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS master_account (
                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                   username TEXT NOT NULL,
+                   username TEXT UNIQUE NOT NULL,
                    password_hash TEXT NOT NULL,
-                   salt BLOB NOT NULL,
-                   created_at TEXT
+                   salt TEXT NOT NULL
         );
     """)
 
@@ -23,15 +24,241 @@ def create_schema(cursor: sqlite3.Cursor):
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS password_profiles (
                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                   user_id INTEGER NOT NULL,
+                   user_id INTEGER,
                    service_name TEXT NOT NULL,
-                   url TEXT NOT NULL,
-                   username TEXT NOT NULL,
+                   url TEXT,
+                   username TEXT,
                    password_blob BLOB NOT NULL,
                    nonce BLOB NOT NULL,
                    salt BLOB,
                    notes TEXT,
-                   created_at TEXT,
+                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                    FOREIGN KEY (user_id) REFERENCES master_account (id)
         );
-    """)
\ No newline at end of file
+    """)
+
+
+def _add_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+    # ALTER TABLE kennt kein "IF NOT EXISTS" -> vorher selbst prüfen
+    columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _migration_2_timestamps_and_indexes(cursor: sqlite3.Cursor):
+    """
+    Version 2:
+    - updated_at + Epoch-Zeitstempel (INTEGER) für Sortierung/Vergleiche ohne String-Parsing
+    - created_at auch im master_account (stand bisher nur in der alten models.py)
+    - Indizes, damit Liste und Suche keine Full-Table-Scans mehr machen
+    """
+    # SQLite erlaubt bei ADD COLUMN keinen DEFAULT CURRENT_TIMESTAMP -> MasterAccountRepository setzt den Wert
+    _add_column(cursor, "master_account", "created_at", "TEXT")
+    _add_column(cursor, "password_profiles", "updated_at", "TEXT")
+    _add_column(cursor, "password_profiles", "created_ts", "INTEGER")
+    _add_column(cursor, "password_profiles", "updated_ts", "INTEGER")
+
+    # Bestehende Einträge nachziehen (created_at ist ISO-Format oder CURRENT_TIMESTAMP)
+    cursor.execute("""
+        UPDATE password_profiles
+        SET created_ts = CAST(strftime('%s', created_at) AS INTEGER)
+        WHERE created_ts IS NULL
+    """)
+    cursor.execute("""
+        UPDATE password_profiles
+        SET updated_at = created_at, updated_ts = created_ts
+        WHERE updated_ts IS NULL
+    """)
+
+    # Covering Index für die Liste (SELECT id, service_name, username, url WHERE user_id = ?)
+    # id ist die rowid und steckt in jedem Index -> die Tabelle selbst wird nicht gelesen
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_profiles_user_service
+        ON password_profiles (user_id, service_name, username, url)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_profiles_user_username
+        ON password_profiles (user_id, username)
+    """)
+
+
+def _migration_3_fulltext_search(cursor: sqlite3.Cursor):
+    """
+    Version 3: FTS5-Volltextindex über service_name, username, url und notes.
+    External-Content-Tabelle -> der Text liegt nur einmal in password_profiles,
+    die Trigger halten den Index synchron. Das Passwort ist NICHT im Index.
+    Ohne FTS5 fehlt der Index; migrate() versucht ihn bei jedem Start erneut anzulegen.
+    """
+    _create_fulltext_search(cursor)
+
+
+def _create_fulltext_search(cursor: sqlite3.Cursor) -> bool:
+    """Legt Index und Trigger an; False, wenn SQLite ohne FTS5 gebaut ist."""
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS password_profiles_fts USING fts5(
+                service_name, username, url, notes,
+                content='password_profiles',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite ohne FTS5 -> Suche fällt im Repository auf LIKE zurück
+        return False
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS password_profiles_fts_insert
+        AFTER INSERT ON password_profiles BEGIN
+            INSERT INTO password_profiles_fts (rowid, service_name, username, url, notes)
+            VALUES (new.id, new.service_name, new.username, new.url, new.notes);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS password_profiles_fts_delete
+        AFTER DELETE ON password_profiles BEGIN
+            INSERT INTO password_profiles_fts (password_profiles_fts, rowid, service_name, username, url, notes)
+            VALUES ('delete', old.id, old.service_name, old.username, old.url, old.notes);
+        END
+    """)
+    # Nur bei Änderungen an den indexierten Spalten (nicht bei neuem password_blob)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS password_profiles_fts_update
+        AFTER UPDATE OF service_name, username, url, notes ON password_profiles BEGIN
+            INSERT INTO password_profiles_fts (password_profiles_fts, rowid, service_name, username, url, notes)
+            VALUES ('delete', old.id, old.service_name, old.username, old.url, old.notes);
+            INSERT INTO password_profiles_fts (rowid, service_name, username, url, notes)
+            VALUES (new.id, new.service_name, new.username, new.url, new.notes);
+        END
+    """)
+    # Bestehende Einträge einmalig indexieren
+    cursor.execute("INSERT INTO password_profiles_fts (password_profiles_fts) VALUES ('rebuild')")
+    return True
+
+
+def has_fulltext_search(conn: sqlite3.Connection) -> bool:
+    """True, wenn der FTS5-Index angelegt ist (sonst lief die Migration auf einem SQLite ohne FTS5)."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'password_profiles_fts'"
+    ).fetchone() is not None
+
+
+def ensure_fulltext_search(conn: sqlite3.Connection) -> bool:
+    """
+    Holt den Volltextindex nach, falls Migration 3 auf einem SQLite ohne FTS5 lief
+    (user_version ist dann schon >= 3). True, wenn der Index existiert.
+    """
+    if has_fulltext_search(conn):
+        return True
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        created = _create_fulltext_search(conn.cursor())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return created
+
+
+def _migration_4_kdf_params(cursor: sqlite3.Cursor):
+    """
+    Version 4: Parameter der Schlüsselableitung pro Tresor (JSON, siehe crypto/kdf.py).
+    NULL = alter Tresor mit PBKDF2 und 100.000 Iterationen, wird beim nächsten Login umgestellt.
+    """
+    _add_column(cursor, "master_account", "kdf_params", "TEXT")
+
+
+def _migration_5_password_rules(cursor: sqlite3.Cursor):
+    """
+    Version 5: Passwort-Regeln (siehe crypto/password_rules.py) pro Profil und pro Domain.
+    Die Regel am Profil hat Vorrang; sonst gilt die Regel der Domain aus der URL.
+    """
+    _add_column(cursor, "password_profiles", "password_rule", "TEXT")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS domain_password_rules (
+                   user_id INTEGER NOT NULL,
+                   domain TEXT NOT NULL,
+                   rule TEXT NOT NULL,
+                   updated_at TEXT,
+                   PRIMARY KEY (user_id, domain),
+                   FOREIGN KEY (user_id) REFERENCES master_account (id)
+        )
+    """)
+
+
+def _migration_6_generation_history(cursor: sqlite3.Cursor):
+    """
+    Version 6: Verlauf generierter Passwörter pro Tresor als Bloom-Filter über HMAC-Fingerprints
+    (siehe services/uniqueness_guard.py). Enthält keine Passwörter, nur gesetzte Bits.
+    key_check erkennt, ob der Filter noch zum aktuellen Vault-Key passt.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS generation_history (
+                   user_id INTEGER PRIMARY KEY,
+                   key_check BLOB NOT NULL,
+                   filter BLOB NOT NULL,
+                   entries INTEGER NOT NULL DEFAULT 0,
+                   updated_at TEXT,
+                   FOREIGN KEY (user_id) REFERENCES master_account (id)
+        )
+    """)
+
+
+def _migration_7_wrapped_data_key(cursor: sqlite3.Cursor):
+    """
+    Version 7: Schlüsselhierarchie. Die Profile sind mit einem zufälligen Data-Key verschlüsselt;
+    gespeichert wird nur dieser Key, verschlüsselt mit dem Key aus dem Master-Passwort.
+    NULL = Profile noch direkt mit dem Passwort-Key verschlüsselt, wird beim nächsten Login umgestellt.
+    """
+    _add_column(cursor, "master_account", "wrapped_dek", "BLOB")
+    _add_column(cursor, "master_account", "dek_nonce", "BLOB")
+
+
+# Reihenfolge = Versionsnummer (Index 0 -> user_version 1)
+# Neue Änderungen am Schema IMMER als neue Migration hinten anhängen, nie alte ändern!
+MIGRATIONS = [
+    create_schema,
+    _migration_2_timestamps_and_indexes,
+    _migration_3_fulltext_search,
+    _migration_4_kdf_params,
+    _migration_5_password_rules,
+    _migration_6_generation_history,
+    _migration_7_wrapped_data_key,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Bringt die Datenbank auf SCHEMA_VERSION (gespeichert in PRAGMA user_version).
+    Jede Migration läuft in einer eigenen Transaktion; schlägt sie fehl,
+    bleibt die DB auf der vorherigen Version.
+    """
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Datenbank hat Schema-Version {version}, diese OdinKey-Version kennt nur {SCHEMA_VERSION}"
+        )
+
+    while version < SCHEMA_VERSION:
+        # IMMEDIATE sperrt sofort für Schreiber -> GUI und CLI migrieren nicht doppelt
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = get_schema_version(conn)
+            if version < SCHEMA_VERSION:
+                MIGRATIONS[version](conn.cursor())
+                version += 1
+                conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    ensure_fulltext_search(conn)
+    return version
@@ -1,8 +1,15 @@
+import logging
 import sqlite3
-from typing import Optional
-from src.core.password_profile import PasswordProfile
-from src.crypto.encryption import Encryption
+import time
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+from src.core.password_profile import PasswordProfile, LazyPasswordProfile, ProfileSummary
+from src.crypto.encryption import Encryption, CipherContext
+from src.crypto.bulk import BulkCipher
 from src.database.connection import db as DatabaseConnection
+from src.database.models import has_fulltext_search
+
+logger = logging.getLogger(__name__)
 
 
 class PasswordProfileRepository:
@@ -18,27 +25,33 @@ class PasswordProfileRepository:
     def update_profile(self, profile: PasswordProfile) -> None:
         """
         Updates an existing password profile (fields and encrypted password).
+        A LazyPasswordProfile whose password was never read keeps its stored
+        ciphertext, so editing only metadata costs no AES operation.
         """
-        nonce, encrypted_password = self.crypto.encrypt_data(self.master_key, profile.password)
-        salt = b""
-        query = """
-            UPDATE password_profiles
-            SET service_name = ?, url = ?, username = ?, password_blob = ?, nonce = ?, salt = ?, notes = ?, created_at = ?
-            WHERE id = ?
-        """
+        # created_at bleibt unverändert, nur der Änderungszeitpunkt wird gesetzt
+        profile.updated_at = datetime.now().isoformat()
+        values = [
+            profile.service_name,
+            profile.url,
+            profile.username,
+            profile.notes,
+            profile.password_rule,
+            profile.updated_at,
+            int(time.time())
+        ]
+        assignments = ("service_name = ?, url = ?, username = ?, notes = ?, password_rule = ?, "
+                       "updated_at = ?, updated_ts = ?")
+
+        if not isinstance(profile, LazyPasswordProfile) or profile.is_decrypted:
+            nonce, encrypted_password = self.cipher.encrypt(profile.password)
+            salt = b""
+            assignments += ", password_blob = ?, nonce = ?, salt = ?"
+            values += [encrypted_password, nonce, salt]
+
+        query = f"UPDATE password_profiles SET {assignments} WHERE id = ?"
         with self.db.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (
-                profile.service_name,
-                profile.url,
-                profile.username,
-                encrypted_password,
-                nonce,
-                salt,
-                profile.notes,
-                profile.created_at,
-                profile.id
-            ))
+            cursor.execute(query, (*values, profile.id))
             conn.commit()
 
     def __init__(self, db_connection: DatabaseConnection, master_key: bytes):
@@ -49,20 +62,30 @@ class PasswordProfileRepository:
         self.master_key = master_key #32-Byte Key abgeleitet vom Master-Passwort - dient zur ver- und entschlüsselung
         self.crypto = Encryption() #Instanz der Encryption Klasse
 
+    @property
+    def cipher(self) -> CipherContext:
+        """An master_key gebundener AES-GCM Kontext (Key Schedule nur einmal pro Key)."""
+        return self.crypto.context(self.master_key)
+
     def create_profile(self, profile: PasswordProfile) -> int: #FMR12
         """
         Verschlüsselt das Passwort und speichert das Profil.
         """
 
-        nonce, encrypted_password = self.crypto.encrypt_data(self.master_key, profile.password)
+        nonce, encrypted_password = self.cipher.encrypt(profile.password)
 
         # Salt ist hier optional/leer, da wir den Master-Key direkt nutzen
         salt = b""
 
+        # Epoch-Zeitstempel zusätzlich zum ISO-String (für Sortierung ohne String-Parsing)
+        now_ts = int(time.time())
+        profile.updated_at = profile.created_at
+
         query = """
             INSERT INTO password_profiles 
-            (user_id, service_name, url, username, password_blob, nonce, salt, notes, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (user_id, service_name, url, username, password_blob, nonce, salt, notes, password_rule,
+             created_at, updated_at, created_ts, updated_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
 
         with self.db.connect() as conn:
@@ -76,85 +99,199 @@ class PasswordProfileRepository:
                 nonce,  # Die Nonce
                 salt,
                 profile.notes,
-                profile.created_at
+                profile.password_rule,
+                profile.created_at,
+                profile.updated_at,
+                now_ts,
+                now_ts
             ))
             conn.commit()
             return cursor.lastrowid
 
+    def _decryptor(self, nonce: bytes, ciphertext: bytes):
+        # Closure für LazyPasswordProfile: entschlüsselt erst, wenn .password gelesen wird
+        def decrypt() -> str:
+            return self.cipher.decrypt(nonce, ciphertext)
+        return decrypt
+
+    def _profile_from_row(self, row) -> LazyPasswordProfile:
+        return LazyPasswordProfile(
+            decrypt=self._decryptor(row["nonce"], row["password_blob"]),
+            id=row["id"],
+            user_id=row["user_id"],
+            service_name=row["service_name"],
+            url=row["url"],
+            username=row["username"],
+            notes=row["notes"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            password_rule=row["password_rule"]
+        )
+
+    @staticmethod
+    def _summary_from_row(row) -> ProfileSummary:
+        return ProfileSummary(
+            id=row["id"],
+            user_id=row["user_id"],
+            service_name=row["service_name"],
+            username=row["username"],
+            url=row["url"]
+        )
+
     def get_profile_by_id(self, profile_id: int) -> Optional[PasswordProfile]:
         """
-        Lädt ein Profil und entschlüsselt das Passwort wieder.
+        Lädt ein Profil. Das Passwort wird erst beim Zugriff auf .password entschlüsselt.
         """
         query = "SELECT * FROM password_profiles WHERE id = ?"
 
         with self.db.connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, (profile_id,))
-            row = cursor.fetchone()
+            row = conn.execute(query, (profile_id,)).fetchone()
 
-            if not row:
-                return None
+        if not row:
+            return None
+        return self._profile_from_row(row)
 
-            # Entschlüsseln
-            decrypted_password = self.crypto.decrypt_data(
-                key=self.master_key,
-                nonce=row["nonce"],
-                ciphertext=row["password_blob"]
-            )
+    def list_profiles(self, user_id: int) -> list[ProfileSummary]:
+        """Alle Profile eines Users nur mit Metadaten (Covering Index, keine Entschlüsselung)."""
+        with self.db.connect() as conn:
+            rows = conn.execute(
+                "SELECT id, user_id, service_name, username, url FROM password_profiles WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+        return [self._summary_from_row(row) for row in rows]
+
+    # Gewichte für bm25(): Treffer im Service-Namen zählen am meisten, Notizen am wenigsten
+    SEARCH_WEIGHTS = (10.0, 5.0, 2.0, 1.0)  # service_name, username, url, notes
 
-            return PasswordProfile(
+    @staticmethod
+    def build_fts_query(query: str) -> Optional[str]:
+        """
+        Wandelt die Benutzereingabe in eine FTS5-Abfrage um.
+        Jedes Wort wird als Phrase mit Präfix-Suche ("wort"*) übergeben, dadurch
+        können Sonderzeichen wie '-' oder ':' keine FTS5-Syntax auslösen.
+        Alle Wörter müssen vorkommen (implizites AND).
+        """
+        terms = []
+        for term in query.split():
+            term = term.replace('"', '""')
+            if any(ch.isalnum() for ch in term):
+                terms.append(f'"{term}"*')
+        return " ".join(terms) if terms else None
+
+    def search_profiles(self, user_id: int, query: str) -> list[ProfileSummary]:
+        """
+        Sucht nach Profilen (Service, Username, URL, Notizen) - sortiert nach Relevanz (BM25).
+        Liefert nur Metadaten, es wird kein einziges Passwort entschlüsselt.
+        """
+        fts_query = self.build_fts_query(query)
+        if fts_query is None:
+            return []
+
+        with self.db.connect() as conn:
+            if has_fulltext_search(conn):
+                # Fehler hier (beschädigter Index, ungültiges MATCH) werden nicht verschluckt
+                rows = conn.execute(f"""
+                    SELECT p.id, p.user_id, p.service_name, p.username, p.url
+                    FROM password_profiles_fts
+                    JOIN password_profiles p ON p.id = password_profiles_fts.rowid
+                    WHERE password_profiles_fts MATCH ? AND p.user_id = ?
+                    ORDER BY bm25(password_profiles_fts, {", ".join(map(str, self.SEARCH_WEIGHTS))})
+                """, (fts_query, user_id)).fetchall()
+            else:
+                # SQLite ohne FTS5 -> alte LIKE-Suche (Full Table Scan) über dieselben Spalten
+                logger.warning("Kein FTS5-Index vorhanden, Suche per LIKE (ohne Ranking)")
+                search_term = f"%{query}%"
+                rows = conn.execute("""
+                    SELECT id, user_id, service_name, username, url FROM password_profiles
+                    WHERE user_id = ? AND (service_name LIKE ? OR username LIKE ? OR url LIKE ? OR notes LIKE ?)
+                """, (user_id, search_term, search_term, search_term, search_term)).fetchall()
+
+        return [self._summary_from_row(row) for row in rows]
+
+    # --- Bulk-Pfade (Export, Audit, Re-Keying) ---
+    # Hier werden alle Passwörter eines Users auf einmal entschlüsselt -> Batches auf mehreren Threads
+    BULK_WORKERS = None  # None = Anzahl Kerne (max. BulkCipher.MAX_DEFAULT_WORKERS)
+    BULK_BATCH_SIZE = BulkCipher.DEFAULT_BATCH_SIZE
+
+    def bulk(self, key: Optional[bytes] = None) -> BulkCipher:
+        context = self.cipher if key is None else CipherContext(key)
+        return BulkCipher(context, workers=self.BULK_WORKERS, batch_size=self.BULK_BATCH_SIZE)
+
+    def _decrypt_rows(self, rows) -> Iterator[str]:
+        return self.bulk().decrypt_iter((row["nonce"], row["password_blob"]) for row in rows)
+
+    _BULK_COLUMNS = ("id, user_id, service_name, url, username, notes, password_rule, created_at, updated_at, "
+                     "nonce, password_blob")
+
+    def _fetch_all_encrypted(self, user_id: Optional[int]) -> list:
+        query = f"SELECT {self._BULK_COLUMNS} FROM password_profiles"
+        params = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        with self.db.connect() as conn:
+            return conn.execute(query + " ORDER BY id", params).fetchall()
+
+    def export_profiles(self, user_id: int) -> list[PasswordProfile]:
+        """Alle Profile eines Users inklusive entschlüsseltem Passwort (z.B. für einen Export)."""
+        rows = self._fetch_all_encrypted(user_id)
+        passwords = self._decrypt_rows(rows)
+        return [
+            PasswordProfile(
                 id=row["id"],
                 user_id=row["user_id"],
                 service_name=row["service_name"],
                 url=row["url"],
                 username=row["username"],
-                password=decrypted_password,  # Ist jetzt wieder ein String!
+                password=password,
                 notes=row["notes"],
-                created_at=row["created_at"]
+                created_at=row["created_at"],
+                updated_at=row["updated_at"],
+                password_rule=row["password_rule"]
             )
+            for row, password in zip(rows, passwords)
+        ]
 
-    def search_profiles(self, user_id: int, query: str) -> list[PasswordProfile]:
-        """Sucht nach Profilen (Service oder Username)."""
-        search_term = f"%{query}%"
-
-        #
-        with self.db.connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+    def find_reused_passwords(self, user_id: int) -> list[list[ProfileSummary]]:
+        """
+        Audit: Gruppen von Profilen, die dasselbe Passwort verwenden.
+        Die Klartexte werden nur zum Gruppieren benutzt und nicht zurückgegeben.
+        """
+        rows = self._fetch_all_encrypted(user_id)
+        passwords = self._decrypt_rows(rows)
 
+        groups = {}
+        for row, password in zip(rows, passwords):
+            groups.setdefault(password, []).append(self._summary_from_row(row))
+        return [group for group in groups.values() if len(group) > 1]
 
-            query_sql = """
-                SELECT * FROM password_profiles 
-                WHERE user_id = ? AND (service_name LIKE ? OR username LIKE ?)
-            """
-            cursor.execute(query_sql, (user_id, search_term, search_term))
-
-            rows = cursor.fetchall()
-            profiles = []
-
-            for row in rows:
-                # direkte Entschlüsselung
-                # Fehler abfangen
-                try:
-                    decrypted_password = self.crypto.decrypt_data(
-                        key=self.master_key,
-                        nonce=row["nonce"],
-                        ciphertext=row["password_blob"]
-                    )
-                except Exception:
-                    decrypted_password = "[Entschlüsselungsfehler]"
-
-                p = PasswordProfile(
-                    id=row["id"],
-                    user_id=row["user_id"],
-                    service_name=row["service_name"],
-                    url=row["url"],
-                    username=row["username"],
-                    password=decrypted_password,
-                    notes=row["notes"],
-                    created_at=row["created_at"]
-                )
-                profiles.append(p)
-
-            return profiles
\ No newline at end of file
+    def reencrypt_all(self, new_key: bytes, user_id: int,
+                      before_commit: Optional[Callable[[sqlite3.Connection], None]] = None) -> int:
+        """
+        Re-Keying: entschlüsselt alle Passwörter eines Users mit dem aktuellen Key und verschlüsselt sie
+        mit new_key neu - Lesen und Schreiben in EINER Transaktion. Danach arbeitet das Repository mit new_key.
+        before_commit(conn) läuft in derselben Transaktion (z.B. neue KDF-Parameter speichern).
+        Gibt die Anzahl der neu verschlüsselten Profile zurück.
+        """
+        conn = self.db.connect()
+        # IMMEDIATE sperrt Schreiber schon vor dem SELECT: ein parallel (GUI/CLI) angelegtes Profil
+        # landet entweder vorher in 'rows' oder wartet bis nach dem Commit - nie mit altem Key dazwischen
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT {self._BULK_COLUMNS} FROM password_profiles WHERE user_id = ? ORDER BY id", (user_id,)
+            ).fetchall()
+            # Entschlüsseln und Neu-Verschlüsseln laufen verzahnt im Thread-Pool
+            encrypted = self.bulk(new_key).encrypt_iter(self._decrypt_rows(rows))
+            conn.executemany(
+                "UPDATE password_profiles SET password_blob = ?, nonce = ? WHERE id = ?",
+                [(ciphertext, nonce, row["id"]) for row, (nonce, ciphertext) in zip(rows, encrypted)]
+            )
+            if before_commit is not None:
+                before_commit(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        self.master_key = new_key
+        return len(rows)
@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+from src.database.connection import db as DatabaseConnection
+
+
+def domain_of(url: str) -> Optional[str]:
+    """'https://Login.Example.com:8443/x' -> 'login.example.com' (auch ohne Schema)."""
+    if not url or not url.strip():
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = "//" + url
+    host = urlsplit(url).hostname
+    return host.rstrip(".").lower() if host else None
+
+
+class PasswordRuleRepository:
+    """Passwort-Regeln pro Domain (Klartext - Regeln sind nicht geheim)."""
+
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+
+    def set_rule(self, user_id: int, domain: str, rule: str) -> None:
+        with self.db.connect() as conn:
+            conn.execute("""
+                INSERT INTO domain_password_rules (user_id, domain, rule, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id, domain) DO UPDATE SET rule = excluded.rule, updated_at = excluded.updated_at
+            """, (user_id, domain.lower(), rule, datetime.now().isoformat()))
+            conn.commit()
+
+    def get_rule(self, user_id: int, domain: str) -> Optional[str]:
+        with self.db.connect() as conn:
+            row = conn.execute(
+                "SELECT rule FROM domain_password_rules WHERE user_id = ? AND domain = ?",
+                (user_id, domain.lower())
+            ).fetchone()
+        return row["rule"] if row else None
+
+    def delete_rule(self, user_id: int, domain: str) -> None:
+        with self.db.connect() as conn:
+            conn.execute("DELETE FROM domain_password_rules WHERE user_id = ? AND domain = ?",
+                         (user_id, domain.lower()))
+            conn.commit()
+
+    def list_rules(self, user_id: int) -> dict[str, str]:
+        with self.db.connect() as conn:
+            rows = conn.execute(
+                "SELECT domain, rule FROM domain_password_rules WHERE user_id = ? ORDER BY domain", (user_id,)
+            ).fetchall()
+        return {row["domain"]: row["rule"] for row in rows}
+
+    def find_for_url(self, user_id: int, url: str) -> Optional[str]:
+        """
+        Regel für die URL: die spezifischste passende Domain gewinnt
+        (login.example.com vor example.com). Ein Lookup über den Primärschlüssel.
+        """
+        host = domain_of(url)
+        if host is None:
+            return None
+        labels = host.split(".")
+        candidates = [".".join(labels[i:]) for i in range(len(labels))]
+        placeholders = ", ".join("?" * len(candidates))
+        with self.db.connect() as conn:
+            row = conn.execute(f"""
+                SELECT rule FROM domain_password_rules
+                WHERE user_id = ? AND domain IN ({placeholders})
+                ORDER BY length(domain) DESC LIMIT 1
+            """, (user_id, *candidates)).fetchone()
+        return row["rule"] if row else None
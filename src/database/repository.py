@@ -1,35 +1,35 @@
+from datetime import datetime
+from typing import Optional
+
 from src.database.connection import db as DatabaseConnection
 from src.core.master_account import MasterAccount
+from src.crypto.kdf import KdfParams
 
 
 class MasterAccountRepository:
     def __init__(self, db_connection: DatabaseConnection):
         self.db_connection = db_connection
 
-    def create_account(self, master_account: MasterAccount, salt: bytes):
-        #Speichert einen neuen Master Account inklusive Salt in der DB
-        conn = self.db_connection.connect()
-        cursor = conn.cursor()
-
-        # Einfügen von Username, den Hash (der im password-Feld liegt) und das Salt
-        cursor.execute("""
-            INSERT INTO master_account (username, password_hash, salt)
-            VALUES (?, ?, ?)
-        """, (master_account.username, master_account.password, salt))
-
-        conn.commit()
-        conn.close()
+    def create_account(self, master_account: MasterAccount, salt: bytes, kdf_params: KdfParams = None,
+                       wrapped_key: tuple[bytes, bytes] = None):
+        #Speichert einen neuen Master Account inklusive Salt (und KDF-Parametern, eingepacktem Data-Key) in der DB
+        # Die Verbindung kommt aus dem Pool und bleibt offen (kein close() nötig)
+        nonce, wrapped = wrapped_key or (None, None)
+        with self.db_connection.connect() as conn:
+            # Einfügen von Username, den Hash (der im password-Feld liegt) und das Salt
+            conn.execute("""
+                INSERT INTO master_account (username, password_hash, salt, kdf_params, wrapped_dek, dek_nonce,
+                                            created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (master_account.username, master_account.password, salt,
+                  kdf_params.to_json() if kdf_params else None, wrapped, nonce, datetime.now().isoformat()))
 
     def account_exists(self) -> bool: #FMR1
         #Prüft, ob bereits ein Master Account existiert (egal welcher).
         conn = self.db_connection.connect()
-        cursor = conn.cursor()
 
         # SELECT 1 ist eine sehr schnelle Abfrage, um nur Existenz zu prüfen
-        cursor.execute("SELECT 1 FROM master_account LIMIT 1")
-        result = cursor.fetchone()
-
-        conn.close()
+        result = conn.execute("SELECT 1 FROM master_account LIMIT 1").fetchone()
         return result is not None
 
     def get_account_by_username(self, username: str) -> tuple[MasterAccount, bytes]:
@@ -38,16 +38,12 @@ class MasterAccountRepository:
         #Gibt (MasterAccount, salt) zurück oder (None, None), falls nicht gefunden.
 
         conn = self.db_connection.connect()
-        cursor = conn.cursor()
 
-        cursor.execute("""
+        row = conn.execute("""
             SELECT id, username, password_hash, salt
             FROM master_account
             WHERE username = ?
-        """, (username,))
-
-        row = cursor.fetchone()
-        conn.close()
+        """, (username,)).fetchone()
 
         if row:
             # row[0]=id, row[1]=username, row[2]=password_hash, row[3]=salt
@@ -62,4 +58,39 @@ class MasterAccountRepository:
             salt = row[3]
             return account, salt
 
-        return None, None
\ No newline at end of file
+        return None, None
+
+    def get_kdf_params(self, account_id: int) -> KdfParams:
+        #KDF-Parameter des Tresors; alte Accounts ohne Eintrag bekommen die Legacy-Parameter (PBKDF2)
+        conn = self.db_connection.connect()
+        row = conn.execute("SELECT kdf_params FROM master_account WHERE id = ?", (account_id,)).fetchone()
+        return KdfParams.from_json(row[0] if row else None)
+
+    def get_wrapped_key(self, account_id: int) -> Optional[tuple[bytes, bytes]]:
+        #(nonce, eingepackter Data-Key) oder None bei Tresoren von vor der Schlüsselhierarchie
+        conn = self.db_connection.connect()
+        row = conn.execute("SELECT dek_nonce, wrapped_dek FROM master_account WHERE id = ?", (account_id,)).fetchone()
+        if not row or row[1] is None:
+            return None
+        return row[0], row[1]
+
+    def update_credentials(self, account_id: int, kdf_params: KdfParams, password_hash: str = None, conn=None,
+                           wrapped_key: tuple[bytes, bytes] = None, salt: bytes = None):
+        #Speichert neue KDF-Parameter (und optional neuen Verifier/Hash, eingepackten Data-Key, Salt).
+        #Mit 'conn' läuft das UPDATE in einer bereits offenen Transaktion (Commit macht der Aufrufer).
+        assignments, values = "kdf_params = ?", [kdf_params.to_json()]
+        if password_hash is not None:
+            assignments += ", password_hash = ?"
+            values.append(password_hash)
+        if wrapped_key is not None:
+            assignments += ", dek_nonce = ?, wrapped_dek = ?"
+            values.extend(wrapped_key)
+        if salt is not None:
+            assignments += ", salt = ?"
+            values.append(salt)
+        query = f"UPDATE master_account SET {assignments} WHERE id = ?"
+        if conn is not None:
+            conn.execute(query, (*values, account_id))
+            return
+        with self.db_connection.connect() as conn:
+            conn.execute(query, (*values, account_id))
@@ -0,0 +1,84 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundRunner:
+    """
+    Runs blocking calls (login, account creation - i.e. the KDF) off the Tk main thread.
+    Finished jobs are handed back through a thread-safe queue which the main loop polls
+    with after(), so callbacks always run on the Tk thread and the window stays responsive.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, widget):
+        self.widget = widget
+        # One worker: auth jobs never overlap, and the worker keeps its own pooled DB connection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="odinkey-gui")
+        self._results = queue.Queue()
+        self._callbacks = {}
+        self._current = None
+        self._polling = False
+        self._after_id = None
+        self._closed = False
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
+
+    def submit(self, func, *args, on_success, on_error=None):
+        """Run func(*args) in the background and call on_success(result) / on_error(exc) on the Tk thread."""
+        if self._closed:
+            raise RuntimeError("BackgroundRunner is shut down")
+        token = object()
+        self._current = token
+        self._callbacks[token] = (on_success, on_error)
+        future = self._executor.submit(func, *args)
+        # Runs on the worker thread -> only touch the queue here, never Tk widgets
+        future.add_done_callback(lambda done: self._results.put((token, done)))
+        if not self._polling:
+            self._polling = True
+            self._after_id = self.widget.after(self.POLL_MS, self._poll)
+        return token
+
+    def cancel(self):
+        """
+        Detach the running job from the UI. The KDF itself cannot be interrupted,
+        but its result is discarded once it arrives.
+        """
+        self._current = None
+
+    def _poll(self):
+        self._after_id = None
+        if self._closed:
+            return
+        while True:
+            try:
+                token, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            on_success, on_error = self._callbacks.pop(token)
+            if token is not self._current:
+                continue  # cancelled or superseded
+            self._current = None
+            error = future.exception()
+            if error is None:
+                on_success(future.result())
+            elif on_error is not None:
+                on_error(error)
+
+        if self._callbacks:
+            self._after_id = self.widget.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        """Call before the root window is destroyed: stops polling and drops pending jobs."""
+        self.cancel()
+        self._closed = True
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._polling = False
+        self._callbacks.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,57 @@
+import customtkinter as ctk
+
+
+class BusyIndicator(ctk.CTkFrame):
+    """
+    Small spinner row shown while a background job (e.g. unlocking the vault) runs.
+    The animation is driven by after(), so it only moves while the main loop is free.
+    """
+
+    FRAMES = "ᚠᚢᚦᚨᚱᚲ"
+    INTERVAL_MS = 120
+
+    def __init__(self, master, *args, **kwargs):
+        super().__init__(master, fg_color="transparent", *args, **kwargs)
+        self._index = 0
+        self._job = None
+        self._spinner = ctk.CTkLabel(self, text="", font=("Norse", 24), text_color="#e0c97f", fg_color="transparent")
+        self._spinner.pack(side="left", padx=(0, 8))
+        self._message = ctk.CTkLabel(self, text="", font=("Norse", 16), text_color="#e0c97f", fg_color="transparent")
+        self._message.pack(side="left")
+        self._cancel_btn = ctk.CTkButton(
+            self, text="Cancel", width=80, corner_radius=12,
+            fg_color="#2d2d2d", hover_color="#e06c6c", text_color="#e0c97f", font=("Norse", 14)
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._job is not None
+
+    def start(self, message, on_cancel=None, **pack_kwargs):
+        self._message.configure(text=message)
+        if on_cancel is not None:
+            self._cancel_btn.configure(command=on_cancel)
+            self._cancel_btn.pack(side="left", padx=(12, 0))
+        else:
+            self._cancel_btn.pack_forget()
+        self.pack(**pack_kwargs)
+        if self._job is None:
+            self._animate()
+
+    def stop(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        self.pack_forget()
+
+    def destroy(self):
+        # Frame swapped while a job runs -> no after() callback on a dead widget
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
+
+    def _animate(self):
+        self._spinner.configure(text=self.FRAMES[self._index % len(self.FRAMES)])
+        self._index += 1
+        self._job = self.after(self.INTERVAL_MS, self._animate)
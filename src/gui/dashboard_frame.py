@@ -2,11 +2,17 @@ import customtkinter as ctk
 import sqlite3
 # Wir brauchen keine direkten Repository/DB Imports mehr, das macht jetzt der Service!
 from src.core.password_profile import PasswordProfile
+from src.core.password_strength import StrengthMeter
 from src.utils.clipboard import copy_with_timeout
 from src.database.connection import DatabaseConnection  # Nur noch für Daten-Abruf (Read) nötig
 from src.database.password_profile_repository import PasswordProfileRepository  # Für Read-Operationen
 from colorama import Fore, Style
 
+# Indexed by StrengthMeter.score (same limits as the generator entropy rating)
+STRENGTH_LABELS = ("Weak", "Fair", "Strong", "Very strong")
+STRENGTH_COLORS = ("#b33a3a", "#d08a2c", "#b8860b", "#6a9f3c")
+STRENGTH_FULL_BITS = 100
+
 
 class DashboardFrame(ctk.CTkFrame):
     """Single-screen dashboard that lists profiles and shows the add/edit modal.
@@ -107,7 +113,7 @@ class DashboardFrame(ctk.CTkFrame):
         self._touch_session()
         modal = ctk.CTkToplevel(self)
         modal.title("Add Profile" if mode == "add" else "Edit Profile")
-        modal.geometry("540x600")  # tightened layout removes scroll need
+        modal.geometry("540x630")  # tightened layout removes scroll need
         modal.resizable(False, False)
         modal.grab_set()
         modal.configure(bg="#232323")
@@ -204,6 +210,29 @@ class DashboardFrame(ctk.CTkFrame):
                 )
                 toggle_btn.pack(side="left")
 
+                # Strength meter: the meter keeps per-character state, so each keystroke only
+                # scores what changed instead of rescanning the whole password.
+                strength_row = ctk.CTkFrame(form_inner, fg_color="#232323")
+                strength_row.pack(pady=(0, 4), anchor="center")
+                strength_bar = ctk.CTkProgressBar(strength_row, width=entry_width - 100, height=8, progress_color=STRENGTH_COLORS[0])
+                strength_bar.set(0)
+                strength_bar.pack(side="left", padx=(134, 10))
+                strength_label = ctk.CTkLabel(strength_row, text="", font=("Norse", 13), text_color="#e0c97f", width=110, anchor="w")
+                strength_label.pack(side="left")
+                meter = StrengthMeter()
+
+                def update_strength(_event=None):
+                    meter.set_text(entry.get())
+                    if not len(meter):
+                        strength_bar.set(0)
+                        strength_label.configure(text="")
+                        return
+                    strength_bar.set(min(meter.bits / STRENGTH_FULL_BITS, 1.0))
+                    strength_bar.configure(progress_color=STRENGTH_COLORS[meter.score])
+                    strength_label.configure(text=f"{STRENGTH_LABELS[meter.score]} · {meter.bits:.0f} bit")
+
+                entry.bind("<KeyRelease>", update_strength)
+
                 # --- Password Generator Controls (random only) ---
                 # Inline generator so a beginner can discover it without leaving the form.
                 generator_box = ctk.CTkFrame(frame, fg_color="#1f1f1f", corner_radius=18, border_width=1, border_color="#e0c97f")
@@ -247,6 +276,14 @@ class DashboardFrame(ctk.CTkFrame):
                     )
                     chk.grid(row=cb_row, column=col, padx=6, pady=4, sticky="w")
 
+                # Site rule, e.g. "minlength: 12; required: digit; forbidden: [<>]".
+                # Empty = use the rule stored for the URL's domain, if there is one.
+                rule_row = ctk.CTkFrame(generator_box, fg_color="#1f1f1f")
+                rule_row.pack(fill="x", padx=12, pady=(0, 6))
+                ctk.CTkLabel(rule_row, text="Rule", font=("Norse", 14), text_color="#e0c97f").pack(side="left")
+                rule_var = ctk.StringVar(master=self, value="")
+                ctk.CTkEntry(rule_row, textvariable=rule_var, width=260, fg_color="#2d2d2d", border_color="#e0c97f", border_width=2, text_color="#e0c97f", placeholder_text="Rule (optional)").pack(side="left", padx=(12, 0))
+
                 def generate_password():
                     # Generate a password via service so rules stay consistent with CLI/API.
                     self._touch_session()
@@ -254,17 +291,25 @@ class DashboardFrame(ctk.CTkFrame):
                     service = PasswordGeneratorService()
                     if not str(entry):
                         return
-                    result = service.generate_password(
-                        length=length_var.get(),
-                        use_uppercase=uppercase_var.get(),
-                        use_lowercase=lowercase_var.get(),
-                        use_digits=digits_var.get(),
-                        use_special=special_var.get()
+                    # The profile's own rule wins; otherwise fall back to the domain rule for the URL
+                    rule = self.profile_service.password_rule_for(
+                        self.session.account.id, entries['url'].get(), rule_var.get().strip()
                     )
+                    if rule:
+                        result = service.generate_with_rule(rule)
+                    else:
+                        result = service.generate_password(
+                            length=length_var.get(),
+                            use_uppercase=uppercase_var.get(),
+                            use_lowercase=lowercase_var.get(),
+                            use_digits=digits_var.get(),
+                            use_special=special_var.get()
+                        )
                     if result["success"]:
                         entry.delete(0, "end")
                         entry.insert(0, result["password"])
                         entry.configure(show="" if password_visible.get() else "*")
+                        update_strength()
                         print(
                             "[GUI] Generated password:",
                             result["password"],
@@ -307,6 +352,8 @@ class DashboardFrame(ctk.CTkFrame):
                     entries['username'].insert(0, full_profile.username)
                     entries['password'].insert(0, full_profile.password)
                     existing_notes = full_profile.notes
+                    rule_var.set(full_profile.password_rule or "")
+                    update_strength()
             except Exception as e:
                 self.show_error_modal(f"Load Error: {e}")
                 modal.destroy()
@@ -325,7 +372,8 @@ class DashboardFrame(ctk.CTkFrame):
                     url=entries['url'].get(),
                     username=entries['username'].get(),
                     password=entries['password'].get(),
-                    notes=existing_notes
+                    notes=existing_notes,
+                    password_rule=rule_var.get().strip() or None
                 )
 
                 # Einfache Validierung vorab
@@ -405,38 +453,26 @@ class DashboardFrame(ctk.CTkFrame):
             return
 
         user_id = self.session.account.id
-        db_conn = DatabaseConnection()
+        search_query = self.search_var.get().strip() if self.search_var else ""
 
-        # Read-Only Zugriff für die Liste
-        with db_conn.connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    "SELECT id, service_name, username, url FROM password_profiles WHERE user_id = ?",
-                    (user_id,)
-                )
-                rows = cursor.fetchall()
-            except sqlite3.OperationalError:
-                rows = []
+        try:
+            if search_query:
+                # Full-text search runs inside SQLite (FTS5 index, BM25 ranking) instead of
+                # loading every row and filtering in Python on each keystroke.
+                rows = self.profile_service.search_profiles(user_id, search_query)
+                empty_text = "No profiles match your search."
+            else:
+                # Metadata-only summaries: nothing is decrypted just to draw the list
+                rows = self.profile_service.list_profiles(user_id)
+                empty_text = "No profiles found."
+        except sqlite3.OperationalError:
+            rows = []
+            empty_text = "No profiles found."
 
-        search_query = self.search_var.get().strip().lower() if self.search_var else ""
         if not rows:
-            ctk.CTkLabel(self.profiles_frame, text="No profiles found.", text_color="#e0c97f").pack(pady=10)
+            ctk.CTkLabel(self.profiles_frame, text=empty_text, text_color="#e0c97f").pack(pady=10)
             return
 
-        if search_query:
-            def match(row):
-                return any(
-                    search_query in ((row[field] or "").lower())
-                    for field in ("service_name", "username", "url")
-                )
-
-            rows = [row for row in rows if match(row)]
-            if not rows:
-                ctk.CTkLabel(self.profiles_frame, text="No profiles match your search.", text_color="#e0c97f").pack(pady=10)
-                return
-
         # Header
         header = ctk.CTkFrame(self.profiles_frame, fg_color="transparent")
         header.pack(fill="x", pady=5)
@@ -446,18 +482,18 @@ class DashboardFrame(ctk.CTkFrame):
             row_frame = ctk.CTkFrame(self.profiles_frame, fg_color="#2d2d2d", corner_radius=10)
             row_frame.pack(fill="x", pady=2, padx=2)
 
-            ctk.CTkLabel(row_frame, text=row["service_name"], width=100, anchor="w", text_color="#e0c97f").pack(
+            ctk.CTkLabel(row_frame, text=row.service_name, width=100, anchor="w", text_color="#e0c97f").pack(
                 side="left", padx=5)
-            ctk.CTkLabel(row_frame, text=row["username"], width=100, anchor="w", text_color="#e0c97f").pack(side="left",
+            ctk.CTkLabel(row_frame, text=row.username, width=100, anchor="w", text_color="#e0c97f").pack(side="left",
                                                                                                             padx=5)
 
             btn_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
             btn_frame.pack(side="right", padx=5, pady=5)
 
-            ctk.CTkButton(btn_frame, text="🔑", width=40, command=lambda id=row['id']: self.copy_password(id),
+            ctk.CTkButton(btn_frame, text="🔑", width=40, command=lambda id=row.id: self.copy_password(id),
                           fg_color="#232323", hover_color="#e0c97f", text_color="#e0c97f").pack(side="left", padx=2)
 
-            ctk.CTkButton(btn_frame, text="Edit", width=50, command=lambda id=row['id']: self.open_edit_modal(id),
+            ctk.CTkButton(btn_frame, text="Edit", width=50, command=lambda id=row.id: self.open_edit_modal(id),
                           fg_color="#e0c97f", hover_color="#b8860b", text_color="#232323").pack(side="left", padx=2)
 
 
@@ -488,19 +524,24 @@ class DashboardFrame(ctk.CTkFrame):
 
         ctk.CTkLabel(frame, text="Confirm Deletion", font=("Norse", 18, "bold"), text_color="#e06c6c").pack(
             pady=(15, 5))
-        ctk.CTkLabel(frame, text="Enter Master Password:", text_color="#e0c97f").pack(pady=5)
 
-        pw_entry = ctk.CTkEntry(frame, show="*", width=200, fg_color="#2d2d2d", border_color="#e0c97f",
-                                text_color="#e0c97f")
-        pw_entry.pack(pady=5)
+        # Password was confirmed a moment ago -> the session grant covers this delete too
+        pw_entry = None
+        if self.profile_service.requires_reauth():
+            ctk.CTkLabel(frame, text="Enter Master Password:", text_color="#e0c97f").pack(pady=5)
+            pw_entry = ctk.CTkEntry(frame, show="*", width=200, fg_color="#2d2d2d", border_color="#e0c97f",
+                                    text_color="#e0c97f")
+            pw_entry.pack(pady=5)
+        else:
+            ctk.CTkLabel(frame, text=f"Delete '{profile_row.service_name}'?", text_color="#e0c97f").pack(pady=5)
 
         def do_delete():
             self._touch_session()
-            password = pw_entry.get()
+            password = pw_entry.get() if pw_entry is not None else None
             try:
                 #Service prüft Passwort UND löscht
                 self.profile_service.delete_profile_securely(
-                    profile_row['id'],
+                    profile_row.id,
                     self.session.account.username,
                     password
                 )
@@ -186,7 +186,8 @@ class DashboardState(StateWindow):
                                         username=username_e.get(),
                                         password=password_e.get(),
                                         notes=notes_e.get() or None,
-                                        created_at=p.created_at
+                                        created_at=p.created_at,
+                                        password_rule=p.password_rule
                                     )
                                     # Minimal validation
                                     if not updated.service_name or not updated.username or not updated.password:
@@ -1,9 +1,11 @@
 import customtkinter as ctk
+from src.gui.busy_indicator import BusyIndicator
 
 class LoginFrame(ctk.CTkFrame):
-    def __init__(self, master, on_login, show_logo, *args, **kwargs):
+    def __init__(self, master, on_login, show_logo, on_cancel=None, *args, **kwargs):
         super().__init__(master, fg_color="#232323", corner_radius=30, *args, **kwargs)
         self.on_login = on_login
+        self.on_cancel = on_cancel
         self.show_logo = show_logo
         self.username_entry = None
         self.password_entry = None
@@ -27,8 +29,21 @@ class LoginFrame(ctk.CTkFrame):
             font=("Norse", 20, "bold"), width=260, corner_radius=18
         )
         self.login_btn.pack(pady=(0, 10))
+        self.busy_indicator = BusyIndicator(self)
+
+    def set_busy(self, busy, message="Unlocking vault..."):
+        """Lock the form while the vault is unlocked in the background."""
+        state = "disabled" if busy else "normal"
+        for widget in self.get_entries():
+            widget.configure(state=state)
+        if busy:
+            self.busy_indicator.start(message, on_cancel=self.on_cancel, pady=(0, 10))
+        else:
+            self.busy_indicator.stop()
 
     def _login(self):
+        if self.busy_indicator.running:
+            return
         username = self.username_entry.get()
         password = self.password_entry.get()
         self.on_login(username, password)
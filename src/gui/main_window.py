@@ -38,6 +38,7 @@ def load_custom_font(font_path):
 from src.gui.login_frame import LoginFrame
 from src.gui.registration_frame import RegistrationFrame
 from src.gui.dashboard_frame import DashboardFrame
+from src.gui.background import BackgroundRunner
 from src.core.session import session
 
 
@@ -75,8 +76,12 @@ class StartWindow:
         self.frame.pack(fill="both", expand=True)
         self.active_frame = None
         self.session = session
+        # Login/registration run the KDF on a worker thread so the window keeps repainting
+        self.runner = BackgroundRunner(self.master)
         self._auto_logout_flag = False
         self._watchdog_active = True
+        self._watchdog_id = None
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
         self.master.bind("<Configure>", self.on_resize)
         # Keep the session alive while user interacts anywhere in the window.
         event_sequences = (
@@ -92,17 +97,14 @@ class StartWindow:
             self.master.bind_all(sequence, self._touch_session_event)
         self.set_background()
         self.session.set_expire_callback(self._on_session_expire)
-        self.master.after(1000, self._session_watchdog)
+        self._watchdog_id = self.master.after(1000, self._session_watchdog)
 
         exists = repo.account_exists()
 
         # Verbindung prüfen (Fix für den NameError von vorhin)
+        # connect() liefert die gepoolte Verbindung, die für die ganze Sitzung offen bleibt
         conn = self.db_conn.connect()
-
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM master_account")
-        count = cursor.fetchone()[0]
-        conn.close()
+        count = conn.execute("SELECT COUNT(*) FROM master_account").fetchone()[0]
         print(f"[DEBUG] account_exists: {exists}, rows in master_account: {count}")
 
         if exists:
@@ -121,7 +123,8 @@ class StartWindow:
         self.active_frame = LoginFrame(
             self.frame,
             on_login=self.login,
-            show_logo=self.show_logo
+            show_logo=self.show_logo,
+            on_cancel=self.cancel_login
         )
         self.active_frame.pack(fill="both", expand=True)
 
@@ -185,7 +188,18 @@ class StartWindow:
         rune_label.pack(pady=(18, 0))
 
     def login(self, username, password):
-        result = self.service.login(username, password)
+        if self.runner.busy:
+            return
+        self.active_frame.set_busy(True)
+        self.runner.submit(
+            self.service.login, username, password,
+            on_success=self._on_login_result,
+            on_error=self._on_background_error
+        )
+
+    def _on_login_result(self, result):
+        """Called on the Tk thread once the background login finished."""
+        self._set_frame_busy(False)
         if result:
             account, master_key = result
             self.session.start(account, master_key)
@@ -193,6 +207,18 @@ class StartWindow:
         else:
             self.show_error_modal("Wrong username or password.")
 
+    def cancel_login(self):
+        self.runner.cancel()
+        self._set_frame_busy(False)
+
+    def _on_background_error(self, error):
+        self._set_frame_busy(False)
+        self.show_error_modal(str(error))
+
+    def _set_frame_busy(self, busy):
+        if self.active_frame is not None and hasattr(self.active_frame, "set_busy"):
+            self.active_frame.set_busy(busy)
+
     def _on_session_expire(self):
         """Background session callback; only set flag (thread-safe)."""
         self._auto_logout_flag = True
@@ -207,7 +233,16 @@ class StartWindow:
             self.show_error_modal("Session expired! Please log in again.", on_close=self.show_login)
 
         if self.master.winfo_exists():
-            self.master.after(1000, self._session_watchdog)
+            self._watchdog_id = self.master.after(1000, self._session_watchdog)
+
+    def on_close(self):
+        """Window close: stop the watchdog and the background worker before the root goes away."""
+        self._watchdog_active = False
+        if self._watchdog_id is not None:
+            self.master.after_cancel(self._watchdog_id)
+            self._watchdog_id = None
+        self.runner.shutdown()
+        self.master.destroy()
 
     def _touch_session_event(self, event=None):
         """Keep session alive while the user interacts with the GUI."""
@@ -285,11 +320,19 @@ class StartWindow:
         if len(pw1) < 8:
             self.show_error_modal("Password too short (min 8 chars).")
             return
-        try:
-            self.service.register_account(username, pw1)
-            self.show_success_modal("Master account created.", on_close=self.show_login)
-        except Exception as e:
-            self.show_error_modal(str(e))
+        if self.runner.busy:
+            return
+        self.active_frame.set_busy(True)
+        # Errors (e.g. account already exists) come back through _on_background_error
+        self.runner.submit(
+            self.service.register_account, username, pw1,
+            on_success=self._on_account_created,
+            on_error=self._on_background_error
+        )
+
+    def _on_account_created(self, account):
+        self._set_frame_busy(False)
+        self.show_success_modal("Master account created.", on_close=self.show_login)
 
     def clear_window(self):
         for widget in self.glass_panel.winfo_children():
@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from src.gui.busy_indicator import BusyIndicator
 
 
 class RegistrationFrame(ctk.CTkFrame):
@@ -40,9 +41,21 @@ class RegistrationFrame(ctk.CTkFrame):
             font=("Norse", 20, "bold"), width=260, corner_radius=18
         )
         self.create_btn.pack(pady=20)
+        self.busy_indicator = BusyIndicator(self)
 
+    def set_busy(self, busy, message="Creating vault..."):
+        """Lock the form while the account is created in the background (no cancel: it writes to the DB)."""
+        state = "disabled" if busy else "normal"
+        for widget in self.get_entries():
+            widget.configure(state=state)
+        if busy:
+            self.busy_indicator.start(message, pady=(0, 10))
+        else:
+            self.busy_indicator.stop()
 
     def _submit_registration(self):
+        if self.busy_indicator.running:
+            return
         username = self.new_username_entry.get()
         pw1 = self.new_password_entry.get()
         pw2 = self.repeat_password_entry.get()
@@ -1,9 +1,17 @@
+import logging
 import os
+import sqlite3
 from typing import Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
 from src.core.master_account import MasterAccount
 from src.database.repository import MasterAccountRepository
 from src.crypto.hashing import Hashing
 from src.crypto.encryption import Encryption
+from src.crypto import kdf
+from src.database.password_profile_repository import PasswordProfileRepository
+
+logger = logging.getLogger(__name__)
 
 
 class MasterAccountService:
@@ -31,13 +39,21 @@ class MasterAccountService:
         # Salt generieren (Zufallswert für Hashing & Key-Derivation)
         salt = os.urandom(16)
 
-        # Passwort hashen (für die Datenbank)
-        password_hash = self.hashing.hash_master_password(password)
+        # KDF-Parameter für diesen Rechner kalibrieren (Ziel: ca. 250 ms pro Entsperren)
+        kdf_params = kdf.calibrate()
+
+        # Statt eines eigenen Argon2-Hashes speichern wir den Verifier aus dem Root-Secret
+        # (dieselbe Ableitung liefert beim Login auch den Key-Encryption-Key)
+        verifier, kek = self.encryption.derive_login_keys(password, salt, kdf_params)
+        password_hash = self.hashing.encode_verifier(verifier)
+
+        # Die Profile verschlüsselt ein zufälliger Data-Key, gespeichert wird er nur eingepackt
+        wrapped_key = self.encryption.wrap_key(kek, self.encryption.generate_data_key())
 
         # Speichern
         # WICHTIG: Im Objekt speichern wir den Hash, nicht das Klartext-Passwort
         new_account = MasterAccount(username=username, password=password_hash)
-        self.repo.create_account(new_account, salt)
+        self.repo.create_account(new_account, salt, kdf_params, wrapped_key)
 
         return new_account
 
@@ -53,14 +69,120 @@ class MasterAccountService:
         if not account or not salt:
             return None  # Benutzer nicht gefunden
 
-        # Passwort prüfen (Hash vergleich)
+        kdf_params = self.repo.get_kdf_params(account.id)
+
+        if self.hashing.is_verifier_hash(account.password):
+            # Neues Schema: EINE langsame Ableitung liefert Verifier und Key-Encryption-Key
+            verifier, kek = self.encryption.derive_login_keys(password, salt, kdf_params)
+            if not self.hashing.check_verifier(account.password, verifier):
+                return None  # Falsches Passwort
+            wrapped_key = self.repo.get_wrapped_key(account.id)
+            if wrapped_key is None:
+                # Profile noch direkt mit dem Passwort-Key verschlüsselt -> einmalig umstellen
+                return account, self._migrate_credentials(account, password, salt, kek)
+            data_key = self.encryption.unwrap_key(kek, *wrapped_key)
+            if kdf.needs_upgrade(kdf_params):
+                # Stärkere Parameter betreffen nur den KEK: Data-Key neu einpacken, Profile bleiben
+                self._rewrap_data_key(account, password, salt, data_key, kdf.calibrate())
+            return account, data_key
+
+        # Alter Account: Argon2-Hash prüfen, dann Key separat ableiten (zwei langsame Funktionen)
         # account.password ist hier der Hash aus der DB
         is_valid = self.hashing.verify_master_password(account.password, password)
         if not is_valid:
             return None  # Falsches Passwort
 
-        # Wenn alles stimmt: Master-Key ableiten
         # Diesen Key brauchen wir für die Session, um Profile zu entschlüsseln
-        master_key = self.encryption.derive_key(password, salt)
+        master_key = self.encryption.derive_key(password, salt, kdf_params)
+
+        # Einmalig auf das neue Schema umstellen
+        master_key = self._migrate_credentials(account, password, salt, master_key)
+        return account, master_key
+
+    def verify_password(self, username: str, password: str) -> bool:
+        """
+        Nur prüfen, ob das Master-Passwort stimmt (Re-Auth vor Löschen usw.).
+        Leitet keinen Vault-Key ab und stellt nichts um - anders als login().
+        """
+        account, salt = self.repo.get_account_by_username(username)
+        if not account or not salt:
+            return False
+
+        if self.hashing.is_verifier_hash(account.password):
+            root = kdf.derive(password, salt, self.repo.get_kdf_params(account.id))
+            verifier, _ = kdf.split_root_secret(root)
+            return self.hashing.check_verifier(account.password, verifier)
+
+        return self.hashing.verify_master_password(account.password, password)
+
+    def change_master_password(self, username: str, old_password: str, new_password: str) -> bytes:
+        """
+        Neues Master-Passwort: neues Salt, frisch kalibrierte Parameter, neuer Verifier - und der
+        Data-Key wird mit dem neuen KEK eingepackt. Die Profile werden nicht angefasst, der Wechsel
+        kostet bei 100.000 Einträgen dasselbe wie bei einem leeren Tresor.
+        Gibt den (unveränderten) Data-Key zurück; eine laufende Session kann ihn weiter benutzen.
+        """
+        valid, msg = MasterAccount.validate_password(new_password)
+        if not valid:
+            raise ValueError(msg)
+
+        account, salt = self.repo.get_account_by_username(username)
+        if not account or not salt:
+            raise ValueError("Das bisherige Master-Passwort ist falsch.")
+
+        # Direkt gegen den gespeicherten Verifier prüfen - kein login(), also keine Migration
+        # und kein KDF-Upgrade als Nebenwirkung, und nur eine Ableitung mit dem alten Passwort
+        wrapped_key = self.repo.get_wrapped_key(account.id)
+        if not self.hashing.is_verifier_hash(account.password) or wrapped_key is None:
+            raise ValueError("Tresor ist noch nicht umgestellt, bitte zuerst einmal anmelden.")
+        verifier, kek = self.encryption.derive_login_keys(
+            old_password, salt, self.repo.get_kdf_params(account.id)
+        )
+        if not self.hashing.check_verifier(account.password, verifier):
+            raise ValueError("Das bisherige Master-Passwort ist falsch.")
+        data_key = self.encryption.unwrap_key(kek, *wrapped_key)
+
+        self._rewrap_data_key(account, new_password, os.urandom(16), data_key, kdf.calibrate())
+        return data_key
+
+    def _rewrap_data_key(self, account: MasterAccount, password: str, salt: bytes, data_key: bytes,
+                         params: kdf.KdfParams):
+        # Neuer KEK -> Verifier, Parameter, Salt und eingepackter Key in EINEM Update
+        verifier, kek = self.encryption.derive_login_keys(password, salt, params)
+        new_hash = self.hashing.encode_verifier(verifier)
+        self.repo.update_credentials(
+            account.id, params, new_hash, wrapped_key=self.encryption.wrap_key(kek, data_key), salt=salt
+        )
+        account.password = new_hash
+
+    def _migrate_credentials(self, account: MasterAccount, password: str, salt: bytes, old_key: bytes) -> bytes:
+        """
+        Stellt einen Account beim Login auf das aktuelle Schema um (Verifier + KEK aus einem
+        Root-Secret, kalibrierte KDF-Parameter, zufälliger Data-Key): alle Profile mit dem Data-Key
+        neu verschlüsseln und Verifier, Parameter und eingepackten Key speichern - in einer Transaktion.
+        Schlägt das fehl, bleibt alles beim Alten.
+        """
+        current_params = self.repo.get_kdf_params(account.id)
+        new_params = kdf.calibrate() if kdf.needs_upgrade(current_params) else current_params
+        verifier, kek = self.encryption.derive_login_keys(password, salt, new_params)
+        new_hash = self.hashing.encode_verifier(verifier)
+        new_key = self.encryption.generate_data_key()
+        wrapped_key = self.encryption.wrap_key(kek, new_key)
+
+        profile_repo = PasswordProfileRepository(self.repo.db_connection, old_key)
+        try:
+            profile_repo.reencrypt_all(
+                new_key,
+                account.id,
+                before_commit=lambda conn: self.repo.update_credentials(
+                    account.id, new_params, new_hash, conn, wrapped_key=wrapped_key
+                )
+            )
+        except (InvalidTag, sqlite3.Error) as e:
+            # Die Transaktion ist zurückgerollt, alles liegt noch unter old_key -> Login geht weiter,
+            # beim nächsten Login wird erneut umgestellt. Andere Fehler sind Bugs und fliegen durch.
+            logger.warning("Umstellung von Account %s fehlgeschlagen, bleibt beim alten Schema: %r", account.id, e)
+            return old_key
 
-        return account, master_key
\ No newline at end of file
+        account.password = new_hash
+        return new_key
@@ -1,6 +1,12 @@
-import string
-from pathlib import Path
+import math
+from typing import Iterator
+from src.crypto import entropy
 from src.crypto.generator import PasswordGenerator
+from src.crypto.markov import load_model
+from src.crypto.password_rules import compile_rule
+from src.crypto.regex_automaton import compile_regex
+from src.crypto.wordstore import DEFAULT_WORDLIST_NAME, WordStore, get_wordstore
+from src.services.uniqueness_guard import UniquenessGuard
 
 class PasswordGeneratorService:
     DEFAULT_WORDLIST = [
@@ -10,79 +16,57 @@ class PasswordGeneratorService:
         "brave", "swift", "strong", "wise", "bright", "hidden"
     ]
 
-    def __init__(self):
-        self.generator = PasswordGenerator()
-        self.wordlist = self._load_wordlist()
+    MAX_PASSPHRASE_WORDS = 8
 
-    def _load_wordlist(self) -> list[str]:
-        try:
-            wordlist_path = Path(__file__).parent.parent / 'data' / 'words.txt'
-
-            if wordlist_path.exists():
-                words = []
-                with open(wordlist_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-
-                        if not line or line.startswith('#'):
-                            continue
-                        if '\t' in line:
-                            _, word = line.split('\t', 1)
-                            words.append(word.strip())
-                        else:
-                            words.append(line)
-                if words:
-                    print(f"Loaded {len(words)} words from {wordlist_path}")
-                    return words
-        except Exception as e:
-            print(f"Failed to load wordlist: {e}")
-        return self.DEFAULT_WORDLIST
+    def __init__(self, source=None):
+        # Alle Algorithmen ziehen ihre Zufallswerte aus self.generator.random
+        self.generator = PasswordGenerator(source)
+
+    @property
+    def wordlist(self) -> WordStore:
+        # Standardliste: gemeinsamer, per mmap geöffneter Store - wird erst bei der ersten Passphrase geladen
+        return self.get_wordlist(None)
+
+    def get_wordlist(self, name: str = None) -> WordStore:
+        """Store der Liste 'name' aus der Registry (None = Standardliste mit eingebauter Notfall-Liste)."""
+        if name is None or name == DEFAULT_WORDLIST_NAME:
+            return get_wordstore(DEFAULT_WORDLIST_NAME, fallback=self.DEFAULT_WORDLIST)
+        return get_wordstore(name)
+
+    ALGORITHMS = ("random", "pronounceable", "passphrase", "pattern")
 
     def generate_password(self, length: int = 12,
                           use_uppercase: bool = True,
                           use_lowercase: bool = True,
                           use_digits: bool = True,
                           use_special: bool = True,
-                          algorithm: str = "random") -> dict:
+                          algorithm: str = "random",
+                          wordlist: str = None,
+                          target_entropy: float = None) -> dict:
+        """
+        target_entropy: gewünschte Stärke in Bit - Länge bzw. Wortanzahl wird dann passend gewählt
+        und 'length' ignoriert. 'entropy' im Ergebnis ist dann der Wert, für den die Länge gewählt
+        wurde, also immer >= target_entropy (bei pronounceable der Erwartungswert des Markov-Modells).
+        Ohne target_entropy meldet pronounceable die Entropie genau des gezogenen Pfads.
+        """
         try:
-
-            if algorithm == "random":
-                password = self.generator.generate_random(
-                    length=length,
-                    use_uppercase=use_uppercase,
-                    use_lowercase=use_lowercase,
-                    use_digits=use_digits,
-                    use_special=use_special
-                )
-            elif algorithm == "pronounceable":
-                password = self._generate_pronounceable(
-                    length=length,
-                    use_digits=use_digits,
-                    use_special=use_special
-                )
-
-            elif algorithm == "passphrase":
-                num_words = (max(2, min(length // 5, 8)))
-                password = self._generate_passphrase(
-                    num_words=num_words,
-                    use_digits=use_digits,
-                    use_special=use_special
-                )
-
-            elif algorithm == "pattern":
-                password = self._generate_pattern(
-                    use_uppercase=use_uppercase,
-                    use_lowercase=use_lowercase,
-                    use_digits=use_digits,
-                    use_special=use_special
-                )
-
+            options = (use_uppercase, use_lowercase, use_digits, use_special)
+            if target_entropy is not None:
+                length = self.length_for_entropy(target_entropy, algorithm, *options, wordlist=wordlist)
+            if algorithm == "pronounceable":
+                # Markov-Pfad: Entropie genau dieses Passworts statt des Erwartungswerts
+                password, bits = self._sample_pronounceable(length, use_digits, use_special)
+                if target_entropy is not None:
+                    # Ein einzelner Pfad kann unter dem Ziel liegen; zugesagt ist der Erwartungswert
+                    bits = self.entropy_bits(algorithm, length, *options, wordlist=wordlist)
             else:
-                raise ValueError(f"Unknown algorithm: {algorithm}")
+                password = self._generate_one(algorithm, length, *options, wordlist)
+                bits = self.entropy_bits(algorithm, length, *options, wordlist=wordlist)
             return {
                 'success': True,
                 'password': password,
-                'length': len(password)
+                'length': len(password),
+                'entropy': bits
             }
 
         except Exception as e:
@@ -90,6 +74,193 @@ class PasswordGeneratorService:
                 'success': False,
                 'error': str(e)
             }
+
+    @staticmethod
+    def _pronounceable_core_length(length: int, use_digits: bool, use_special: bool) -> int:
+        # Anzahl Buchstaben (Konsonant/Vokal im Wechsel) vor Ziffern und Sonderzeichen
+        return max(6, length - (2 if use_digits else 0) - (1 if use_special else 0))
+
+    @classmethod
+    def _passphrase_word_count(cls, length: int) -> int:
+        return max(2, min(length // 5, cls.MAX_PASSPHRASE_WORDS))
+
+    def entropy_bits(self, algorithm: str, length: int = 12,
+                     use_uppercase: bool = True,
+                     use_lowercase: bool = True,
+                     use_digits: bool = True,
+                     use_special: bool = True,
+                     wordlist: str = None) -> float:
+        """
+        Exakte Entropie eines Passworts mit diesen Optionen (aus den Parametern, nicht aus dem Passwort).
+        Die eigentliche Rechnung ist in src.crypto.entropy gecacht.
+        """
+        digits = len(PasswordGenerator.DIGITS)
+        special = len(PasswordGenerator.SPECIAL)
+        suffix = (digits, digits) * use_digits + (special,) * use_special
+
+        if algorithm == "random":
+            classes = [(use_uppercase, PasswordGenerator.UPPERCASE), (use_lowercase, PasswordGenerator.LOWERCASE),
+                       (use_digits, PasswordGenerator.DIGITS), (use_special, PasswordGenerator.SPECIAL)]
+            return entropy.random_bits(length, tuple(len(chars) for used, chars in classes if used))
+
+        if algorithm == "pronounceable":
+            # Erwartungswert über alle Pfade des Markov-Modells
+            letters = self._pronounceable_core_length(length, use_digits, use_special)
+            return load_model().expected_bits(letters) + entropy.uniform_bits(suffix)
+
+        if algorithm == "passphrase":
+            words = len(self.get_wordlist(wordlist))
+            return entropy.uniform_bits((words,) * self._passphrase_word_count(length) + suffix)
+
+        if algorithm == "pattern":
+            letters = 26
+            return entropy.uniform_bits(
+                (letters,) * (2 * use_uppercase) + (letters,) * (4 * use_lowercase)
+                + (digits,) * (2 * use_digits) + (special,) * (2 * use_special)
+            )
+
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    def length_for_entropy(self, target_bits: float, algorithm: str = "random",
+                           use_uppercase: bool = True,
+                           use_lowercase: bool = True,
+                           use_digits: bool = True,
+                           use_special: bool = True,
+                           wordlist: str = None) -> int:
+        """
+        Kleinster 'length'-Wert, mit dem ein Passwort mindestens target_bits Entropie hat.
+        Bei passphrase entspricht das der Wortanzahl (length = Wörter x 5),
+        bei pronounceable gilt der Erwartungswert über das Markov-Modell.
+        """
+        options = (use_uppercase, use_lowercase, use_digits, use_special)
+        if algorithm == "passphrase":
+            candidates = [words * 5 for words in range(2, self.MAX_PASSPHRASE_WORDS + 1)]
+        elif algorithm == "pattern":
+            candidates = [PasswordGenerator.MIN_LENGTH]  # feste Struktur, Länge spielt keine Rolle
+        else:
+            candidates = range(PasswordGenerator.MIN_LENGTH, PasswordGenerator.MAX_LENGTH + 1)
+
+        for length in candidates:
+            if self.entropy_bits(algorithm, length, *options, wordlist=wordlist) >= target_bits:
+                return length
+        raise ValueError(f"{algorithm} erreicht mit diesen Optionen keine {target_bits} Bit")
+
+    def _generate_one(self, algorithm, length, use_uppercase, use_lowercase, use_digits, use_special,
+                      wordlist=None) -> str:
+        if algorithm == "random":
+            return self.generator.generate_random(
+                length=length,
+                use_uppercase=use_uppercase,
+                use_lowercase=use_lowercase,
+                use_digits=use_digits,
+                use_special=use_special
+            )
+        elif algorithm == "pronounceable":
+            return self._generate_pronounceable(
+                length=length,
+                use_digits=use_digits,
+                use_special=use_special
+            )
+
+        elif algorithm == "passphrase":
+            num_words = self._passphrase_word_count(length)
+            return self._generate_passphrase(
+                num_words=num_words,
+                use_digits=use_digits,
+                use_special=use_special,
+                wordlist=wordlist
+            )
+
+        elif algorithm == "pattern":
+            return self._generate_pattern(
+                use_uppercase=use_uppercase,
+                use_lowercase=use_lowercase,
+                use_digits=use_digits,
+                use_special=use_special
+            )
+
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    def generate_batch(self, count: int, algorithm: str = "random", length: int = 12,
+                       use_uppercase: bool = True,
+                       use_lowercase: bool = True,
+                       use_digits: bool = True,
+                       use_special: bool = True,
+                       template: str = None,
+                       wordlist: str = None,
+                       rule: str = None,
+                       regex: str = None,
+                       unique: UniquenessGuard = None) -> list[str]:
+        """
+        Erzeugt 'count' Passwörter auf einmal (für Bulk-Generierung).
+        Anders als generate_password wirft diese Methode ValueError bei ungültigen Optionen.
+        rule: Passwort-Regel (siehe crypto/password_rules.py), hat Vorrang vor allen anderen Optionen.
+        regex: regulärer Ausdruck (siehe crypto/regex_automaton.py); 'length' gilt nur bei * und +.
+        unique: UniquenessGuard - Passwörter, die er schon kennt, werden verworfen und neu gezogen.
+        """
+        options = dict(algorithm=algorithm, length=length, use_uppercase=use_uppercase,
+                       use_lowercase=use_lowercase, use_digits=use_digits, use_special=use_special,
+                       template=template, wordlist=wordlist, rule=rule, regex=regex)
+        batch = self._generate_batch(count, **options)
+        if unique is None:
+            return batch
+
+        batch = unique.filter(batch)
+        empty_rounds = 0
+        while len(batch) < count:
+            # Nachziehen mit Reserve: bei kleinem Ausgaberaum ist ein Großteil der Kandidaten schon bekannt,
+            # nach jeder erfolglosen Runde doppelt so viele
+            missing = count - len(batch)
+            size = min(max(2 * missing, self.MIN_REFILL) << empty_rounds, max(missing, self.MAX_REFILL))
+            candidates = self._generate_batch(size, **options)
+            fresh = unique.filter(candidates, limit=missing)
+            empty_rounds = 0 if fresh else empty_rounds + 1
+            if empty_rounds >= self.MAX_UNIQUE_ROUNDS:
+                raise ValueError(f"Nach {len(unique)} Passwörtern keine neuen mehr - Ausgaberaum erschöpft?")
+            batch.extend(fresh)
+        return batch
+
+    # Runden ohne ein einziges neues Passwort, bevor generate_batch(unique=...) aufgibt
+    MAX_UNIQUE_ROUNDS = 20
+    MIN_REFILL = 64
+    MAX_REFILL = 1 << 16
+
+    def _generate_batch(self, count, algorithm, length, use_uppercase, use_lowercase, use_digits, use_special,
+                        template, wordlist, rule, regex) -> list[str]:
+        if regex is not None:
+            automaton = compile_regex(regex)
+            fixed = length if automaton.max_length is None else None
+            return automaton.generate_many(count, self.generator.random, fixed)
+        if rule is not None:
+            compiled = compile_rule(rule)
+            return [compiled.generate(self.generator.random) for _ in range(count)]
+        if template is not None:
+            return self.generator.generate_many_from_template(template, count)
+        if algorithm == "random":
+            # Vektorisierter Pfad (ein großer Zufallsblock pro Batch)
+            return self.generator.generate_many(
+                count, length, use_uppercase, use_lowercase, use_digits, use_special
+            )
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        return [
+            self._generate_one(algorithm, length, use_uppercase, use_lowercase, use_digits, use_special, wordlist)
+            for _ in range(count)
+        ]
+
+    def iter_batches(self, count: int, batch_size: int = 10_000, **options) -> Iterator[list[str]]:
+        """
+        Generator über Batches von höchstens batch_size Passwörtern, insgesamt 'count'.
+        Es liegt immer nur ein Batch im Speicher, egal wie groß 'count' ist.
+        """
+        if count < 0 or batch_size < 1:
+            raise ValueError("count muss >= 0 und batch_size >= 1 sein")
+        remaining = count
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            yield self.generate_batch(size, **options)
+            remaining -= size
+
     def generate_with_wildcard(self, template: str) -> dict:
         try:
             password = self.generator.generate_from_template(template)
@@ -97,60 +268,93 @@ class PasswordGeneratorService:
             return{
                 'success': True,
                 'password': password,
-                'length': len(password)
+                'length': len(password),
+                'entropy': entropy.template_bits(template)
             }
         except Exception as e:
             return{
                 'success': False,
                 'error': str(e)
             }
+    def generate_with_regex(self, pattern: str, length: int = None) -> dict:
+        try:
+            automaton = compile_regex(pattern)
+            password = automaton.generate(self.generator.random, length)
+
+            return{
+                'success': True,
+                'password': password,
+                'length': len(password),
+                'entropy': automaton.entropy_bits(length)
+            }
+        except Exception as e:
+            return{
+                'success': False,
+                'error': str(e)
+            }
+
+    def generate_with_rule(self, rule: str) -> dict:
+        """Passwort, das die Regel eines Dienstes erfüllt (die Regel wird nur beim ersten Mal kompiliert)."""
+        try:
+            compiled = compile_rule(rule)
+            password = compiled.generate(self.generator.random)
+
+            return{
+                'success': True,
+                'password': password,
+                'length': len(password),
+                'entropy': compiled.entropy_bits
+            }
+        except Exception as e:
+            return{
+                'success': False,
+                'error': str(e)
+            }
+
     def _generate_pronounceable(
             self,
             length: int,
             use_digits: bool,
             use_special: bool
     ) -> str:
-        vowels = 'aeiou'
-        consonants = 'bcdfghjklmnpqrstvwxyz'
-        password= []
-
-        target_length = length
-        if use_digits:
-            target_length -= 2
-        if use_special:
-            target_length -= 1
-
-        target_length = max(6, target_length)
+        return self._sample_pronounceable(length, use_digits, use_special)[0]
 
-        for i in range(target_length):
-            if i % 2 == 0:
-                char = self.generator.random.choice(consonants)
-                if i == 0:
-                    char = char.upper()
-                password.append(char)
-            else:
-                password.append(self.generator.random.choice(vowels))
+    def _sample_pronounceable(
+            self,
+            length: int,
+            use_digits: bool,
+            use_special: bool
+    ) -> tuple[str, float]:
+        # Buchstaben aus dem Trigramm-Modell (trainiert auf der Wortliste), danach Ziffern/Sonderzeichen
+        letters, bits = load_model().sample(
+            self.generator.random, self._pronounceable_core_length(length, use_digits, use_special)
+        )
+        password = [letters.capitalize()]
 
         if use_digits:
             digit1 = self.generator.get_random_digit()
             digit2 = self.generator.get_random_digit()
             password.append(f"{digit1}{digit2}")
+            bits += 2 * math.log2(len(self.generator.DIGITS))
 
         if use_special:
             password.append(self.generator.get_random_special())
+            bits += math.log2(len(self.generator.SPECIAL))
 
-        return ''.join(password)
+        return ''.join(password), bits
 
 
     def _generate_passphrase(
             self,
             num_words: int,
             use_digits: bool,
-            use_special: bool
+            use_special: bool,
+            wordlist: str = None
     ) -> str:
         num_words = max(2, num_words)
+        store = self.get_wordlist(wordlist)
         words = [
-            self.generator.random.choice(self.wordlist)
+            self.generator.random.choice(store)
             for _ in range(num_words)
         ]
         words[0] = words[0].capitalize()
@@ -1,11 +1,20 @@
+from typing import Optional
+
+from src.crypto.password_rules import compile_rule
 from src.database.password_profile_repository import PasswordProfileRepository
+from src.database.password_rule_repository import PasswordRuleRepository
 from src.services.master_account_service import MasterAccountService
+from src.core.session import session as default_session
 
 
 class PasswordProfileService:
-    def __init__(self, profile_repo: PasswordProfileRepository, auth_service: MasterAccountService):
+    def __init__(self, profile_repo: PasswordProfileRepository, auth_service: MasterAccountService,
+                 session=default_session, rule_repo: PasswordRuleRepository = None):
         self.profile_repo = profile_repo
         self.auth_service = auth_service
+        self.session = session
+        # Domain-Regeln liegen in derselben Datenbank wie die Profile
+        self.rule_repo = rule_repo or PasswordRuleRepository(profile_repo.db)
 
     def create_profile(self, profile):
         """Validiert und speichert ein neues Profil"""
@@ -15,24 +24,75 @@ class PasswordProfileService:
         if len(profile.password) < 8 or len(profile.password) > 64:
             raise ValueError("Password muss zwischen 8 und 64 Zeichen lang sein")
 
+        self._validate_rule(profile.password_rule)
         return self.profile_repo.create_profile(profile)
 
     def update_profile(self, profile):
         """Aktualisiert ein Profil"""
         if not profile.id:
             raise ValueError("Profil hat keine ID")
-        if len(profile.password) < 8 or len(profile.password) > 64:
+        # Ein LazyPasswordProfile, dessen Passwort nie gelesen wurde, behält das gespeicherte
+        # (bereits geprüfte) Passwort - dafür müssten wir sonst extra entschlüsseln
+        password_changed = getattr(profile, "is_decrypted", True)
+        if password_changed and (len(profile.password) < 8 or len(profile.password) > 64):
             raise ValueError("Password muss zwischen 8 und 64 Zeichen lang sein")
+        self._validate_rule(profile.password_rule)
         return self.profile_repo.update_profile(profile)
 
-    def delete_profile_securely(self, profile_id: int, username: str, password_attempt: str):
+    @staticmethod
+    def _validate_rule(rule: Optional[str]):
+        # Kaputte Regeln gar nicht erst speichern (RuleError ist ein ValueError)
+        if rule:
+            compile_rule(rule)
+
+    def password_rule_for(self, user_id: int, url: str, profile_rule: Optional[str] = None) -> Optional[str]:
+        """Regel für ein Profil: eigene Regel des Profils, sonst die der Domain aus der URL, sonst None"""
+        if profile_rule:
+            return profile_rule
+        return self.rule_repo.find_for_url(user_id, url)
+
+    def set_domain_rule(self, user_id: int, domain: str, rule: str) -> None:
+        """Speichert die Regel für eine Domain (gilt auch für Subdomains ohne eigene Regel)"""
+        if not domain or not domain.strip():
+            raise ValueError("Domain darf nicht leer sein")
+        compile_rule(rule)
+        self.rule_repo.set_rule(user_id, domain.strip(), rule)
+
+    def delete_domain_rule(self, user_id: int, domain: str) -> None:
+        self.rule_repo.delete_rule(user_id, domain.strip())
+
+    def list_profiles(self, user_id: int):
+        """Alle Profile eines Users als ProfileSummary (nur Metadaten, nichts wird entschlüsselt)"""
+        return self.profile_repo.list_profiles(user_id)
+
+    def search_profiles(self, user_id: int, query: str):
+        """Volltextsuche (FTS5, nach Relevanz sortiert), liefert ProfileSummary ohne Passwort"""
+        return self.profile_repo.search_profiles(user_id, query)
+
+    def requires_reauth(self) -> bool:
+        """True, wenn vor einer kritischen Aktion das Master-Passwort abgefragt werden muss"""
+        return not self.session.has_recent_auth()
+
+    def confirm_master_password(self, username: str, password_attempt: str) -> None:
+        """
+        Re-Auth: prüft nur das Master-Passwort (keine Key-Ableitung) und gibt der Session
+        eine kurze Freigabe für weitere kritische Aktionen.
+        """
+        if not self.auth_service.verify_password(username, password_attempt or ""):
+            raise PermissionError("Falsches Master-Passwort!")
+        self.session.grant_reauth()
+
+    def delete_profile_securely(self, profile_id: int, username: str, password_attempt: str = None):
         """
-        Löscht nur, wenn das Master-Passwort korrekt ist.
+        Löscht nur, wenn das Master-Passwort korrekt ist oder gerade erst bestätigt wurde.
         Kapselt die Logik: Auth-Check -> Delete
         """
-        # 1. Sicherheits-Check (Backend-Logik)
-        if not self.auth_service.login(username, password_attempt):
-            raise PermissionError("Falsches Master-Passwort! Löschen verweigert.")
+        # 1. Sicherheits-Check (Backend-Logik) - bei mehreren Löschungen hintereinander nur einmal
+        if self.requires_reauth():
+            try:
+                self.confirm_master_password(username, password_attempt)
+            except PermissionError:
+                raise PermissionError("Falsches Master-Passwort! Löschen verweigert.") from None
 
         # 2. Durchführung
         self.profile_repo.delete_profile(profile_id)
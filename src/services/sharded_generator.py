@@ -0,0 +1,156 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional
+
+from src.crypto.random_source import create_source
+from src.services.password_generator_service import PasswordGeneratorService
+from src.services.uniqueness_guard import UniquenessGuard
+
+"""
+Mehrprozess-Backend für sehr große Mengen (z.B. 10 Mio. Passwörter als Lasttest-Fixture).
+
+Die Anzahl wird in Shards fester Größe zerlegt; Shard i enthält immer die Passwörter
+i * shard_size ... (i + 1) * shard_size - 1. Jeder Worker-Prozess hat seine eigene, frisch
+geseedete Zufallsquelle. Die Ergebnisse kommen in Shard-Reihenfolge zurück - unabhängig davon,
+welcher Prozess zuerst fertig ist -, es sind nie mehr als max_pending Shards unterwegs
+und abgebrochen wird über cancel() oder einfach durch Schließen des Iterators.
+Nach cancel() endet die Schleife mit GenerationCancelled - unvollständige Ausgabe ist so
+nie mit vollständiger zu verwechseln.
+"""
+
+
+class GenerationCancelled(Exception):
+    """iter_shards/generate wurde per cancel() abgebrochen; produced von count Passwörtern sind geliefert."""
+
+    def __init__(self, produced: int, count: int):
+        super().__init__(f"Generierung abgebrochen nach {produced} von {count} Passwörtern")
+        self.produced = produced
+        self.count = count
+
+
+# Pro Worker-Prozess, gesetzt vom Initializer
+_worker_service: Optional[PasswordGeneratorService] = None
+
+
+def _init_worker(source_name: str):
+    global _worker_service
+    # Eigene Quelle pro Prozess: kein geteilter Puffer/Schlüssel mit dem Elternprozess oder anderen Workern
+    _worker_service = PasswordGeneratorService(source=create_source(source_name))
+
+
+def _run_shard(size: int, start_index: int, options: dict, formatter: Optional[Callable]):
+    batch = _worker_service.generate_batch(size, **options)
+    # Formatieren im Worker spart dem Elternprozess Arbeit und Pickle-Overhead (ein String statt Liste)
+    return batch if formatter is None else formatter(batch, start_index=start_index)
+
+
+class ShardedGenerator:
+    """
+    Verteilt generate_batch auf mehrere Prozesse.
+
+        with ShardedGenerator(workers=8) as sharded:
+            for batch in sharded.iter_shards(10_000_000, algorithm="random", length=16):
+                ...
+    """
+
+    DEFAULT_SHARD_SIZE = 10_000
+    SOURCE = "urandom-pool"
+
+    def __init__(self, workers: int = None, shard_size: int = None, max_pending: int = None,
+                 source: str = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size or self.DEFAULT_SHARD_SIZE
+        # Obergrenze für Shards im Speicher (laufend + fertig, aber noch nicht abgeholt)
+        self.max_pending = max_pending or 2 * self.workers
+        self.source = source or self.SOURCE
+        self._executor = None
+        self._cancelled = threading.Event()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.source,)
+            )
+        return self._executor
+
+    def shards(self, count: int) -> list[tuple[int, int]]:
+        """(Startindex, Größe) je Shard - deterministisch, nur abhängig von count und shard_size."""
+        if count < 0:
+            raise ValueError("count darf nicht negativ sein")
+        return [(start, min(self.shard_size, count - start)) for start in range(0, count, self.shard_size)]
+
+    def iter_shards(self, count: int, formatter: Callable = None, unique: UniquenessGuard = None,
+                    **options) -> Iterator:
+        """
+        Liefert die Shards in Reihenfolge: Listen von Passwörtern oder - mit formatter -
+        formatter(batch, start_index=...) aus dem Worker (muss picklebar sein, z.B. functools.partial).
+        Mit unique prüft der Elternprozess jeden Shard gegen den UniquenessGuard und zieht
+        Duplikate selbst nach; formatiert wird dann ebenfalls im Elternprozess.
+        """
+        # Ungültige Optionen sofort im Aufrufer melden, nicht erst als Fehler aus einem Worker
+        PasswordGeneratorService().generate_batch(1, **options)
+        shards = self.shards(count)
+        self._cancelled.clear()
+        if unique is None:
+            return self._iter_shards(shards, formatter, options)
+        return self._iter_unique(shards, formatter, unique, options)
+
+    def _iter_unique(self, shards, formatter, unique, options) -> Iterator:
+        service = PasswordGeneratorService()
+        batches = self._iter_shards(shards, None, options)
+        try:
+            for (start, size), batch in zip(shards, batches):
+                batch = unique.filter(batch)
+                if len(batch) < size:
+                    batch += service.generate_batch(size - len(batch), unique=unique, **options)
+                yield batch if formatter is None else formatter(batch, start_index=start)
+        finally:
+            batches.close()
+
+    def _iter_shards(self, shards, formatter, options) -> Iterator:
+        pool = self._pool()
+        pending = deque()
+        count = sum(size for _, size in shards)
+        produced = 0
+        try:
+            for start, size in shards:
+                if self._cancelled.is_set():
+                    raise GenerationCancelled(produced, count)
+                if len(pending) >= self.max_pending:
+                    done, future = pending.popleft()
+                    yield future.result()
+                    produced += done
+                pending.append((size, pool.submit(_run_shard, size, start, options, formatter)))
+            while pending:
+                if self._cancelled.is_set():
+                    raise GenerationCancelled(produced, count)
+                done, future = pending.popleft()
+                yield future.result()
+                produced += done
+        finally:
+            # Abbruch, Fehler oder close() des Iterators: nicht gestartete Shards verwerfen
+            for _, future in pending:
+                future.cancel()
+
+    def generate(self, count: int, **options) -> Iterator[str]:
+        """Einzelne Passwörter in fester Reihenfolge (Shard für Shard)."""
+        for batch in self.iter_shards(count, **options):
+            yield from batch
+
+    def cancel(self):
+        """Bricht eine laufende iter_shards-Schleife ab (auch aus einem anderen Thread)."""
+        self._cancelled.set()
+
+    def shutdown(self, wait: bool = True):
+        self._cancelled.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,97 @@
+import hmac
+import secrets
+import threading
+from typing import Iterable, Optional
+
+from src.crypto import kdf
+from src.crypto.bloom import DEFAULT_ERROR_RATE, DEFAULT_INITIAL_CAPACITY, ScalableBloomFilter
+from src.database.generation_history_repository import GenerationHistoryRepository
+
+"""
+Eindeutigkeits-Garantie für Bulk-Generierung: jedes Passwort wird als HMAC-SHA256-Fingerprint
+in einen skalierbaren Bloom-Filter eingetragen, Duplikate werden vom Service verworfen und neu gezogen.
+
+    guard = UniquenessGuard()                                   # nur im Speicher
+    guard = UniquenessGuard.for_vault(master_key, repo, user_id) # Verlauf pro Tresor
+    service.generate_batch(1_000_000, algorithm="pattern", unique=guard)
+    guard.save()
+
+Auf der Kommandozeile: 'odinkey gen --history <username>' (fragt das Master-Passwort).
+
+Der HMAC-Schlüssel wird aus dem Vault-Key abgeleitet - ohne ihn lässt sich aus dem gespeicherten
+Filter nicht prüfen, ob ein bestimmtes Passwort generiert wurde. Der Vault-Key ist der Data-Key des
+Tresors und bleibt beim Wechsel des Master-Passworts gleich; nur wenn er ausgetauscht wird
+(Re-Keying), passt der alte Filter nicht mehr und der Verlauf beginnt neu.
+"""
+
+HISTORY_KEY_INFO = b"odinkey/v1/generation-history"
+
+
+class UniquenessGuard:
+    def __init__(self, key: bytes = None, error_rate: float = DEFAULT_ERROR_RATE,
+                 initial_capacity: int = DEFAULT_INITIAL_CAPACITY, bloom: ScalableBloomFilter = None):
+        # Ohne Schlüssel: zufälliger Schlüssel, der Filter gilt nur für diesen Prozess
+        self.key = key or secrets.token_bytes(32)
+        self.bloom = bloom or ScalableBloomFilter(error_rate, initial_capacity)
+        self._lock = threading.Lock()
+        self._repo: Optional[GenerationHistoryRepository] = None
+        self._user_id: Optional[int] = None
+
+    @classmethod
+    def for_vault(cls, master_key: bytes, repo: GenerationHistoryRepository, user_id: int,
+                  error_rate: float = DEFAULT_ERROR_RATE,
+                  initial_capacity: int = DEFAULT_INITIAL_CAPACITY) -> "UniquenessGuard":
+        """Lädt den gespeicherten Verlauf des Tresors (oder beginnt einen neuen); save() schreibt ihn zurück."""
+        key = kdf.derive_subkey(master_key, HISTORY_KEY_INFO)
+        guard = cls(key, error_rate, initial_capacity)
+        stored = repo.load(user_id)
+        if stored is not None and hmac.compare_digest(stored[0], guard.key_check):
+            try:
+                guard.bloom = ScalableBloomFilter.from_bytes(stored[1])
+            except ValueError:
+                pass  # beschädigt -> neu beginnen (ein Verlauf ist kein Geheimnis, das verloren gehen kann)
+        guard._repo, guard._user_id = repo, user_id
+        return guard
+
+    @property
+    def key_check(self) -> bytes:
+        return hmac.digest(self.key, b"key-check", "sha256")[:8]
+
+    def fingerprint(self, password: str) -> bytes:
+        return hmac.digest(self.key, password.encode(), "sha256")
+
+    def __contains__(self, password: str) -> bool:
+        return self.fingerprint(password) in self.bloom
+
+    def __len__(self) -> int:
+        return len(self.bloom)
+
+    def add(self, password: str) -> bool:
+        """Trägt ein; False, wenn das Passwort (wahrscheinlich) schon einmal generiert wurde."""
+        fingerprint = self.fingerprint(password)
+        with self._lock:
+            return self.bloom.add(fingerprint)
+
+    def filter(self, passwords: Iterable[str], limit: int = None) -> list[str]:
+        """
+        Nur die neuen Passwörter (auch Duplikate innerhalb von 'passwords' fallen weg) - sie werden
+        dabei eingetragen. Mit limit endet das nach so vielen neuen; der Rest bleibt unberührt.
+        """
+        key, add = self.key, self.bloom.add
+        fingerprints = [(p, hmac.digest(key, p.encode(), "sha256")) for p in passwords]
+        fresh = []
+        with self._lock:
+            for password, fingerprint in fingerprints:
+                if limit is not None and len(fresh) >= limit:
+                    break
+                if add(fingerprint):
+                    fresh.append(password)
+        return fresh
+
+    def save(self):
+        if self._repo is None:
+            raise ValueError("Kein Tresor zugeordnet - UniquenessGuard.for_vault() verwenden")
+        with self._lock:
+            data = self.bloom.to_bytes()
+            entries = len(self.bloom)
+        self._repo.save(self._user_id, self.key_check, data, entries)
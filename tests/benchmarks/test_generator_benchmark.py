@@ -0,0 +1,80 @@
+import json
+
+from benchmarks import generator_benchmark as bench
+
+
+def _report(rate):
+    return {"meta": {}, "results": {"random-16": {"passwords_per_sec": rate}}}
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = _report(1000)
+    assert bench.compare(_report(800), baseline, threshold=0.25) == []
+    assert bench.compare(_report(2000), baseline, threshold=0.25) == []
+    regressions = bench.compare(_report(700), baseline, threshold=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("random-16")
+
+
+def test_compare_flags_more_random_bytes_or_memory():
+    def report(random_bytes, alloc_bytes):
+        return {"results": {"random-16": {
+            "passwords_per_sec": 1000, "random_bytes": random_bytes, "alloc_bytes": alloc_bytes
+        }}}
+
+    baseline = report(16, 100)
+    assert bench.compare(report(17, 140), baseline, random_threshold=0.1, alloc_threshold=0.5) == []
+    assert bench.compare(report(8, 10), baseline) == []
+    assert "Zufallsbytes" in bench.compare(report(64, 100), baseline, random_threshold=0.1)[0]
+    assert "Alloc" in bench.compare(report(16, 1000), baseline, alloc_threshold=0.5)[0]
+    # Ältere Baselines ohne diese Metriken
+    assert bench.compare(report(64, 1000), _report(1000)) == []
+
+
+def test_compare_ignores_cases_missing_from_current_run():
+    assert bench.compare({"results": {}}, _report(1000)) == []
+
+
+def test_every_algorithm_is_covered():
+    from src.services.password_generator_service import PasswordGeneratorService
+
+    covered = {case.options.get("algorithm") for case in bench.CASES}
+    assert set(PasswordGeneratorService.ALGORITHMS) <= covered
+    assert any("template" in case.options for case in bench.CASES)
+
+
+def test_measure_reports_all_metrics():
+    result = bench.measure(bench.Case("tiny", dict(template="#{4}")), count=50, repeats=1)
+    assert result["passwords_per_sec"] > 0
+    assert result["ns_per_char"] > 0
+    assert result["random_bytes"] >= 4 * 0.5  # mind. ein halbes Byte pro Ziffer
+    assert result["alloc_bytes"] > 0
+
+
+def test_main_writes_json_and_fails_on_regression(tmp_path):
+    out = tmp_path / "run.json"
+    assert bench.main(["--count", "50", "--repeats", "1", "--only", "pattern", "--out", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert set(report["results"]) == {"pattern"}
+
+    report["results"]["pattern"]["passwords_per_sec"] *= 1000
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert bench.main(["--count", "50", "--repeats", "1", "--only", "pattern", "--baseline", str(baseline)]) == 1
+
+    # Durchsatz ok, aber deutlich weniger Zufallsbytes bzw. Speicher in der Baseline -> Regression
+    for key in ("random_bytes", "alloc_bytes"):
+        changed = json.loads(out.read_text())
+        changed["results"]["pattern"]["passwords_per_sec"] /= 1000
+        changed["results"]["pattern"][key] /= 10
+        baseline.write_text(json.dumps(changed))
+        assert bench.main(
+            ["--count", "50", "--repeats", "1", "--only", "pattern", "--baseline", str(baseline)]
+        ) == 1, key
+
+
+def test_sources_are_compared(tmp_path):
+    out = tmp_path / "run.json"
+    assert bench.main(["--count", "20", "--repeats", "1", "--only", "pattern", "--sources", "--out", str(out)]) == 0
+    sources = json.loads(out.read_text())["sources"]
+    assert set(sources) == {"system", "urandom-pool", "aes-ctr-drbg"}
+    assert all(result["choices_per_sec"] > 0 for result in sources.values())
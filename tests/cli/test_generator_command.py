@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from src.cli.main import main
+from src.cli.commands.generator import format_batch
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def test_gen_plain_writes_one_password_per_line(runner):
+    result = runner.invoke(main, ["gen", "--count", "25", "--length", "20", "--batch-size", "7"])
+    assert result.exit_code == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert len(lines) == 25
+    assert all(len(line) == 20 for line in lines)
+
+
+def test_gen_ndjson_indexes_across_batches(runner):
+    result = runner.invoke(main, ["gen", "-a", "passphrase", "-n", "10", "-f", "ndjson", "--batch-size", "3"])
+    assert result.exit_code == 0, result.stderr
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["index"] for r in records] == list(range(10))
+    assert "Loaded" not in result.stdout
+
+
+def test_gen_csv_quotes_special_characters(runner):
+    result = runner.invoke(main, ["gen", "-t", '",!{3}', "-n", "5", "-f", "csv"])
+    assert result.exit_code == 0, result.stderr
+    rows = list(csv.reader(io.StringIO(result.stdout)))
+    assert rows[0] == ["index", "password"]
+    assert len(rows) == 6
+    assert all(row[1].startswith('",') and len(row[1]) == 5 for row in rows[1:])
+
+
+def test_gen_out_file_with_workers(runner, tmp_path):
+    target = tmp_path / "passwords.txt"
+    result = runner.invoke(main, ["gen", "-t", "#{6}", "-n", "1000", "--batch-size", "64",
+                                  "--workers", "2", "--out", str(target)])
+    assert result.exit_code == 0, result.stderr
+    lines = target.read_text().splitlines()
+    assert len(lines) == 1000
+    assert all(line.isdigit() and len(line) == 6 for line in lines)
+    assert result.stdout == ""
+
+
+def test_gen_with_rule(runner):
+    result = runner.invoke(main, ["gen", "-n", "50", "--rule", "maxlength: 10; required: digit; allowed: lower"])
+    assert result.exit_code == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert len(lines) == 50
+    assert all(len(line) == 10 and any(c.isdigit() for c in line) for line in lines)
+
+
+def test_gen_rejects_invalid_options(runner):
+    result = runner.invoke(main, ["gen", "--length", "3"])
+    assert result.exit_code == 2
+    assert result.stdout == ""
+
+
+def test_format_batch_unknown_format():
+    with pytest.raises(ValueError):
+        format_batch(["x"], "xml", 0)
+
+
+@pytest.mark.parametrize("extra", [["--template", "#{8}"], ["--rule", "minlength: 12"], ["--regex", "[a-z]{8}"]])
+def test_gen_rejects_entropy_with_fixed_shape(runner, extra):
+    result = runner.invoke(main, ["gen", "--entropy", "80", *extra])
+    assert result.exit_code == 2
+    assert "--entropy" in result.stderr
+
+
+def test_gen_broken_pipe_exits_quietly():
+    import subprocess
+    import sys
+    # Leser schließt nach einer Zeile -> kein Traceback, stderr bleibt nutzbar und leer
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from src.cli.main import main; main()", "gen", "-n", "300000"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    process.stdout.readline()
+    process.stdout.close()
+    stderr = process.stderr.read()
+    process.wait(timeout=60)
+    assert process.returncode == 1
+    assert stderr == b""
+
+
+def test_gen_reports_cancelled_generation(runner, monkeypatch):
+    from src.services.sharded_generator import GenerationCancelled, ShardedGenerator
+
+    def cancelled(self, count, **kwargs):
+        yield "a\n"
+        raise GenerationCancelled(1, count)
+
+    monkeypatch.setattr(ShardedGenerator, "iter_shards", cancelled)
+    result = runner.invoke(main, ["gen", "-n", "100", "--workers", "2"])
+    assert result.exit_code == 1
+    assert "unvollständig" in result.stderr
+
+
+def test_gen_history_is_stored_per_vault(runner, tmp_path, monkeypatch):
+    from src.cli.commands import generator
+    from src.crypto import kdf
+    from src.database.connection import DatabaseConnection
+    from src.database.generation_history_repository import GenerationHistoryRepository
+    from src.database.repository import MasterAccountRepository
+    from src.services.master_account_service import MasterAccountService
+
+    monkeypatch.setattr(kdf, "calibrate", lambda *args, **kwargs: kdf.MINIMUM_PARAMS[kdf.ARGON2ID])
+    db = DatabaseConnection(str(tmp_path / "history.db"))
+    db.create_tables()
+    monkeypatch.setattr(generator, "db_conn", db)
+    accounts = MasterAccountService(MasterAccountRepository(db))
+    accounts.register_account("roman", "MasterPasswort1")
+    account, _ = accounts.repo.get_account_by_username("roman")
+
+    args = ["gen", "-a", "pattern", "-n", "20", "--history", "roman"]
+    for _ in range(2):
+        result = runner.invoke(main, args, input="MasterPasswort1\n")
+        assert result.exit_code == 0, result.stderr
+        assert len(result.stdout.splitlines()) == 20
+    # Beide Läufe landen im selben gespeicherten Verlauf
+    assert GenerationHistoryRepository(db).load(account.id) is not None
+    entries = db.connect().execute("SELECT entries FROM generation_history WHERE user_id = ?", (account.id,))
+    assert entries.fetchone()[0] == 40
+
+    result = runner.invoke(main, args, input="falsch\n")
+    assert result.exit_code == 1
+    assert "Login fehlgeschlagen" in result.stderr
+    db.close()
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from src.core.password_strength import StrengthMeter, estimate
+
+
+@pytest.fixture
+def meter():
+    return StrengthMeter()
+
+
+def test_empty_password_has_no_strength(meter):
+    assert meter.bits == 0
+    assert meter.score == 0
+    assert len(meter) == 0
+
+
+def test_incremental_matches_full_rescan(meter):
+    rng = random.Random(7)
+    text = ""
+    for _ in range(500):
+        if text and rng.random() < 0.3:
+            cut = rng.randrange(len(text))
+            text = text[:cut] + text[cut + 1:]  # Löschen mitten im Wort
+        else:
+            text += rng.choice("abcdeArk4@1!x9 ")
+        meter.set_text(text)
+        assert meter.text == text
+        assert meter.bits == pytest.approx(estimate(text))
+
+
+def test_pop_restores_previous_state(meter):
+    meter.set_text("aardvar")
+    before = meter.bits
+    meter.append("k")
+    meter.pop()
+    assert meter.bits == before
+    assert meter.text == "aardvar"
+
+
+def test_typing_at_the_end_skips_the_prefix_scan(meter, monkeypatch):
+    text = "x9!" * 300
+    meter.set_text(text)
+
+    def scan(*args):
+        raise AssertionError("Präfix Zeichen für Zeichen verglichen")
+
+    monkeypatch.setattr(meter, "_replace_from_first_difference", scan)
+    meter.set_text(text + "A")
+    meter.set_text(text)
+    meter.pop()
+    meter.set_text(text)
+    assert meter.bits == pytest.approx(estimate(text))
+
+
+def test_dictionary_word_is_cheap(meter):
+    meter.set_text("aardvark")
+    assert meter.patterns["words"] == 1
+    assert meter.bits < estimate("qzvjxkwp")
+
+
+def test_leet_and_case_variants_still_match():
+    for variant in ("4ardv4rk", "Aardvark", "AARDVARK"):
+        meter = StrengthMeter()
+        meter.set_text(variant)
+        assert meter.patterns["words"] == 1
+        assert meter.bits < 20
+
+
+def test_repeats_and_sequences(meter):
+    meter.set_text("aaaaaaaa")
+    assert meter.patterns["repeats"] == 1
+    assert meter.bits < 10
+    meter.set_text("87654321")
+    assert meter.patterns["sequences"] == 1
+    assert meter.bits < 10
+
+
+def test_random_password_rates_strong(meter):
+    meter.set_text("xK9#mQ2!vL7@pR4$")
+    assert meter.score >= 2
+    assert meter.classes == 4
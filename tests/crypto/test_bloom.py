@@ -0,0 +1,58 @@
+import os
+import random
+
+import pytest
+
+from src.crypto.bloom import BloomFilter, ScalableBloomFilter, dimension
+
+
+def fingerprints(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.randbytes(32) for _ in range(n)]
+
+
+def test_no_false_negatives():
+    bloom = ScalableBloomFilter(1e-4, initial_capacity=500)
+    items = fingerprints(5000)
+    assert bloom.update(items) == 5000
+    assert len(bloom.filters) > 1
+    assert all(item in bloom for item in items)
+    assert not any(bloom.add(item) for item in items)
+    assert len(bloom) == 5000
+
+
+def test_false_positive_rate_stays_below_target():
+    bloom = ScalableBloomFilter(1e-2, initial_capacity=1000)
+    bloom.update(fingerprints(20_000, seed=1))
+    probes = fingerprints(50_000, seed=2)
+    rate = sum(probe in bloom for probe in probes) / len(probes)
+    assert rate < 1e-2 * 1.3  # Stichprobe, etwas Luft für Zufallsschwankungen
+
+
+def test_memory_per_entry_is_bounded():
+    hashes, bits = dimension(1e-6)
+    assert bits / 8 < 6
+    bloom = BloomFilter(10_000, 1e-6)
+    assert len(bloom.bits) / bloom.capacity < 6
+
+
+def test_serialization_roundtrip():
+    bloom = ScalableBloomFilter(1e-3, initial_capacity=100)
+    items = fingerprints(300)
+    bloom.update(items)
+    restored = ScalableBloomFilter.from_bytes(bloom.to_bytes())
+    assert len(restored) == 300 and len(restored.filters) == len(bloom.filters)
+    assert all(item in restored for item in items)
+
+
+@pytest.mark.parametrize("data", [b"", b"NOTBLOOM" + bytes(30)])
+def test_invalid_serialization(data):
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.from_bytes(data)
+
+
+def test_truncated_serialization():
+    bloom = ScalableBloomFilter(1e-3, initial_capacity=100)
+    bloom.add(os.urandom(32))
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.from_bytes(bloom.to_bytes()[:-10])
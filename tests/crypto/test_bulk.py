@@ -0,0 +1,46 @@
+import threading
+import pytest
+from src.crypto.bulk import BulkCipher
+from src.crypto.encryption import CipherContext
+
+
+class TestBulkCipher:
+    KEY = b'b' * 32
+
+    @pytest.fixture
+    def context(self):
+        return CipherContext(self.KEY)
+
+    @pytest.mark.parametrize("workers, batch_size", [(1, 7), (4, 7), (4, 1000), (3, 1)])
+    def test_results_keep_input_order(self, context, workers, batch_size):
+        texts = [f"Passwort-{i}" for i in range(100)]
+        bulk = BulkCipher(context, workers=workers, batch_size=batch_size)
+
+        pairs = list(bulk.encrypt_iter(texts))
+        assert list(bulk.decrypt_iter(pairs)) == texts
+
+    def test_empty_input(self, context):
+        assert list(BulkCipher(context, workers=4).decrypt_iter([])) == []
+
+    def test_batches_run_on_worker_threads(self, context):
+        threads = set()
+        original = context.decrypt_many
+
+        def recording_decrypt_many(items):
+            threads.add(threading.current_thread().name)
+            return original(items)
+
+        pairs = context.encrypt_many(["x"] * 50)
+        context.decrypt_many = recording_decrypt_many
+        list(BulkCipher(context, workers=2, batch_size=10).decrypt_iter(pairs))
+
+        assert threads and all(name.startswith("odinkey-bulk") for name in threads)
+
+    def test_accepts_generator_input(self, context):
+        bulk = BulkCipher(context, workers=2, batch_size=5)
+        pairs = bulk.encrypt_iter(str(i) for i in range(23))
+        assert list(bulk.decrypt_iter(pairs)) == [str(i) for i in range(23)]
+
+    def test_invalid_configuration(self, context):
+        with pytest.raises(ValueError):
+            BulkCipher(context, workers=0)
@@ -1,6 +1,6 @@
 
 import os
-from src.crypto.encryption import Encryption
+from src.crypto.encryption import Encryption, CipherContext
 
 class TestEncryption:
     def test_derive_key_returns_correct_length(self):
@@ -65,4 +65,34 @@ class TestEncryption:
         decrypted_text = encryption.decrypt_data(key, nonce, ciphertext)
 
         # Assert
-        assert decrypted_text == original_text
\ No newline at end of file
+        assert decrypted_text == original_text
+
+class TestCipherContext:
+    KEY = b'k' * 32
+
+    def test_context_is_reused_for_same_key(self):
+        encryption = Encryption()
+        assert encryption.context(self.KEY) is encryption.context(self.KEY)
+        assert encryption.context(b'x' * 32) is not encryption.context(self.KEY)
+
+    def test_encrypt_many_uses_unique_nonces(self):
+        context = CipherContext(self.KEY)
+        pairs = context.encrypt_many(["a", "b", "c"] * 10)
+
+        assert len({nonce for nonce, _ in pairs}) == 30
+        assert all(len(nonce) == 12 for nonce, _ in pairs)
+        assert context.decrypt_many(pairs) == ["a", "b", "c"] * 10
+
+    def test_decrypt_many_over_packed_buffer(self):
+        context = CipherContext(self.KEY)
+        texts = ["kurz", "ein etwas längeres Passwort", ""]
+        buffer, lengths = CipherContext.pack(context.encrypt_many(texts))
+
+        pairs = list(CipherContext.iter_packed(buffer, lengths))
+        assert all(isinstance(nonce, memoryview) for nonce, _ in pairs)
+        assert context.decrypt_many(pairs) == texts
+
+    def test_batch_is_compatible_with_encrypt_data(self):
+        encryption = Encryption()
+        nonce, ciphertext = encryption.encrypt_data(self.KEY, "Geheim")
+        assert CipherContext(self.KEY).decrypt_many([(nonce, ciphertext)]) == ["Geheim"]
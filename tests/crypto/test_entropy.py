@@ -0,0 +1,70 @@
+import itertools
+import math
+
+import pytest
+
+from src.crypto import entropy
+from src.services.password_generator_service import PasswordGeneratorService
+
+
+def test_random_bits_matches_brute_force():
+    # Alphabet {a, b} + {1}, Länge 3, jede Klasse mindestens einmal
+    valid = [
+        p for p in itertools.product("ab1", repeat=3)
+        if any(c in "ab" for c in p) and "1" in p
+    ]
+    assert entropy.random_bits(3, (2, 1)) == pytest.approx(math.log2(len(valid)))
+
+
+def test_random_bits_single_class_is_uniform():
+    assert entropy.random_bits(10, (26,)) == pytest.approx(10 * math.log2(26))
+
+
+def test_template_bits():
+    assert entropy.template_bits("ab#{4}") == pytest.approx(4 * math.log2(10))
+    assert entropy.template_bits("[xy]{1,3}") == pytest.approx(math.log2(3) + 2)
+    assert entropy.template_bits("literal") == 0
+
+
+def test_rate():
+    assert entropy.rate(20) == "schwach"
+    assert entropy.rate(128) == "sehr stark"
+
+
+@pytest.fixture
+def service():
+    return PasswordGeneratorService()
+
+
+def test_result_carries_entropy(service):
+    result = service.generate_password(16, algorithm="random")
+    assert result["entropy"] == pytest.approx(entropy.random_bits(16, (26, 26, 10, 32)))
+
+    result = service.generate_password(20, algorithm="passphrase", use_digits=False, use_special=False)
+    assert result["entropy"] == pytest.approx(4 * math.log2(len(service.wordlist)))
+
+    result = service.generate_password(12, algorithm="pronounceable", use_digits=False, use_special=False)
+    assert 0 < result["entropy"] < 12 * 16
+
+
+@pytest.mark.parametrize("algorithm", ["random", "pronounceable", "passphrase"])
+def test_target_entropy_picks_smallest_sufficient_length(service, algorithm):
+    result = service.generate_password(algorithm=algorithm, target_entropy=64)
+    assert result["success"], result
+
+    length = service.length_for_entropy(64, algorithm)
+    assert service.entropy_bits(algorithm, length) >= 64
+    step = 5 if algorithm == "passphrase" else 1
+    assert service.entropy_bits(algorithm, length - step) < 64
+
+
+@pytest.mark.parametrize("algorithm", ["random", "pronounceable", "passphrase"])
+def test_reported_entropy_meets_target(service, algorithm):
+    for _ in range(50):
+        result = service.generate_password(algorithm=algorithm, target_entropy=60)
+        assert result["entropy"] >= 60
+
+
+def test_unreachable_target(service):
+    result = service.generate_password(algorithm="pattern", target_entropy=500)
+    assert not result["success"]
@@ -317,4 +317,41 @@ class TestPasswordGeneratorStaticMethods:
             use_lowercase=False,
             use_digits=False,
             use_special=False
-        ) == False
\ No newline at end of file
+        ) == False
+
+class TestPasswordGeneratorBulk:
+    """Tests für generate_many (Bulk-Generierung)"""
+
+    def test_generate_many_count_and_length(self):
+        passwords = PasswordGenerator().generate_many(500, length=12)
+
+        assert len(passwords) == 500
+        assert all(len(p) == 12 for p in passwords)
+        assert len(set(passwords)) == 500
+
+    def test_every_password_contains_all_selected_classes(self):
+        classes = [string.ascii_uppercase, string.ascii_lowercase, string.digits, string.punctuation]
+        for password in PasswordGenerator().generate_many(2000, length=8):
+            assert all(any(c in cls for c in password) for cls in classes)
+
+    def test_only_selected_classes_are_used(self):
+        passwords = PasswordGenerator().generate_many(
+            200, length=10, use_uppercase=False, use_lowercase=False, use_digits=True, use_special=False
+        )
+        assert all(p.isdigit() for p in passwords)
+
+    def test_all_pool_characters_appear(self):
+        # Rejection Sampling: kein Zeichen darf fehlen oder stark bevorzugt sein
+        text = "".join(PasswordGenerator().generate_many(2000, length=64))
+        counts = [text.count(c) for c in string.ascii_letters + string.digits + string.punctuation]
+        expected = len(text) / 94
+        assert min(counts) > expected * 0.8
+        assert max(counts) < expected * 1.2
+
+    def test_generate_many_validates(self):
+        with pytest.raises(ValueError):
+            PasswordGenerator().generate_many(10, length=7)
+        with pytest.raises(ValueError):
+            PasswordGenerator().generate_many(10, use_uppercase=False, use_lowercase=False,
+                                              use_digits=False, use_special=False)
+        assert PasswordGenerator().generate_many(0) == []
@@ -0,0 +1,52 @@
+import os
+import pytest
+from src.crypto import kdf
+from src.crypto.encryption import Encryption
+from src.crypto.kdf import KdfParams
+
+
+class TestKdf:
+    SALT = os.urandom(16)
+
+    @pytest.mark.parametrize("params", [
+        KdfParams(kdf.PBKDF2, iterations=1000),
+        KdfParams(kdf.SCRYPT, memory_kib=1024),
+        KdfParams(kdf.ARGON2ID, iterations=1, memory_kib=1024),
+    ])
+    def test_backends_derive_deterministic_32_byte_keys(self, params):
+        key = kdf.derive("MasterPasswort", self.SALT, params)
+        assert len(key) == 32
+        assert key == kdf.derive("MasterPasswort", self.SALT, params)
+        assert key != kdf.derive("AnderesPasswort", self.SALT, params)
+
+    def test_legacy_params_match_old_derive_key(self):
+        # Alte Tresore (kdf_params = NULL) müssen weiterhin denselben Key bekommen
+        key = Encryption().derive_key("MasterPasswort", self.SALT)
+        assert key == kdf.derive("MasterPasswort", self.SALT, KdfParams.from_json(None))
+        assert KdfParams.from_json(None) == KdfParams(kdf.PBKDF2, iterations=100_000)
+
+    def test_params_json_roundtrip(self):
+        params = KdfParams(kdf.ARGON2ID, iterations=3, memory_kib=65536, parallelism=4)
+        assert KdfParams.from_json(params.to_json()) == params
+
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            kdf.derive("x", self.SALT, KdfParams("md5"))
+
+    @pytest.mark.parametrize("algorithm", [kdf.PBKDF2, kdf.SCRYPT, kdf.ARGON2ID])
+    def test_calibration_respects_minimum(self, algorithm):
+        params = kdf.calibrate(algorithm, target_ms=1)
+        assert params.algorithm == algorithm
+        assert not kdf.needs_upgrade(params, algorithm)
+
+    def test_needs_upgrade(self):
+        assert kdf.needs_upgrade(kdf.LEGACY_PARAMS)
+        assert kdf.needs_upgrade(KdfParams(kdf.ARGON2ID, iterations=1, memory_kib=1024))
+        assert not kdf.needs_upgrade(kdf.MINIMUM_PARAMS[kdf.ARGON2ID])
+
+    def test_root_secret_split_gives_independent_keys(self):
+        root = os.urandom(32)
+        verifier, vault_key = kdf.split_root_secret(root)
+        assert len(verifier) == len(vault_key) == 32
+        assert verifier != vault_key
+        assert kdf.split_root_secret(root) == (verifier, vault_key)
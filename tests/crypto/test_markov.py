@@ -0,0 +1,66 @@
+import math
+import random
+
+import pytest
+
+from src.crypto import markov
+from src.crypto.markov import TrigramModel, load_model, train
+from src.crypto.wordstore import BUNDLED_WORDLIST, parse_wordlist
+
+
+@pytest.fixture(scope="module")
+def model():
+    return load_model()
+
+
+def test_bundled_model_matches_training():
+    with open(BUNDLED_WORDLIST, encoding="utf-8") as f:
+        assert markov.MODEL_PATH.read_bytes() == train(parse_wordlist(f))
+
+
+def test_each_context_sums_to_full_precision(model):
+    for ctx in range(markov.CONTEXTS):
+        lo, hi = model.offsets[ctx], model.offsets[ctx + 1]
+        if lo != hi:
+            assert model.cumulative[hi - 1] == markov.TOTAL - 1
+            assert sum(2 ** -model.bits[i] for i in range(lo, hi)) == pytest.approx(1.0)
+
+
+def test_sample_length_alphabet_and_path_entropy(model):
+    rng = random.Random(1)
+    text, bits = model.sample(rng, 14)
+    assert len(text) == 14 and text.isalpha() and text.islower()
+
+    # Pfad-Entropie = -log2 der Wahrscheinlichkeit, genau diesen Text zu ziehen
+    expected = 0.0
+    ctx = markov.START
+    for char in text:
+        if model.offsets[ctx] == model.offsets[ctx + 1]:
+            ctx = markov.START
+        symbol = markov.ALPHABET.index(char)
+        i = next(i for i in range(model.offsets[ctx], model.offsets[ctx + 1]) if model.symbols[i] == symbol)
+        expected += model.bits[i]
+        ctx = (ctx % markov.SIZE) * markov.SIZE + symbol
+    assert bits == pytest.approx(expected)
+
+
+def test_more_entropy_per_character_than_alternating_scheme(model):
+    alternating = (math.log2(21) + math.log2(5)) / 2
+    assert model.expected_bits(12) / 12 > alternating
+
+
+def test_expected_bits_matches_sampling_mean(model):
+    rng = random.Random(7)
+    mean = sum(model.sample(rng, 10)[1] for _ in range(4000)) / 4000
+    assert mean == pytest.approx(model.expected_bits(10), rel=0.02)
+
+
+def test_training_skips_non_letter_words():
+    small = TrigramModel(train(["abc", "ab1", "abd"]))
+    text, _ = small.sample(random.Random(0), 6)
+    assert set(text) <= set("abcd")
+
+
+def test_corrupt_model_rejected():
+    with pytest.raises(ValueError):
+        TrigramModel(b"NOTMODEL" + b"\x00" * 8)
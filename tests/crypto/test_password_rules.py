@@ -0,0 +1,61 @@
+import random
+import string
+
+import pytest
+
+from src.crypto.password_rules import RuleError, compile_rule
+
+
+@pytest.fixture
+def rng():
+    return random.Random(1234)
+
+
+def test_default_rule():
+    rule = compile_rule("")
+    assert rule.max_length == 16
+    assert set(rule.pool) == set(string.ascii_letters + string.digits + string.punctuation)
+
+
+def test_generated_passwords_satisfy_rule(rng):
+    rule = compile_rule(
+        "minlength: 12; maxlength: 20; required: digit; required: digit; required: [-_]; "
+        "allowed: upper, lower; forbidden: [lIO0]; max-consecutive: 2"
+    )
+    for _ in range(2000):
+        password = rule.generate(rng)
+        assert len(password) == 20
+        assert rule.check(password)
+        assert sum(c.isdigit() for c in password) >= 2
+        assert not set(password) & set("lIO0")
+
+
+def test_tight_single_character_requirements(rng):
+    # Drei 'a' in fünf Zeichen ohne Wiederholung geht nur als a?a?a
+    rule = compile_rule("maxlength: 5; required: [a]; required: [a]; required: [a]; allowed: [ab]; max-consecutive: 1")
+    assert {rule.generate(rng) for _ in range(200)} == {"ababa"}
+
+
+def test_check_needs_distinct_characters_for_required_sets():
+    rule = compile_rule("minlength: 2; maxlength: 4; required: [ab]; required: [a]; allowed: [abc]")
+    assert rule.check("ab")
+    assert not rule.check("cac")  # ein 'a' kann nicht beide Pflichten erfüllen
+    assert not rule.check("abx")
+
+
+@pytest.mark.parametrize("text", [
+    "minlength: 20; maxlength: 10",
+    "maxlength: 1; required: digit; required: upper",
+    "required: digit; forbidden: digit",
+    "required: vowels",
+    "color: blue",
+    "minlength: zwölf",
+    "maxlength: 4; required: [a]; required: [a]; required: [a]; allowed: [ab]; max-consecutive: 1",
+])
+def test_invalid_rules(text):
+    with pytest.raises(RuleError):
+        compile_rule(text)
+
+
+def test_compile_is_cached():
+    assert compile_rule("required: digit") is compile_rule("required: digit")
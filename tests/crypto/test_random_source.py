@@ -0,0 +1,68 @@
+import os
+import random
+import string
+from collections import Counter
+
+import pytest
+
+from src.crypto.generator import PasswordGenerator
+from src.crypto.random_source import AesCtrDrbg, UrandomPool, create_source
+
+
+@pytest.fixture(params=[UrandomPool, AesCtrDrbg])
+def source(request):
+    return request.param(chunk_size=64)  # kleiner Puffer -> viele Nachfüllungen im Test
+
+
+class TestRandomSource:
+
+    def test_randbelow_is_in_range_and_uniform(self, source):
+        counts = Counter(source.randbelow(6) for _ in range(60_000))
+        assert set(counts) == set(range(6))
+        assert all(9_000 < c < 11_000 for c in counts.values())
+
+    def test_randbelow_large_and_invalid(self, source):
+        assert 0 <= source.randbelow(2 ** 100) < 2 ** 100
+        with pytest.raises(ValueError):
+            source.randbelow(0)
+
+    def test_random_module_api_works(self, source):
+        items = list(range(20))
+        source.shuffle(items)
+        assert sorted(items) == list(range(20))
+        assert source.choice("abc") in "abc"
+        assert 0.0 <= source.random() < 1.0
+        assert len(source.randbytes(100)) == 100
+        assert 0 <= source.getrandbits(40) < 2 ** 40
+
+    def test_outputs_do_not_repeat(self, source):
+        assert len({source.randbytes(16) for _ in range(1000)}) == 1000
+
+    def test_drbg_reseeds(self):
+        drbg = AesCtrDrbg(chunk_size=64, reseed_interval=128)
+        first_key = drbg._key
+        drbg.randbytes(200)
+        drbg.randbytes(200)
+        assert drbg._key != first_key
+        assert drbg._since_reseed <= 200
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="fork() nicht verfügbar")
+    def test_fork_gets_fresh_randomness(self, source):
+        source.getrandbits(8)  # Puffer ist jetzt gefüllt
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write_fd, source.randbytes(8) + bytes(source.getrandbits(8) for _ in range(8)))
+            os._exit(0)
+        os.waitpid(pid, 0)
+        child = os.read(read_fd, 16)
+        parent = source.randbytes(8) + bytes(source.getrandbits(8) for _ in range(8))
+        assert child != parent
+
+    def test_generator_uses_pluggable_source(self):
+        assert isinstance(PasswordGenerator().random, UrandomPool)
+        generator = PasswordGenerator(create_source("aes-ctr-drbg"))
+        assert all(c in string.digits for c in generator.generate_from_template("####"))
+        assert isinstance(PasswordGenerator(random.SystemRandom()).get_random_digit(), str)
+        with pytest.raises(ValueError):
+            create_source("mt19937")
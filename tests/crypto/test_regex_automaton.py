@@ -0,0 +1,110 @@
+import math
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from src.crypto.generator import PasswordGenerator
+from src.crypto.regex_automaton import RegexError, compile_regex
+from src.services.password_generator_service import PasswordGeneratorService
+
+
+@pytest.fixture
+def rng():
+    return random.Random(42)
+
+
+@pytest.mark.parametrize("pattern, length", [
+    (r"[A-Z]{3}-\d{6}-[a-z0-9]{8}", None),
+    (r"^(?:ab|cd)+x?$", 9),
+    (r"[^a-z\d]{4}\.\w{2,5}", None),
+    (r"(foo|ba[rz])\{1\}", None),
+    (r"x{2,}", 6),
+])
+def test_generated_strings_match(rng, pattern, length):
+    automaton = compile_regex(pattern)
+    for word in automaton.generate_many(300, rng, length):
+        assert re.fullmatch(pattern, word)
+
+
+# Quantoren-Schreibweisen wie in Pythons re - inklusive der Fälle, in denen '{' ein Literal ist
+@pytest.mark.parametrize("pattern, length", [
+    (r"x{,3}y", None),
+    (r"a{,}b", 5),
+    (r"a{}", None),
+    (r"a{1, 3}", None),
+    (r"\d{²}", None),
+    (r"[ab]{3}{", None),
+])
+def test_quantifier_syntax_agrees_with_re(rng, pattern, length):
+    automaton = compile_regex(pattern)
+    words = automaton.generate_many(300, rng, length)
+    assert all(re.fullmatch(pattern, word) for word in words)
+    if pattern == r"x{,3}y":
+        assert {len(word) for word in words} == {1, 2, 3, 4}
+
+
+# Escapter Backslash vor dem Anker: '$' ist nur bei ungerader Anzahl Backslashes ein Literal
+@pytest.mark.parametrize("pattern, expected", [
+    (r"^foo\\$", "foo\\"),
+    (r"foo\$", "foo$"),
+    (r"foo\\\$", "foo\\$"),
+])
+def test_end_anchor_after_backslashes(rng, pattern, expected):
+    assert compile_regex(pattern).generate(rng) == expected
+    assert re.fullmatch(pattern, expected)
+
+
+def test_exact_count_and_entropy():
+    automaton = compile_regex(r"[A-Z]{3}-\d{6}-[a-z0-9]{8}")
+    assert automaton.total() == 26 ** 3 * 10 ** 6 * 36 ** 8
+    assert automaton.entropy_bits() == pytest.approx(3 * math.log2(26) + 6 * math.log2(10) + 8 * math.log2(36))
+
+
+def test_ambiguous_pattern_is_uniform_over_strings(rng):
+    # "abc" hat zwei Zerlegungen (ab|c und a|bc), darf aber nicht doppelt so oft kommen
+    automaton = compile_regex("(ab|a)(bc|c)")
+    assert automaton.total() == 3
+    counts = Counter(automaton.generate_many(30_000, rng))
+    assert set(counts) == {"abbc", "abc", "ac"}
+    assert max(counts.values()) - min(counts.values()) < 800
+
+
+def test_mixed_lengths_weighted_by_count(rng):
+    # 2 Wörter der Länge 1, 4 der Länge 2 -> jedes Wort 1/6
+    counts = Counter(compile_regex("[ab]{1,2}").generate_many(30_000, rng))
+    assert len(counts) == 6
+    assert max(counts.values()) - min(counts.values()) < 800
+
+
+def test_unrank_enumerates_all_words():
+    automaton = compile_regex("[ab]c?[de]")
+    words = {automaton.unrank(rank, 3) for rank in range(automaton.count(3))}
+    assert words == {"acd", "ace", "bcd", "bce"}
+
+
+def test_automaton_is_cached():
+    assert compile_regex(r"\d{4}") is compile_regex(r"\d{4}")
+
+
+@pytest.mark.parametrize("pattern", ["", "a(", "(?=a)b", "a**", "a+?", r"\bword", "*a", "a$b", "[z-a]", "a{300}"])
+def test_invalid_patterns(pattern):
+    with pytest.raises(RegexError):
+        compile_regex(pattern)
+
+
+def test_unbounded_pattern_needs_length(rng):
+    with pytest.raises(RegexError):
+        compile_regex("a+").generate(rng)
+    with pytest.raises(RegexError):
+        compile_regex("ab").generate(rng, length=5)
+
+
+def test_generator_and_service_api():
+    assert re.fullmatch(r"\d{4}-[a-f]{4}", PasswordGenerator().generate_from_regex(r"\d{4}-[a-f]{4}"))
+    result = PasswordGeneratorService().generate_with_regex(r"[a-z]+", length=12)
+    assert result["success"] and len(result["password"]) == 12
+    assert result["entropy"] == pytest.approx(12 * math.log2(26))
+    batch = PasswordGeneratorService().generate_batch(50, regex=r"[a-z]+\d", length=8)
+    assert all(re.fullmatch(r"[a-z]{7}\d", p) for p in batch)
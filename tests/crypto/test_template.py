@@ -0,0 +1,52 @@
+import re
+import string
+import pytest
+from src.crypto.generator import PasswordGenerator
+from src.crypto.template import compile_template, TemplateError
+from src.services.password_generator_service import PasswordGeneratorService
+
+
+class TestTemplateEngine:
+
+    @pytest.fixture
+    def generator(self):
+        return PasswordGenerator()
+
+    @pytest.mark.parametrize("template, pattern", [
+        ("OdinKey-####-@@@@", r"OdinKey-\d{4}-[A-Za-z]{4}"),
+        ("#{4}-@{2,6}", r"\d{4}-[A-Za-z]{2,6}"),
+        ("[a-f0-9]{8}", r"[a-f0-9]{8}"),
+        ("?!", r"[A-Za-z0-9][" + re.escape(string.punctuation) + "]"),
+        (r"\#\@\[x\]{3}", r"#@\[x\]\]\]"),
+        ("[-_]{5}", r"[-_]{5}"),
+        ("a{b}", r"a\{b\}"),
+        ("#{²}", r"\d\{²\}"),       # keine ASCII-Ziffer -> kein Quantor, sondern Text
+        ("#{1,٣}", r"\d\{1,٣\}"),
+    ])
+    def test_templates_match_expected_shape(self, generator, template, pattern):
+        for _ in range(50):
+            assert re.fullmatch(pattern, generator.generate_from_template(template))
+
+    def test_plan_is_cached(self):
+        assert compile_template("#{4}-@{2,6}") is compile_template("#{4}-@{2,6}")
+
+    def test_plan_lengths(self):
+        plan = compile_template("ab#{4}@{2,6}")
+        assert (plan.min_length, plan.max_length) == (8, 12)
+
+    def test_range_quantifier_covers_all_lengths(self, generator):
+        lengths = {len(p) for p in generator.generate_many_from_template("#{2,5}", 500)}
+        assert lengths == {2, 3, 4, 5}
+
+    def test_duplicate_class_characters_are_not_weighted(self):
+        assert compile_template("[aab]").steps[0].alphabet == "ab"
+
+    @pytest.mark.parametrize("template", ["", "[abc", "[]", "abc\\", "#{5,2}", "#{999}", "[z-a]"])
+    def test_invalid_templates(self, template):
+        with pytest.raises(TemplateError):
+            compile_template(template)
+
+    def test_service_reports_template_errors(self):
+        result = PasswordGeneratorService().generate_with_wildcard("[abc")
+        assert result["success"] is False
+        assert "geschlossen" in result["error"]
@@ -0,0 +1,134 @@
+import os
+import random
+
+import pytest
+
+from src.crypto import wordstore
+from src.crypto.wordstore import (
+    WordlistError, WordStore, get_wordstore, parse_wordlist, register_wordlist, unique_prefix_length,
+    validate_words
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(wordstore, "CACHE_DIR", cache)
+    monkeypatch.setattr(wordstore, "USER_WORDLIST_DIR", tmp_path)
+    monkeypatch.setattr(wordstore, "_stores", {})
+    monkeypatch.setattr(wordstore, "WORDLISTS", dict(wordstore.WORDLISTS))
+    return cache
+
+
+@pytest.fixture
+def wordfile(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("# comment\n\n11111\taardvark\n11112\tabandoned\nzürich\n", encoding="utf-8")
+    return path
+
+
+def test_parse_wordlist_skips_comments_and_dice_numbers():
+    assert parse_wordlist(["#x", "", "1111\tfoo ", "bar\n"]) == ["foo", "bar"]
+
+
+def test_store_behaves_like_a_sequence():
+    store = WordStore.from_words(["alpha", "ß", "", "omega"])
+    assert len(store) == 4
+    assert list(store) == ["alpha", "ß", "", "omega"]
+    assert store[-1] == "omega"
+    assert store[1:3] == ["ß", ""]
+    assert random.choice(store) in {"alpha", "ß", "", "omega"}
+    with pytest.raises(IndexError):
+        store[4]
+
+
+def test_validate_dedupes_and_checks_prefixes():
+    assert validate_words(["apple", "Apple", "banana", "apple"]) == ["apple", "banana"]
+    assert validate_words(["apple", "apricot"], min_unique_prefix=3) == ["apple", "apricot"]
+    with pytest.raises(WordlistError):
+        validate_words(["apple", "applause"], min_unique_prefix=3)
+    with pytest.raises(WordlistError):
+        validate_words(["two words", "x"])
+    with pytest.raises(WordlistError):
+        validate_words(["only", "ONLY"])
+
+
+def test_unique_prefix_length():
+    assert unique_prefix_length(["apple", "apricot", "banana"]) == 3
+    assert unique_prefix_length(["sun", "sunday"]) == 0
+    assert WordStore.from_words(["apple", "apricot"]).unique_prefix == 3
+
+
+def test_load_compiles_once_keyed_by_content_hash(cache_dir, wordfile, monkeypatch):
+    store = wordstore.load(wordfile)
+    assert list(store) == ["aardvark", "abandoned", "zürich"]
+    compiled = list(cache_dir.glob("*.okw"))
+    assert len(compiled) == 1
+
+    # Unveränderte Quelle wird weder gelesen noch erneut geprüft
+    def fail(*args):
+        raise AssertionError("source re-read")
+    monkeypatch.setattr(type(wordfile), "read_bytes", fail)
+    monkeypatch.setattr(wordstore, "validate_words", fail)
+    assert list(wordstore.load(wordfile)) == list(store)
+
+
+def test_same_content_reuses_compiled_file(cache_dir, wordfile, tmp_path):
+    wordstore.load(wordfile)
+    copy = tmp_path / "copy.txt"
+    copy.write_bytes(wordfile.read_bytes())
+    wordstore.load(copy)
+    assert len(list(cache_dir.glob("*.okw"))) == 1
+
+
+def test_load_recompiles_when_source_changes(cache_dir, wordfile):
+    wordstore.load(wordfile)
+    wordfile.write_text("one\ntwo\nthree\nfour\n", encoding="utf-8")
+    os.utime(wordfile, ns=(1, 1))
+    assert list(wordstore.load(wordfile)) == ["one", "two", "three", "four"]
+
+
+def test_registry_by_name(cache_dir, wordfile, tmp_path):
+    register_wordlist("test", wordfile, min_unique_prefix=2)
+    assert get_wordstore("test") is get_wordstore("test")
+    assert len(get_wordstore("words")) == 3  # <name>.txt im Wortlisten-Ordner
+
+    (tmp_path / "bad.txt").write_text("sunny\nsunday\n", encoding="utf-8")
+    register_wordlist("bad", tmp_path / "bad.txt", min_unique_prefix=3)
+    with pytest.raises(WordlistError):
+        get_wordstore("bad")
+    with pytest.raises(WordlistError):
+        get_wordstore("../words")
+    with pytest.raises(WordlistError):
+        get_wordstore("missing")
+
+
+def test_cached_list_is_checked_again_under_stricter_rule(cache_dir, tmp_path):
+    path = tmp_path / "sun.txt"
+    path.write_text("sunny\nsunday\n", encoding="utf-8")
+    register_wordlist("loose", path)
+    assert len(get_wordstore("loose")) == 2
+
+    register_wordlist("strict", path, min_unique_prefix=3)
+    with pytest.raises(WordlistError):
+        get_wordstore("strict")
+    with pytest.raises(WordlistError):
+        wordstore.load(path, min_unique_prefix=3)
+
+
+def test_registry_fallback_for_missing_file(cache_dir, tmp_path):
+    register_wordlist("gone", tmp_path / "gone.txt")
+    assert list(get_wordstore("gone", fallback=["dragon", "tiger"])) == ["dragon", "tiger"]
+
+
+def test_service_selects_wordlist_per_call(cache_dir, tmp_path):
+    from src.services.password_generator_service import PasswordGeneratorService
+
+    (tmp_path / "colors.txt").write_text("red\ngreen\nblue\n", encoding="utf-8")
+    service = PasswordGeneratorService()
+    result = service.generate_password(
+        10, use_digits=False, use_special=False, algorithm="passphrase", wordlist="colors"
+    )
+    assert result["success"]
+    assert result["password"].lower().replace("red", "").replace("green", "").replace("blue", "") == ""
+    assert not service.generate_password(algorithm="passphrase", wordlist="nope")["success"]
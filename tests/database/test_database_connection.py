@@ -10,7 +10,8 @@ class TestDatabaseConnection:
     TEST_DB_FILE = "test_odinkey.db"
 
     def teardown_method(self):
-        """Aufräumen nach jedem Test: Die Test-Datenbank löschen."""
+        """Aufräumen nach jedem Test: Verbindungen schließen, Test-Datenbank löschen."""
+        DatabaseConnection.reset_pools()
         if os.path.exists(self.TEST_DB_FILE):
             os.remove(self.TEST_DB_FILE)
 
@@ -80,4 +81,54 @@ class TestDatabaseConnection:
         assert "nonce" in columns, "Das Feld 'nonce' fehlt! Wichtig für AES-GCM."
         assert "user_id" in columns  # Fremdschlüssel zum Master Account
 
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+class TestConnectionPool:
+    """Tests für den Verbindungs-Pool (eine langlebige Verbindung pro Thread)."""
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "pool.db"))
+        yield db
+        db.close()
+
+    def test_same_thread_reuses_connection(self, db):
+        assert db.connect() is db.connect()
+
+    def test_instances_share_pool_per_file(self, db):
+        other = DatabaseConnection(db.db_path)
+        assert other.connect() is db.connect()
+
+    def test_other_thread_gets_own_connection(self, db):
+        import threading
+        result = {}
+        worker = threading.Thread(target=lambda: result.setdefault("conn", db.connect()))
+        worker.start()
+        worker.join()
+
+        assert result["conn"] is not db.connect()
+
+    def test_connection_of_finished_thread_is_closed(self, db):
+        import threading
+        result = {}
+        worker = threading.Thread(target=lambda: result.setdefault("conn", db.connect()))
+        worker.start()
+        worker.join()
+
+        # Der nächste neue Thread räumt die Verbindung des beendeten Threads auf
+        other = threading.Thread(target=db.connect)
+        other.start()
+        other.join()
+        with pytest.raises(sqlite3.ProgrammingError):
+            result["conn"].execute("SELECT 1")
+
+    def test_close_keeps_pooled_connection_usable(self, db):
+        conn = db.connect()
+        conn.close()  # alter Code ruft close() auf -> darf die Verbindung nicht zerstören
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+    def test_pragmas_are_applied(self, db):
+        conn = db.connect()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
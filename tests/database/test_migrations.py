@@ -0,0 +1,110 @@
+import sqlite3
+import pytest
+from src.database.connection import DatabaseConnection
+from src.database.models import migrate, get_schema_version, SCHEMA_VERSION
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+class TestMigrations:
+
+    @pytest.fixture
+    def legacy_db_file(self, tmp_path):
+        """Tresor im alten Format (user_version 0, Schema aus dem alten create_tables)."""
+        db_file = tmp_path / "legacy.db"
+        conn = sqlite3.connect(db_file)
+        conn.execute("""
+            CREATE TABLE master_account (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                salt TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE password_profiles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                service_name TEXT NOT NULL,
+                url TEXT,
+                username TEXT,
+                password_blob BLOB NOT NULL,
+                nonce BLOB NOT NULL,
+                salt BLOB,
+                notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            INSERT INTO password_profiles (user_id, service_name, url, username, password_blob, nonce, created_at)
+            VALUES (1, 'Amazon', 'https://amazon.de', 'roman', x'00', x'00', '2024-05-01T12:00:00.123456')
+        """)
+        conn.commit()
+        conn.close()
+        return str(db_file)
+
+    def test_fresh_database_is_on_latest_version(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "fresh.db"))
+        assert db.create_tables() == SCHEMA_VERSION
+        assert get_schema_version(db.connect()) == SCHEMA_VERSION
+        db.close()
+
+    def test_legacy_vault_is_migrated_and_backfilled(self, legacy_db_file):
+        db = DatabaseConnection(legacy_db_file)
+        conn = db.connect()
+
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert {"updated_at", "created_ts", "updated_ts"} <= set(_columns(conn, "password_profiles"))
+        assert "created_at" in _columns(conn, "master_account")
+
+        row = conn.execute("SELECT created_ts, updated_ts, updated_at FROM password_profiles").fetchone()
+        assert row["created_ts"] == 1714564800
+        assert row["updated_ts"] == row["created_ts"]
+        assert row["updated_at"] == "2024-05-01T12:00:00.123456"
+        db.close()
+
+    def test_migrate_is_idempotent(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "twice.db"))
+        conn = db.connect()
+        assert migrate(conn) == SCHEMA_VERSION
+        assert migrate(conn) == SCHEMA_VERSION
+        db.close()
+
+    def test_list_query_uses_covering_index(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "plan.db"))
+        conn = db.connect()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, service_name, username, url FROM password_profiles WHERE user_id = ?",
+            (1,)
+        ).fetchall()
+        detail = " ".join(row[3] for row in plan)
+        assert "COVERING INDEX idx_profiles_user_service" in detail
+        db.close()
+
+    def test_missing_fulltext_index_is_created_later(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "nofts.db"))
+        conn = db.connect()
+        conn.execute("INSERT INTO master_account (username, password_hash, salt) VALUES ('u', 'h', x'00')")
+        conn.execute("""
+            INSERT INTO password_profiles (user_id, service_name, username, password_blob, nonce)
+            VALUES (1, 'Gmail', 'roman', x'00', x'00')
+        """)
+        # Zustand nach Migration 3 auf einem SQLite ohne FTS5: Version hochgezählt, kein Index
+        for trigger in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER password_profiles_fts_{trigger}")
+        conn.execute("DROP TABLE password_profiles_fts")
+        conn.commit()
+
+        assert migrate(conn) == SCHEMA_VERSION
+        hits = conn.execute("SELECT rowid FROM password_profiles_fts WHERE password_profiles_fts MATCH 'gmail'")
+        assert [row[0] for row in hits] == [1]
+        db.close()
+
+    def test_newer_schema_is_rejected(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "future.db")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        with pytest.raises(RuntimeError):
+            migrate(conn)
+        conn.close()
@@ -1,5 +1,8 @@
-import pytest
+import logging
 import os
+import sqlite3
+
+import pytest
 from src.core.password_profile import PasswordProfile
 from src.database.connection import DatabaseConnection
 from src.database.password_profile_repository import PasswordProfileRepository
@@ -59,4 +62,203 @@ class TestPasswordProfileRepository:
 
         # DER WICHTIGSTE TEST:
         # Das Repo muss das Passwort entschlüsselt haben
-        assert loaded_profile.password == "MeinGeheimesPassword123!"
\ No newline at end of file
+        assert loaded_profile.password == "MeinGeheimesPassword123!"
+
+    def test_password_rule_roundtrip(self, db_connection):
+        repo = PasswordProfileRepository(db_connection, b'0' * 32)
+        profile = PasswordProfile(
+            user_id=1, service_name="Bank", url="https://bank.example", username="odin",
+            password="Passwort123!", password_rule="maxlength: 12; required: digit"
+        )
+        profile.id = repo.create_profile(profile)
+        assert repo.get_profile_by_id(profile.id).password_rule == "maxlength: 12; required: digit"
+
+        profile.password_rule = None
+        repo.update_profile(profile)
+        assert repo.get_profile_by_id(profile.id).password_rule is None
+        assert repo.export_profiles(1)[0].password_rule is None
+
+class TestProfileSearch:
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "search.db"))
+        db.create_tables()
+        repo = PasswordProfileRepository(db, b'0' * 32)
+        for service, username, url, notes in [
+            ("Github", "odin", "https://github.com", None),
+            ("Gitlab", "thor", "https://gitlab.com", None),
+            ("Netflix", "loki", "https://netflix.com", "shared with github team"),
+        ]:
+            repo.create_profile(PasswordProfile(
+                user_id=1, service_name=service, url=url, username=username,
+                password="Passwort123!", notes=notes
+            ))
+        repo.create_profile(PasswordProfile(
+            user_id=2, service_name="Github", url="", username="fremd", password="Passwort123!"
+        ))
+        yield repo
+        db.close()
+
+    def test_prefix_match(self, repo):
+        results = repo.search_profiles(1, "git")
+        assert {p.service_name for p in results} == {"Github", "Gitlab", "Netflix"}
+
+    def test_results_are_ranked_by_relevance(self, repo):
+        results = repo.search_profiles(1, "github")
+        # Treffer im Service-Namen vor Treffer in den Notizen
+        assert [p.service_name for p in results] == ["Github", "Netflix"]
+
+    def test_only_own_profiles_are_found(self, repo):
+        assert all(p.user_id == 1 for p in repo.search_profiles(1, "github"))
+
+    def test_index_follows_update_and_delete(self, repo):
+        profile = repo.get_profile_by_id(repo.search_profiles(1, "gitlab")[0].id)
+        profile.service_name = "Bitbucket"
+        profile.url = "https://bitbucket.org"
+        repo.update_profile(profile)
+
+        assert repo.search_profiles(1, "gitlab") == []
+        assert repo.search_profiles(1, "bitbucket")[0].id == profile.id
+
+        repo.delete_profile(profile.id)
+        assert repo.search_profiles(1, "bitbucket") == []
+
+    def test_special_characters_do_not_break_query(self, repo):
+        assert repo.search_profiles(1, 'github.com -')[0].service_name == "Github"
+        assert repo.search_profiles(1, '"OR" NOT') == []
+        assert repo.search_profiles(1, "***") == []
+
+
+    def _drop_fulltext_index(self, repo):
+        conn = repo.db.connect()
+        for trigger in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER password_profiles_fts_{trigger}")
+        conn.execute("DROP TABLE password_profiles_fts")
+        conn.commit()
+
+    def test_like_fallback_without_fts5(self, repo, caplog):
+        self._drop_fulltext_index(repo)
+        with caplog.at_level(logging.WARNING):
+            results = repo.search_profiles(1, "gitlab.com")
+        assert [p.service_name for p in results] == ["Gitlab"]  # Treffer nur in der URL
+        assert "LIKE" in caplog.text
+
+    def test_fts_errors_are_not_hidden(self, repo, monkeypatch):
+        monkeypatch.setattr(PasswordProfileRepository, "build_fts_query", staticmethod(lambda query: '"offen'))
+        with pytest.raises(sqlite3.OperationalError):
+            repo.search_profiles(1, "github")
+
+
+class TestLazyProfiles:
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "lazy.db"))
+        db.create_tables()
+        repo = PasswordProfileRepository(db, b'0' * 32)
+        repo.create_profile(PasswordProfile(
+            user_id=1, service_name="Amazon", url="https://amazon.de",
+            username="roman", password="MeinGeheimesPassword123!"
+        ))
+        yield repo
+        db.close()
+
+    @pytest.fixture
+    def decrypt_calls(self, repo, monkeypatch):
+        calls = []
+        original = repo.cipher.decrypt
+
+        def counting_decrypt(*args, **kwargs):
+            calls.append(1)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(repo.cipher, "decrypt", counting_decrypt)
+        return calls
+
+    def test_search_and_list_do_not_decrypt(self, repo, decrypt_calls):
+        assert repo.search_profiles(1, "amazon")[0].service_name == "Amazon"
+        assert repo.list_profiles(1)[0].username == "roman"
+        assert decrypt_calls == []
+
+    def test_password_is_decrypted_once_on_access(self, repo, decrypt_calls):
+        profile = repo.get_profile_by_id(repo.list_profiles(1)[0].id)
+        assert decrypt_calls == []
+
+        assert profile.password == "MeinGeheimesPassword123!"
+        assert profile.password == "MeinGeheimesPassword123!"
+        assert len(decrypt_calls) == 1
+
+    def test_metadata_update_keeps_ciphertext(self, repo, decrypt_calls):
+        profile = repo.get_profile_by_id(repo.list_profiles(1)[0].id)
+        profile.username = "roman2"
+        repo.update_profile(profile)
+        assert decrypt_calls == []
+
+        reloaded = repo.get_profile_by_id(profile.id)
+        assert reloaded.username == "roman2"
+        assert reloaded.password == "MeinGeheimesPassword123!"
+
+    def test_new_password_is_stored(self, repo):
+        profile = repo.get_profile_by_id(repo.list_profiles(1)[0].id)
+        profile.password = "NeuesPasswort456!"
+        repo.update_profile(profile)
+
+        assert repo.get_profile_by_id(profile.id).password == "NeuesPasswort456!"
+
+
+class TestBulkOperations:
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "bulk.db"))
+        db.create_tables()
+        repo = PasswordProfileRepository(db, b'0' * 32)
+        for service, password in [("Amazon", "Gleich123!"), ("eBay", "Gleich123!"), ("GitHub", "Anders456!")]:
+            repo.create_profile(PasswordProfile(user_id=1, service_name=service, url=None, username="roman", password=password))
+        repo.create_profile(PasswordProfile(user_id=2, service_name="Fremd", url=None, username="x", password="Gleich123!"))
+        yield repo
+        db.close()
+
+    def test_export_decrypts_all_profiles_of_user(self, repo):
+        exported = repo.export_profiles(1)
+        assert [(p.service_name, p.password) for p in exported] == [
+            ("Amazon", "Gleich123!"), ("eBay", "Gleich123!"), ("GitHub", "Anders456!")
+        ]
+
+    def test_audit_finds_reused_passwords(self, repo):
+        groups = repo.find_reused_passwords(1)
+        assert len(groups) == 1
+        assert sorted(p.service_name for p in groups[0]) == ["Amazon", "eBay"]
+
+    def test_reencrypt_all_switches_key(self, repo):
+        new_key = b'1' * 32
+        assert repo.reencrypt_all(new_key, user_id=1) == 3
+        assert repo.master_key == new_key
+
+        fresh = PasswordProfileRepository(repo.db, new_key)
+        assert [p.password for p in fresh.export_profiles(1)] == ["Gleich123!", "Gleich123!", "Anders456!"]
+
+        # Profile anderer User bleiben unter ihrem eigenen Key
+        old = PasswordProfileRepository(repo.db, b'0' * 32)
+        assert [p.password for p in old.export_profiles(2)] == ["Gleich123!"]
+        with pytest.raises(Exception):
+            old.export_profiles(1)
+
+    def test_reencrypt_all_rolls_back_on_error(self, repo):
+        def fail(conn):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            repo.reencrypt_all(b'1' * 32, user_id=1, before_commit=fail)
+        assert repo.master_key == b'0' * 32
+        assert [p.password for p in repo.export_profiles(1)] == ["Gleich123!", "Gleich123!", "Anders456!"]
+
+    def test_bulk_paths_with_small_batches(self, repo, monkeypatch):
+        # Mehrere Batches auf mehreren Threads -> Reihenfolge muss trotzdem stimmen
+        monkeypatch.setattr(PasswordProfileRepository, "BULK_WORKERS", 3)
+        monkeypatch.setattr(PasswordProfileRepository, "BULK_BATCH_SIZE", 1)
+
+        assert [p.service_name for p in repo.export_profiles(1)] == ["Amazon", "eBay", "GitHub"]
+        assert repo.reencrypt_all(b'2' * 32, user_id=1) == 3
+        assert [p.password for p in repo.export_profiles(1)] == ["Gleich123!", "Gleich123!", "Anders456!"]
@@ -0,0 +1,36 @@
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.database.password_rule_repository import PasswordRuleRepository, domain_of
+
+
+@pytest.fixture
+def repo(tmp_path):
+    conn = DatabaseConnection(str(tmp_path / "rules.db"))
+    conn.create_tables()
+    return PasswordRuleRepository(conn)
+
+
+def test_domain_of():
+    assert domain_of("https://Login.Example.com:8443/path") == "login.example.com"
+    assert domain_of("example.com/login") == "example.com"
+    assert domain_of("") is None
+
+
+def test_set_get_and_overwrite(repo):
+    repo.set_rule(1, "Example.com", "required: digit")
+    repo.set_rule(1, "example.com", "maxlength: 12")
+    assert repo.get_rule(1, "example.com") == "maxlength: 12"
+    assert repo.get_rule(2, "example.com") is None
+    assert repo.list_rules(1) == {"example.com": "maxlength: 12"}
+
+
+def test_find_for_url_prefers_most_specific_domain(repo):
+    repo.set_rule(1, "example.com", "maxlength: 12")
+    repo.set_rule(1, "login.example.com", "maxlength: 20")
+    assert repo.find_for_url(1, "https://login.example.com/x") == "maxlength: 20"
+    assert repo.find_for_url(1, "https://shop.example.com") == "maxlength: 12"
+    assert repo.find_for_url(1, "https://example.org") is None
+
+    repo.delete_rule(1, "login.example.com")
+    assert repo.find_for_url(1, "https://login.example.com/x") == "maxlength: 12"
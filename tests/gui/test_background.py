@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.gui.background import BackgroundRunner
+
+
+class FakeWidget:
+    """Collects after() callbacks instead of running a Tk main loop."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+        return callback
+
+    def after_cancel(self, after_id):
+        self.scheduled.remove(after_id)
+
+    def run_pending(self, timeout=2.0):
+        # Simulate the main loop polling until nothing is scheduled any more
+        for _ in range(int(timeout / 0.01)):
+            if not self.scheduled:
+                return
+            self.scheduled.pop(0)()
+            time.sleep(0.01)
+
+
+class BackgroundRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.runner = BackgroundRunner(self.widget)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_result_is_delivered_on_polling_thread(self):
+        on_success = mock.Mock()
+        worker_threads = []
+
+        def job(value):
+            worker_threads.append(threading.current_thread())
+            return value * 2
+
+        self.runner.submit(job, 21, on_success=on_success)
+        self.assertTrue(self.runner.busy)
+        self.widget.run_pending()
+
+        on_success.assert_called_once_with(42)
+        self.assertFalse(self.runner.busy)
+        self.assertIsNot(worker_threads[0], threading.current_thread())
+
+    def test_errors_go_to_error_callback(self):
+        on_success, on_error = mock.Mock(), mock.Mock()
+
+        def job():
+            raise ValueError("Es existiert bereits ein Master-Account.")
+
+        self.runner.submit(job, on_success=on_success, on_error=on_error)
+        self.widget.run_pending()
+
+        on_success.assert_not_called()
+        self.assertIsInstance(on_error.call_args[0][0], ValueError)
+
+    def test_cancelled_result_is_discarded(self):
+        release = threading.Event()
+        on_success = mock.Mock()
+
+        self.runner.submit(release.wait, on_success=on_success)
+        self.runner.cancel()
+        self.assertFalse(self.runner.busy)
+        release.set()
+        self.widget.run_pending()
+
+        on_success.assert_not_called()
+
+    def test_shutdown_cancels_pending_poll(self):
+        on_success = mock.Mock()
+        self.runner.submit(time.sleep, 0.05, on_success=on_success)
+        self.assertEqual(len(self.widget.scheduled), 1)
+
+        self.runner.shutdown()
+
+        self.assertEqual(self.widget.scheduled, [])
+        self.assertFalse(self.runner.busy)
+        with self.assertRaises(RuntimeError):
+            self.runner.submit(time.sleep, 0, on_success=on_success)
+        on_success.assert_not_called()
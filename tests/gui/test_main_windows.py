@@ -50,6 +50,16 @@ class StartWindowSessionTests(unittest.TestCase):
         app._session_watchdog()
         app.master.after.assert_not_called()
 
+    def test_close_stops_watchdog_and_runner(self):
+        app = self._build_app()
+        app.runner = mock.Mock()
+        app._watchdog_id = "after#1"
+        app.on_close()
+        app.master.after_cancel.assert_called_once_with("after#1")
+        app.runner.shutdown.assert_called_once()
+        app.master.destroy.assert_called_once()
+        self.assertFalse(app._watchdog_active)
+
 
 class DashboardFrameLogicTests(unittest.TestCase):
     def _build_frame(self):
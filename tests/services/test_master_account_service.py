@@ -0,0 +1,228 @@
+import os
+import sqlite3
+
+import pytest
+from src.core.password_profile import PasswordProfile
+from src.crypto import kdf
+from src.database.connection import DatabaseConnection
+from src.database.password_profile_repository import PasswordProfileRepository
+from src.database.repository import MasterAccountRepository
+from src.services.master_account_service import MasterAccountService
+
+
+class TestMasterAccountLogin:
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        # Schnelle Parameter statt echter Kalibrierung (250 ms pro Ableitung)
+        monkeypatch.setattr(kdf, "calibrate", lambda *args, **kwargs: kdf.MINIMUM_PARAMS[kdf.ARGON2ID])
+        db = DatabaseConnection(str(tmp_path / "kdf.db"))
+        db.create_tables()
+        yield MasterAccountService(MasterAccountRepository(db))
+        db.close()
+
+    def test_register_stores_calibrated_params(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, _ = service.repo.get_account_by_username("roman")
+        assert service.repo.get_kdf_params(account.id) == kdf.MINIMUM_PARAMS[kdf.ARGON2ID]
+
+    def test_login_derives_key_with_stored_params(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, key = service.login("roman", "MasterPasswort1")
+        _, salt = service.repo.get_account_by_username("roman")
+        root = kdf.derive("MasterPasswort1", salt, kdf.MINIMUM_PARAMS[kdf.ARGON2ID])
+        # Der abgeleitete Key ist der KEK; zurück kommt der damit eingepackte Data-Key
+        kek = kdf.split_root_secret(root)[1]
+        assert key == service.encryption.unwrap_key(kek, *service.repo.get_wrapped_key(account.id))
+        assert key != kek
+        assert service.login("roman", "falsch123") is None
+
+    def test_register_stores_creation_time(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        row = service.repo.db_connection.connect().execute("SELECT created_at FROM master_account").fetchone()
+        assert row["created_at"] is not None
+
+    def test_register_stores_verifier_not_key(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, _ = service.repo.get_account_by_username("roman")
+        _, key = service.login("roman", "MasterPasswort1")
+
+        assert service.hashing.is_verifier_hash(account.password)
+        assert service.hashing.encode_verifier(key) != account.password
+
+    def test_legacy_vault_is_upgraded_on_login(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, salt = service.repo.get_account_by_username("roman")
+        # Tresor in den alten Zustand versetzen: Argon2-Hash, kein kdf_params, Profile mit PBKDF2-100k-Key
+        service.repo.db_connection.connect().execute(
+            "UPDATE master_account SET kdf_params = NULL, password_hash = ?",
+            (service.hashing.hash_master_password("MasterPasswort1"),)
+        )
+        legacy_key = service.encryption.derive_key("MasterPasswort1", salt)
+        PasswordProfileRepository(service.repo.db_connection, legacy_key).create_profile(PasswordProfile(
+            user_id=account.id, service_name="Amazon", url=None, username="roman", password="Geheim123!"
+        ))
+
+        assert service.login("roman", "falsch123") is None
+        _, key = service.login("roman", "MasterPasswort1")
+
+        assert key != legacy_key
+        migrated, _ = service.repo.get_account_by_username("roman")
+        assert service.hashing.is_verifier_hash(migrated.password)
+        assert service.repo.get_kdf_params(account.id) == kdf.MINIMUM_PARAMS[kdf.ARGON2ID]
+        profiles = PasswordProfileRepository(service.repo.db_connection, key).export_profiles(account.id)
+        assert [p.password for p in profiles] == ["Geheim123!"]
+        # Zweiter Login: keine weitere Umstellung, gleicher Key
+        assert service.login("roman", "MasterPasswort1")[1] == key
+
+    def test_verify_password_does_not_migrate_legacy_account(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        legacy_hash = service.hashing.hash_master_password("MasterPasswort1")
+        service.repo.db_connection.connect().execute(
+            "UPDATE master_account SET kdf_params = NULL, password_hash = ?", (legacy_hash,)
+        )
+
+        assert service.verify_password("roman", "MasterPasswort1")
+        assert not service.verify_password("roman", "falsch123")
+        assert not service.verify_password("niemand", "MasterPasswort1")
+        assert service.repo.get_account_by_username("roman")[0].password == legacy_hash
+
+    def test_verify_password_with_verifier(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        assert service.verify_password("roman", "MasterPasswort1")
+        assert not service.verify_password("roman", "MasterPasswort2")
+
+    def _add_profile(self, service, key, password="Geheim123!"):
+        account, _ = service.repo.get_account_by_username("roman")
+        repo = PasswordProfileRepository(service.repo.db_connection, key)
+        repo.create_profile(PasswordProfile(
+            user_id=account.id, service_name="Amazon", url=None, username="roman", password=password
+        ))
+        return account, repo
+
+    def _blobs(self, service):
+        return service.repo.db_connection.connect().execute(
+            "SELECT password_blob, nonce FROM password_profiles ORDER BY id"
+        ).fetchall()
+
+    def test_change_master_password_only_rewraps_data_key(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        _, key = service.login("roman", "MasterPasswort1")
+        account, _ = self._add_profile(service, key)
+        blobs = [tuple(row) for row in self._blobs(service)]
+
+        assert service.change_master_password("roman", "MasterPasswort1", "NeuesPasswort2") == key
+
+        # Profile unverändert, altes Passwort ungültig, neues liefert denselben Data-Key
+        assert [tuple(row) for row in self._blobs(service)] == blobs
+        assert service.login("roman", "MasterPasswort1") is None
+        assert service.login("roman", "NeuesPasswort2")[1] == key
+        profiles = PasswordProfileRepository(service.repo.db_connection, key).export_profiles(account.id)
+        assert [p.password for p in profiles] == ["Geheim123!"]
+
+    def test_change_master_password_rejects_wrong_or_weak_password(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        with pytest.raises(ValueError):
+            service.change_master_password("roman", "falsch123", "NeuesPasswort2")
+        with pytest.raises(ValueError):
+            service.change_master_password("roman", "MasterPasswort1", "kurz")
+        assert service.login("roman", "MasterPasswort1")
+
+    def test_change_master_password_has_no_login_side_effects(self, service, monkeypatch):
+        service.register_account("roman", "MasterPasswort1")
+        account, _ = service.repo.get_account_by_username("roman")
+        _, key = service.login("roman", "MasterPasswort1")
+        # Veraltete Parameter: login() würde hier vorher noch einmal neu einpacken
+        service._rewrap_data_key(account, "MasterPasswort1", os.urandom(16), key, kdf.MINIMUM_PARAMS[kdf.PBKDF2])
+
+        def no_login(*args, **kwargs):
+            raise AssertionError("change_master_password darf login() nicht benutzen")
+
+        derivations = []
+        derive = service.encryption.derive_login_keys
+        monkeypatch.setattr(service, "login", no_login)
+        monkeypatch.setattr(service.encryption, "derive_login_keys",
+                            lambda *args: derivations.append(args[0]) or derive(*args))
+
+        assert service.change_master_password("roman", "MasterPasswort1", "NeuesPasswort2") == key
+        # Genau eine Ableitung mit dem alten und eine mit dem neuen Passwort
+        assert derivations == ["MasterPasswort1", "NeuesPasswort2"]
+
+    def test_change_master_password_requires_migrated_vault(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, _ = self._make_legacy(service)
+        with pytest.raises(ValueError):
+            service.change_master_password("roman", "MasterPasswort1", "NeuesPasswort2")
+        assert service.repo.get_wrapped_key(account.id) is None
+
+    def test_vault_without_data_key_is_migrated_on_login(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, salt = service.repo.get_account_by_username("roman")
+        # Stand vor der Schlüsselhierarchie: Profile direkt mit dem Passwort-Key verschlüsselt
+        service.repo.db_connection.connect().execute("UPDATE master_account SET wrapped_dek = NULL, dek_nonce = NULL")
+        root = kdf.derive("MasterPasswort1", salt, kdf.MINIMUM_PARAMS[kdf.ARGON2ID])
+        password_key = kdf.split_root_secret(root)[1]
+        self._add_profile(service, password_key)
+
+        _, key = service.login("roman", "MasterPasswort1")
+
+        assert key != password_key
+        assert service.repo.get_wrapped_key(account.id) is not None
+        profiles = PasswordProfileRepository(service.repo.db_connection, key).export_profiles(account.id)
+        assert [p.password for p in profiles] == ["Geheim123!"]
+        assert service.login("roman", "MasterPasswort1")[1] == key
+
+    def test_kdf_upgrade_rewraps_without_reencrypting(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, _ = service.repo.get_account_by_username("roman")
+        _, key = service.login("roman", "MasterPasswort1")
+        self._add_profile(service, key)
+        blobs = [tuple(row) for row in self._blobs(service)]
+
+        # Schwächere Parameter simulieren: KEK neu mit PBKDF2 einpacken
+        service._rewrap_data_key(account, "MasterPasswort1", os.urandom(16), key, kdf.MINIMUM_PARAMS[kdf.PBKDF2])
+        assert service.login("roman", "MasterPasswort1")[1] == key
+
+        assert service.repo.get_kdf_params(account.id) == kdf.MINIMUM_PARAMS[kdf.ARGON2ID]
+        assert [tuple(row) for row in self._blobs(service)] == blobs
+
+    def _make_legacy(self, service):
+        account, salt = service.repo.get_account_by_username("roman")
+        service.repo.db_connection.connect().execute(
+            "UPDATE master_account SET kdf_params = NULL, wrapped_dek = NULL, dek_nonce = NULL, password_hash = ?",
+            (service.hashing.hash_master_password("MasterPasswort1"),)
+        )
+        legacy_key = service.encryption.derive_key("MasterPasswort1", salt)
+        self._add_profile(service, legacy_key)
+        return account, legacy_key
+
+    def test_migration_leaves_other_accounts_alone(self, service):
+        service.register_account("roman", "MasterPasswort1")
+        account, _ = self._make_legacy(service)
+        other_key = b"o" * 32
+        other = PasswordProfileRepository(service.repo.db_connection, other_key)
+        other.create_profile(PasswordProfile(
+            user_id=account.id + 1, service_name="Other", url=None, username="x", password="Fremd123!"
+        ))
+
+        service.login("roman", "MasterPasswort1")
+
+        assert [p.password for p in other.export_profiles(account.id + 1)] == ["Fremd123!"]
+
+    def test_failed_migration_keeps_old_key(self, service, monkeypatch):
+        service.register_account("roman", "MasterPasswort1")
+        account, legacy_key = self._make_legacy(service)
+
+        def locked(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(PasswordProfileRepository, "reencrypt_all", locked)
+        assert service.login("roman", "MasterPasswort1")[1] == legacy_key
+        assert service.repo.get_wrapped_key(account.id) is None
+
+        def bug(*args, **kwargs):
+            raise RuntimeError("bug")
+
+        monkeypatch.setattr(PasswordProfileRepository, "reencrypt_all", bug)
+        with pytest.raises(RuntimeError):
+            service.login("roman", "MasterPasswort1")
@@ -0,0 +1,58 @@
+import pytest
+from unittest import mock
+from src.core.master_account import MasterAccount
+from src.core.session import _Session
+from src.services.password_profile_service import PasswordProfileService
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class TestReauthentication:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeTime()
+
+    @pytest.fixture
+    def service(self, clock):
+        session = _Session(time_provider=clock.time, timeout_seconds=600, reauth_seconds=60)
+        session.start(MasterAccount(id=1, username="roman", password="hash"), b"0" * 32)
+        auth = mock.Mock()
+        auth.verify_password.side_effect = lambda username, password: password == "richtig123"
+        yield PasswordProfileService(mock.Mock(), auth, session=session)
+        session.end()
+
+    def test_bulk_delete_costs_one_verification(self, service):
+        for profile_id in range(20):
+            service.delete_profile_securely(profile_id, "roman", "richtig123")
+
+        assert service.auth_service.verify_password.call_count == 1
+        assert service.profile_repo.delete_profile.call_count == 20
+        service.auth_service.login.assert_not_called()
+
+    def test_wrong_password_is_rejected_and_not_granted(self, service):
+        with pytest.raises(PermissionError):
+            service.delete_profile_securely(1, "roman", "falsch")
+
+        service.profile_repo.delete_profile.assert_not_called()
+        assert service.requires_reauth()
+
+    def test_grant_expires(self, service, clock):
+        service.delete_profile_securely(1, "roman", "richtig123")
+        assert not service.requires_reauth()
+
+        clock.now += 61
+        assert service.requires_reauth()
+        with pytest.raises(PermissionError):
+            service.delete_profile_securely(2, "roman", None)
+
+    def test_grant_ends_with_session(self, service):
+        service.confirm_master_password("roman", "richtig123")
+        service.session.end()
+        assert service.requires_reauth()
@@ -0,0 +1,56 @@
+from functools import partial
+
+import pytest
+
+from src.cli.commands.generator import format_batch
+from src.services.sharded_generator import GenerationCancelled, ShardedGenerator
+
+
+@pytest.fixture
+def sharded():
+    with ShardedGenerator(workers=2, shard_size=50) as generator:
+        yield generator
+
+
+def test_shards_are_deterministic():
+    generator = ShardedGenerator(workers=4, shard_size=10)
+    assert generator.shards(25) == [(0, 10), (10, 10), (20, 5)]
+    assert generator.shards(0) == []
+    with pytest.raises(ValueError):
+        generator.shards(-1)
+
+
+def test_stream_in_shard_order(sharded):
+    chunks = list(sharded.iter_shards(230, formatter=partial(format_batch, fmt="ndjson"), template="?{12}"))
+    assert len(chunks) == 5
+    lines = "".join(chunks).splitlines()
+    assert [int(line.split(",")[0].split(":")[1]) for line in lines] == list(range(230))
+
+
+def test_workers_have_independent_random_state(sharded):
+    passwords = list(sharded.generate(400, template="?{16}"))
+    assert len(passwords) == 400
+    assert len(set(passwords)) == 400
+
+
+def test_invalid_options_fail_in_caller(sharded):
+    with pytest.raises(ValueError):
+        sharded.iter_shards(10, length=3)
+
+
+def test_cancel_stops_stream(sharded):
+    received = 0
+    with pytest.raises(GenerationCancelled) as cancelled:
+        for batch in sharded.iter_shards(10_000, algorithm="random", length=12):
+            received += len(batch)
+            sharded.cancel()
+    assert received == 50
+    assert (cancelled.value.produced, cancelled.value.count) == (50, 10_000)
+
+
+def test_closing_iterator_discards_pending_shards(sharded):
+    stream = sharded.iter_shards(10_000, algorithm="random", length=12)
+    assert len(next(stream)) == 50
+    stream.close()
+    # Pool bleibt benutzbar
+    assert len(list(sharded.generate(60, algorithm="random", length=12))) == 60
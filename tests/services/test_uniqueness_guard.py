@@ -0,0 +1,57 @@
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.database.generation_history_repository import GenerationHistoryRepository
+from src.services.password_generator_service import PasswordGeneratorService
+from src.services.sharded_generator import ShardedGenerator
+from src.services.uniqueness_guard import UniquenessGuard
+
+
+@pytest.fixture
+def history(tmp_path):
+    db = DatabaseConnection(str(tmp_path / "history.db"))
+    db.create_tables()
+    return GenerationHistoryRepository(db)
+
+
+def test_generate_batch_fills_small_output_space_without_duplicates():
+    service = PasswordGeneratorService()
+    guard = UniquenessGuard()
+    batch = service.generate_batch(1000, regex="[ab]{10}", unique=guard)  # 1024 mögliche Ergebnisse
+    assert len(batch) == len(set(batch)) == 1000
+    # Auch über mehrere Aufrufe hinweg keine Wiederholung
+    rest = service.generate_batch(24, regex="[ab]{10}", unique=guard)
+    assert set(rest).isdisjoint(batch)
+
+
+def test_exhausted_output_space_raises():
+    guard = UniquenessGuard()
+    with pytest.raises(ValueError):
+        PasswordGeneratorService().generate_batch(5, regex="[ab]{2}", unique=guard)
+
+
+def test_filter_with_limit_leaves_rest_untouched():
+    guard = UniquenessGuard()
+    assert guard.filter(["a", "b", "a", "c"], limit=2) == ["a", "b"]
+    assert "c" not in guard
+    assert len(guard) == 2
+
+
+def test_vault_history_is_persisted_per_key(history):
+    key = b"k" * 32
+    guard = UniquenessGuard.for_vault(key, history, user_id=1)
+    guard.filter(["alpha", "beta"])
+    guard.save()
+
+    restored = UniquenessGuard.for_vault(key, history, user_id=1)
+    assert "alpha" in restored and "gamma" not in restored
+    # Anderer Vault-Key (z.B. nach Re-Keying) -> alter Filter ist unbrauchbar, Verlauf beginnt neu
+    assert len(UniquenessGuard.for_vault(b"x" * 32, history, user_id=1)) == 0
+    assert len(UniquenessGuard.for_vault(key, history, user_id=2)) == 0
+
+
+def test_sharded_generation_is_unique_across_shards():
+    guard = UniquenessGuard()
+    with ShardedGenerator(workers=2, shard_size=200) as sharded:
+        passwords = list(sharded.generate(1000, regex="[ab]{10}", unique=guard))
+    assert len(passwords) == len(set(passwords)) == 1000